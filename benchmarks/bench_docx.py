@@ -0,0 +1,113 @@
+"""DOCX 解析引擎基准测试。
+
+生成一个合成的长文档（段落与带合并单元格的表格交替出现，模拟上千页的
+合同），分别用 python-docx 引擎和流式 XML 引擎提取文本并比较耗时。
+
+用法::
+
+    python benchmarks/bench_docx.py --sections 2000 --runs 3 --json docx.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from mcp_documents_reader import DocxReader  # noqa: E402
+
+ENGINES = DocxReader.engines
+
+
+def build_document(path: Path, sections: int) -> None:
+    """写出一个合成文档。
+
+    每个章节包含一个标题、十个段落和一个 4x4 表格，表格首行横向合并。
+
+    Args:
+        path: 输出文件路径
+        sections: 章节数
+    """
+    from docx import Document
+
+    doc = Document()
+    for section in range(sections):
+        doc.add_heading(f"Section {section}", level=2)
+        for paragraph in range(10):
+            doc.add_paragraph(
+                f"Clause {section}.{paragraph}: the parties agree that the "
+                "obligations set out herein survive termination of this agreement."
+            )
+        table = doc.add_table(rows=4, cols=4)
+        table.cell(0, 0).merge(table.cell(0, 3)).text = f"Schedule {section}"
+        for row in range(1, 4):
+            for col in range(4):
+                table.cell(row, col).text = f"R{row}C{col}"
+    doc.save(str(path))
+
+
+def measure(path: Path, engine: str) -> tuple[float, int]:
+    """用指定引擎提取一次文档文本。
+
+    Args:
+        path: 文档路径
+        engine: 引擎名称
+
+    Returns:
+        tuple[float, int]: 耗时（秒）和提取的字符数
+    """
+    started = time.perf_counter()
+    text = DocxReader(engine=engine).read(str(path))
+    return time.perf_counter() - started, len(text)
+
+
+def main() -> int:
+    """运行 DOCX 引擎基准测试。
+
+    Returns:
+        int: 进程退出码
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=1000, help="章节数")
+    parser.add_argument("--runs", type=int, default=3, help="每个引擎的运行次数")
+    parser.add_argument("--json", type=Path, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.docx"
+        build_document(path, args.sections)
+        result: dict = {
+            "sections": args.sections,
+            "file_bytes": path.stat().st_size,
+            "engines": {},
+        }
+        for engine in ENGINES:
+            samples = []
+            chars = 0
+            for _ in range(args.runs):
+                seconds, chars = measure(path, engine)
+                samples.append(seconds)
+            result["engines"][engine] = {
+                "median_s": statistics.median(samples),
+                "min_s": min(samples),
+                "chars": chars,
+            }
+
+    baseline = result["engines"][ENGINES[0]]["median_s"]
+    for engine, stats in result["engines"].items():
+        print(
+            f"{engine:>11}: {stats['median_s']:.3f} s median, "
+            f"{stats['chars']:,} chars, {baseline / stats['median_s']:.2f}x"
+        )
+    if args.json is not None:
+        args.json.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
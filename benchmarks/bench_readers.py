@@ -0,0 +1,347 @@
+"""文档读取器综合基准测试。
+
+按给定规模生成合成语料（reportlab 生成的多页 PDF、带表格的长 DOCX、
+高/宽两种 XLSX，以及多种编码的大文本文件），在独立子进程中用各读取器
+反复提取，报告吞吐量（MB/s 及页/行/段落每秒）、p50/p99 延迟和峰值 RSS，
+并可将结果保存为 JSON，与之前的结果比较。
+
+用法::
+
+    python benchmarks/bench_readers.py --runs 5 --json readers.json
+    python benchmarks/bench_readers.py --pdf-pages 2000 --txt-mb 4096 \\
+        --corpus ~/.cache/bench-corpus --json big.json --compare readers.json
+"""
+
+import argparse
+import datetime
+import json
+import math
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_docx import build_document  # noqa: E402
+from bench_xlsx import build_workbook  # noqa: E402
+
+SENTENCE = (
+    "The parties agree that the obligations set out herein survive "
+    "termination of this agreement, 各方同意本协议终止后上述义务继续有效。"
+)
+
+
+def build_pdf(path: Path, pages: int) -> None:
+    """用 reportlab 写出一个多页 PDF，每页约 40 行文本。
+
+    Args:
+        path: 输出文件路径
+        pages: 页数
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+    for page in range(pages):
+        y = 800
+        pdf.drawString(72, y, f"Page {page + 1}")
+        for line in range(40):
+            y -= 18
+            pdf.drawString(72, y, f"{line}: {SENTENCE[:60]}")
+        pdf.showPage()
+    pdf.save()
+
+
+def build_wide_workbook(path: Path, rows: int, cols: int) -> None:
+    """写出一个宽工作簿（列数远多于行数）。
+
+    Args:
+        path: 输出文件路径
+        rows: 数据行数
+        cols: 每行列数
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Wide")
+    for row in range(rows):
+        ws.append([row * cols + col if col % 2 else f"v{col}" for col in range(cols)])
+    wb.save(path)
+
+
+def text_layout(megabytes: int, encoding: str) -> tuple[bytes, int, int]:
+    """计算文本文件的写入方式：每行字节、每块行数和块数（每块约 1 MB）。
+
+    Args:
+        megabytes: 目标大小（MB）
+        encoding: 文本编码
+
+    Returns:
+        tuple[bytes, int, int]: 编码后的一行、每块行数和块数
+    """
+    line = f"{SENTENCE}\n".encode(encoding)
+    if encoding == "utf-16":
+        # BOM 只在文件开头写一次
+        line = line[2:]
+    lines_per_block = max(1, (1024 * 1024) // len(line))
+    blocks = max(1, megabytes * 1024 * 1024 // (len(line) * lines_per_block))
+    return line, lines_per_block, blocks
+
+
+def build_text(path: Path, megabytes: int, encoding: str) -> None:
+    """按指定编码写出约 ``megabytes`` MB 的文本文件，逐块写入以控制内存。
+
+    Args:
+        path: 输出文件路径
+        megabytes: 目标大小（MB）
+        encoding: 文本编码
+    """
+    line, lines_per_block, blocks = text_layout(megabytes, encoding)
+    block = line * lines_per_block
+    with open(path, "wb") as f:
+        if encoding == "utf-16":
+            f.write("".encode("utf-16"))
+        for _ in range(blocks):
+            f.write(block)
+
+
+def build_corpus(directory: Path, args: argparse.Namespace) -> list[dict]:
+    """生成（或复用已存在的）合成语料。
+
+    文件名包含规模参数，因此同一 ``--corpus`` 目录可在多次运行间复用。
+
+    Args:
+        directory: 语料目录
+        args: 命令行参数
+
+    Returns:
+        list[dict]: 每个用例的名称、文件路径、计量单位和单位数量
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    cases = []
+
+    def add(name: str, file_name: str, unit: str, units: int, build) -> None:
+        path = directory / file_name
+        if not path.exists():
+            print(f"generating {file_name} ...", flush=True)
+            partial = path.with_name(path.name + ".partial")
+            build(partial)
+            partial.rename(path)
+        cases.append({"name": name, "path": str(path), "unit": unit, "units": units})
+
+    selected = set(args.readers)
+    if "pdf" in selected:
+        pages = args.pdf_pages
+        add("pdf", f"pdf-{pages}p.pdf", "pages", pages, lambda p: build_pdf(p, pages))
+    if "docx" in selected:
+        sections = args.docx_sections
+        add(
+            "docx",
+            f"docx-{sections}s.docx",
+            "paragraphs",
+            sections * 11,
+            lambda p: build_document(p, sections),
+        )
+    if "xlsx" in selected:
+        rows, cols = args.xlsx_rows, args.xlsx_cols
+        add(
+            "xlsx-tall",
+            f"xlsx-tall-{rows}x{cols}.xlsx",
+            "rows",
+            rows,
+            lambda p: build_workbook(p, rows, cols),
+        )
+        wide_rows, wide_cols = args.wide_rows, args.wide_cols
+        add(
+            "xlsx-wide",
+            f"xlsx-wide-{wide_rows}x{wide_cols}.xlsx",
+            "rows",
+            wide_rows,
+            lambda p: build_wide_workbook(p, wide_rows, wide_cols),
+        )
+    if "txt" in selected:
+        for encoding in args.encodings:
+            _, lines_per_block, blocks = text_layout(args.txt_mb, encoding)
+            add(
+                f"txt-{encoding}",
+                f"txt-{args.txt_mb}mb-{encoding}.txt",
+                "lines",
+                lines_per_block * blocks,
+                lambda p, e=encoding: build_text(p, args.txt_mb, e),
+            )
+    return cases
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """按最近秩法计算百分位数。
+
+    Args:
+        samples: 样本
+        q: 百分位（0-100）
+
+    Returns:
+        float: 百分位数
+    """
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_bytes() -> int | None:
+    """返回当前进程的峰值 RSS，平台不支持时返回 None。
+
+    Returns:
+        int | None: 峰值 RSS（字节）
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(path: str, runs: int) -> dict:
+    """在当前进程中反复提取一个文件（由子进程调用）。
+
+    Args:
+        path: 文档路径
+        runs: 提取次数
+
+    Returns:
+        dict: 各次耗时、提取的字符数、导入后和结束时的峰值 RSS
+    """
+    from mcp_documents_reader import DocumentReaderFactory
+
+    reader = DocumentReaderFactory.get_reader(path)
+    baseline = peak_rss_bytes()
+    samples = []
+    chars = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        chars = len(reader.read(path))
+        samples.append(time.perf_counter() - started)
+    return {
+        "reader": type(reader).__name__,
+        "samples": samples,
+        "chars": chars,
+        "baseline_rss_bytes": baseline,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def run_case(case: dict, runs: int) -> dict:
+    """在独立子进程中运行一个用例，使峰值 RSS 互不影响。
+
+    Args:
+        case: build_corpus 返回的用例
+        runs: 提取次数
+
+    Returns:
+        dict: 用例结果
+    """
+    completed = subprocess.run(
+        [sys.executable, __file__, "--measure", case["path"], "--runs", str(runs)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    measured = json.loads(completed.stdout)
+    samples = measured.pop("samples")
+    file_bytes = Path(case["path"]).stat().st_size
+    p50 = percentile(samples, 50)
+    return {
+        **measured,
+        "file_bytes": file_bytes,
+        "unit": case["unit"],
+        "units": case["units"],
+        "latency_s": {
+            "p50": p50,
+            "p99": percentile(samples, 99),
+            "min": min(samples),
+            "max": max(samples),
+        },
+        "mb_per_s": file_bytes / 1024 / 1024 / p50,
+        "units_per_s": case["units"] / p50,
+    }
+
+
+def main() -> int:
+    """运行读取器基准测试。
+
+    Returns:
+        int: 进程退出码
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--readers",
+        nargs="+",
+        choices=["pdf", "docx", "xlsx", "txt"],
+        default=["pdf", "docx", "xlsx", "txt"],
+        help="要测试的读取器",
+    )
+    parser.add_argument("--pdf-pages", type=int, default=200, help="PDF 页数")
+    parser.add_argument("--docx-sections", type=int, default=500, help="DOCX 章节数")
+    parser.add_argument("--xlsx-rows", type=int, default=50000, help="高表行数")
+    parser.add_argument("--xlsx-cols", type=int, default=10, help="高表列数")
+    parser.add_argument("--wide-rows", type=int, default=200, help="宽表行数")
+    parser.add_argument("--wide-cols", type=int, default=2000, help="宽表列数")
+    parser.add_argument("--txt-mb", type=int, default=64, help="每个文本文件的 MB 数")
+    parser.add_argument(
+        "--encodings",
+        nargs="+",
+        default=["utf-8", "gbk", "utf-16"],
+        help="文本文件编码",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="每个用例的运行次数")
+    parser.add_argument("--corpus", type=Path, help="语料目录（保留并复用生成的文件）")
+    parser.add_argument("--json", type=Path, help="将结果写入 JSON 文件")
+    parser.add_argument("--compare", type=Path, help="与之前的 JSON 结果比较 p50")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        print(json.dumps(measure(args.measure, args.runs)))
+        return 0
+
+    result: dict = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "cases": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus.expanduser() if args.corpus else Path(tmp)
+        for case in build_corpus(corpus, args):
+            result["cases"][case["name"]] = run_case(case, args.runs)
+
+    previous = {}
+    if args.compare is not None:
+        previous = json.loads(args.compare.read_text(encoding="utf-8"))["cases"]
+    for name, stats in result["cases"].items():
+        rss = stats["peak_rss_bytes"]
+        line = (
+            f"{name:>10}: p50 {stats['latency_s']['p50']:.3f} s, "
+            f"p99 {stats['latency_s']['p99']:.3f} s, "
+            f"{stats['mb_per_s']:,.1f} MB/s, "
+            f"{stats['units_per_s']:,.0f} {stats['unit']}/s, "
+            f"peak RSS {f'{rss / 1024 / 1024:,.0f} MB' if rss else 'n/a'}"
+        )
+        if name in previous:
+            before = previous[name]["latency_s"]["p50"]
+            line += f", {before / stats['latency_s']['p50']:.2f}x vs previous"
+        print(line)
+    if args.json is not None:
+        args.json.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
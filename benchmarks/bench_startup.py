@@ -0,0 +1,109 @@
+"""MCP 服务器冷启动基准测试。
+
+测量从启动服务器进程到收到第一个 ``initialize`` 响应所需的时间，
+用于防止启动耗时回归（例如在模块顶层重新导入重量级文档库）。
+
+用法::
+
+    python benchmarks/bench_startup.py --runs 20 --json startup.json --max-ms 1500
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SERVER_SCRIPT = PROJECT_ROOT / "mcp_documents_reader.py"
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "bench-startup", "version": "0"},
+    },
+}
+
+
+def measure_startup() -> float:
+    """启动一次服务器并返回到首个 initialize 响应的耗时。
+
+    Returns:
+        float: 耗时（毫秒）
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, str(SERVER_SCRIPT)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        assert process.stdin is not None and process.stdout is not None
+        process.stdin.write(json.dumps(INITIALIZE_REQUEST) + "\n")
+        process.stdin.flush()
+        for line in process.stdout:
+            message = json.loads(line)
+            if message.get("id") == INITIALIZE_REQUEST["id"]:
+                return (time.perf_counter() - started) * 1000
+        raise RuntimeError("Server exited before answering initialize")
+    finally:
+        process.kill()
+        process.wait()
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """计算耗时样本的统计值。
+
+    Args:
+        samples: 耗时样本（毫秒）
+
+    Returns:
+        dict[str, float]: 最小值、中位数、p90 和最大值
+    """
+    ordered = sorted(samples)
+    return {
+        "min_ms": ordered[0],
+        "median_ms": statistics.median(ordered),
+        "p90_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+        "max_ms": ordered[-1],
+    }
+
+
+def main() -> int:
+    """运行启动基准测试。
+
+    Returns:
+        int: 进程退出码，中位数超过 ``--max-ms`` 时为 1
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="启动次数")
+    parser.add_argument("--json", type=Path, help="将结果写入 JSON 文件")
+    parser.add_argument("--max-ms", type=float, help="中位数耗时上限（毫秒）")
+    args = parser.parse_args()
+
+    # 预热一次，排除首次导入时生成字节码缓存的开销
+    measure_startup()
+    samples = [measure_startup() for _ in range(args.runs)]
+    result = {"runs": args.runs, **summarize(samples), "samples_ms": samples}
+
+    for name in ("min_ms", "median_ms", "p90_ms", "max_ms"):
+        print(f"{name:>10}: {result[name]:.1f}")
+    if args.json is not None:
+        args.json.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    if args.max_ms is not None and result["median_ms"] > args.max_ms:
+        print(f"Median startup {result['median_ms']:.1f} ms exceeds {args.max_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
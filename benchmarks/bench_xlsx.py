@@ -0,0 +1,125 @@
+"""XLSX 解析引擎基准测试。
+
+生成一个合成工作簿（数字、字符串、日期和公式混合），分别用 openpyxl
+引擎和流式 XML 引擎提取文本，比较耗时并校验两者输出一致。
+
+用法::
+
+    python benchmarks/bench_xlsx.py --rows 100000 --cols 10 --runs 3 --json xlsx.json
+"""
+
+import argparse
+import datetime
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from mcp_documents_reader import ExcelReader  # noqa: E402
+
+ENGINES = ExcelReader.engines
+
+
+def build_workbook(path: Path, rows: int, cols: int) -> None:
+    """写出一个合成工作簿。
+
+    Args:
+        path: 输出文件路径
+        rows: 数据行数
+        cols: 每行列数
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Data")
+    ws.append([f"col{col}" for col in range(cols)])
+    start = datetime.date(2020, 1, 1)
+    for row in range(rows):
+        values: list = []
+        for col in range(cols):
+            kind = col % 4
+            if kind == 0:
+                values.append(row * cols + col)
+            elif kind == 1:
+                values.append(f"text {row % 1000}")
+            elif kind == 2:
+                values.append(start + datetime.timedelta(days=row % 3650))
+            else:
+                values.append(f"=A{row + 2}*2")
+        ws.append(values)
+    wb.save(path)
+
+
+def measure(path: Path, engine: str) -> tuple[float, str]:
+    """用指定引擎提取一次工作簿文本。
+
+    Args:
+        path: 工作簿路径
+        engine: 引擎名称
+
+    Returns:
+        tuple[float, str]: 耗时（秒）和提取的文本
+    """
+    started = time.perf_counter()
+    text = ExcelReader(engine=engine).read(str(path))
+    return time.perf_counter() - started, text
+
+
+def main() -> int:
+    """运行 XLSX 引擎基准测试。
+
+    Returns:
+        int: 进程退出码，两个引擎输出不一致时为 1
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000, help="数据行数")
+    parser.add_argument("--cols", type=int, default=10, help="每行列数")
+    parser.add_argument("--runs", type=int, default=3, help="每个引擎的运行次数")
+    parser.add_argument("--json", type=Path, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.xlsx"
+        build_workbook(path, args.rows, args.cols)
+        result: dict = {
+            "rows": args.rows,
+            "cols": args.cols,
+            "file_bytes": path.stat().st_size,
+            "engines": {},
+        }
+        outputs = {}
+        for engine in ENGINES:
+            samples = []
+            for _ in range(args.runs):
+                seconds, outputs[engine] = measure(path, engine)
+                samples.append(seconds)
+            median = statistics.median(samples)
+            result["engines"][engine] = {
+                "median_s": median,
+                "min_s": min(samples),
+                "cells_per_s": args.rows * args.cols / median,
+            }
+
+    baseline = result["engines"][ENGINES[0]]["median_s"]
+    for engine, stats in result["engines"].items():
+        print(
+            f"{engine:>9}: {stats['median_s']:.3f} s median, "
+            f"{stats['cells_per_s']:,.0f} cells/s, "
+            f"{baseline / stats['median_s']:.2f}x"
+        )
+    result["identical"] = len(set(outputs.values())) == 1
+    if args.json is not None:
+        args.json.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    if not result["identical"]:
+        print("Engines produced different text")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
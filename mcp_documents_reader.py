@@ -1,181 +1,4718 @@
+import argparse
+import asyncio
+import atexit
+import base64
+import bisect
+import codecs
+import contextvars
+import functools
+import hashlib
+import heapq
+import inspect
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
 import os
+import posixpath
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zipfile
+import zlib
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from pathlib import Path
+from typing import Any, BinaryIO, Callable, Generator, Iterable, Iterator, TypeVar, cast
+from xml.etree import ElementTree
 
-from docx import Document as DocxDocument
 from mcp.server.fastmcp import FastMCP
-from openpyxl import load_workbook
-from pypdf import PdfReader as PyPdfReader
 from typing_extensions import override
 
+# The document backends (python-docx, pypdf, openpyxl) are imported by the
+# readers on first use, so sessions that never touch a format never pay for it.
+
 mcp = FastMCP("Document Reader")
 
+T = TypeVar("T")
+Block = tuple[Any, str]
+
+ENV_PREFIX = "MCP_DOCUMENTS_READER_"
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.environ.get(ENV_PREFIX + name)
+    return int(value) if value else default
+
+
+def _env_flag(name: str) -> bool:
+    """Read a boolean setting from the environment"""
+    value = os.environ.get(ENV_PREFIX + name, "")
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+DEFAULT_CHUNK_CHARS = 20000
+
+
+def encode_cursor(position: Any, offset: int, primed: bool) -> str:
+    """Encode a resume point as an opaque cursor string"""
+    payload = json.dumps([position, offset, primed], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, int, bool]:
+    """Decode a cursor produced by :func:`encode_cursor`"""
+    try:
+        position, offset, primed = json.loads(base64.urlsafe_b64decode(cursor))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return position, offset, bool(primed)
+
+
+def _utf8_size(text: str) -> int:
+    """Return the length of ``text`` encoded as UTF-8"""
+    return len(text.encode("utf-8", "surrogatepass"))
+
+
+def _utf8_prefix(text: str, max_bytes: int) -> int:
+    """Return how many leading characters of ``text`` fit in ``max_bytes``"""
+    if max_bytes <= 0:
+        return 0
+    encoded = text.encode("utf-8", "surrogatepass")
+    if len(encoded) <= max_bytes:
+        return len(text)
+    cut = max_bytes
+    # Back up to the first byte of the character the budget splits
+    while cut and encoded[cut] & 0xC0 == 0x80:
+        cut -= 1
+    return len(encoded[:cut].decode("utf-8", "surrogatepass"))
+
+
+class ErrorMessage(str):
+    """Message returned in place of a document's text when extraction fails
+
+    Being a ``str``, it reads like any other result, while callers that must
+    tell failures apart (the cache, the index) check its type rather than
+    guessing from text that may legitimately start with "Error".
+    """
+
+
+class ExtractionInterrupted(Exception):
+    """Extraction stopped early by a deadline or a cancellation
+
+    ``partial`` holds the text extracted before it stopped, where known.
+    """
+
+    def __init__(self, message: str, partial: str = "") -> None:
+        super().__init__(message)
+        self.partial = partial
+
+
+_cancellation: contextvars.ContextVar["Cancellation | None"] = contextvars.ContextVar(
+    "cancellation", default=None
+)
+
+
+class Cancellation:
+    """Deadline and cancellation flag checked cooperatively during extraction
+
+    Entering a token makes it current in the running context; readers call
+    :func:`check_interrupted` between pages, rows, paragraphs and text
+    blocks, so an expired or cancelled extraction stops within one of them.
+    A token also stops when the token that was current when it was entered
+    does. Its state is plain data, so it can be pickled to a process
+    executor, where its deadline still applies.
+    """
+
+    def __init__(self, timeout_s: float | None = None) -> None:
+        self.timeout_s = timeout_s
+        self.deadline = time.monotonic() + timeout_s if timeout_s else None
+        self.cancelled = False
+        self.parent: Cancellation | None = None
+
+    @staticmethod
+    def current() -> "Cancellation | None":
+        """The token of the running context, if any"""
+        return _cancellation.get()
+
+    def cancel(self) -> None:
+        """Ask extraction under this token to stop"""
+        self.cancelled = True
+
+    def reason(self) -> str | None:
+        """Why extraction should stop, or None to carry on"""
+        if self.cancelled:
+            return "Extraction cancelled"
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return f"Extraction timed out after {self.timeout_s:g} s"
+        return self.parent.reason() if self.parent is not None else None
+
+    def check(self) -> None:
+        """Raise :class:`ExtractionInterrupted` if extraction should stop"""
+        reason = self.reason()
+        if reason is not None:
+            raise ExtractionInterrupted(reason)
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call ``func`` with this token current"""
+        with self:
+            return func(*args, **kwargs)
+
+    def __enter__(self) -> "Cancellation":
+        self.parent = _cancellation.get()
+        self._reset = _cancellation.set(self)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        _cancellation.reset(self._reset)
+
+
+def check_interrupted() -> None:
+    """Raise :class:`ExtractionInterrupted` if the current token says to stop"""
+    token = _cancellation.get()
+    if token is not None:
+        token.check()
+
+
+class Metrics:
+    """Thread-safe call counters and latency histograms for tools and readers
+
+    Every operation, keyed by group (``"tools"`` or ``"readers"``) and name,
+    counts calls, errors by type, bytes read and characters returned, and
+    sorts its latencies into fixed histogram buckets. Extraction cache
+    lookups are counted as hits and misses, and reads that shared another
+    read's extraction as coalesced. With ``prometheus_path`` set, the
+    metrics are written there in the Prometheus text format at most every
+    ``prometheus_interval`` seconds, for a node exporter textfile collector.
+    """
+
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(
+        self, prometheus_path: str | None = None, prometheus_interval: float = 15
+    ) -> None:
+        self.prometheus_path = prometheus_path
+        self.prometheus_interval = prometheus_interval
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_env(cls) -> "Metrics":
+        """Build metrics configured from ``MCP_DOCUMENTS_READER_METRICS_*``"""
+        return cls(
+            prometheus_path=os.environ.get(ENV_PREFIX + "METRICS_FILE") or None,
+            prometheus_interval=_env_int("METRICS_INTERVAL", 15),
+        )
+
+    def reset(self) -> None:
+        """Forget everything recorded so far"""
+        with self._lock:
+            self.started = time.time()
+            self._operations: dict[tuple[str, str], dict[str, Any]] = {}
+            self._cache = {"hits": 0, "misses": 0, "coalesced": 0}
+            self._dumped = 0.0
+
+    def observe(
+        self,
+        group: str,
+        name: str,
+        seconds: float,
+        bytes_in: int = 0,
+        chars_out: int = 0,
+        error: str | None = None,
+    ) -> None:
+        """Record one call of an operation"""
+        with self._lock:
+            stats = self._operation(group, name)
+            stats["calls"] += 1
+            stats["bytes_in"] += bytes_in
+            stats["chars_out"] += chars_out
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["buckets"][bisect.bisect_left(self.buckets, seconds)] += 1
+            if error is not None:
+                stats["errors"][error] = stats["errors"].get(error, 0) + 1
+        self._maybe_dump()
+
+    def export(self) -> dict[tuple[str, str], dict[str, Any]]:
+        """Return a copy of the raw per-operation records, for :meth:`merge`"""
+        with self._lock:
+            return {
+                key: {
+                    **stats,
+                    "errors": dict(stats["errors"]),
+                    "buckets": list(stats["buckets"]),
+                }
+                for key, stats in self._operations.items()
+            }
+
+    def merge(self, operations: dict[tuple[str, str], dict[str, Any]]) -> None:
+        """Add records exported by another instance, e.g. in a worker process"""
+        with self._lock:
+            for (group, name), other in operations.items():
+                stats = self._operation(group, name)
+                for field in ("calls", "bytes_in", "chars_out", "seconds"):
+                    stats[field] += other[field]
+                stats["max_seconds"] = max(stats["max_seconds"], other["max_seconds"])
+                stats["buckets"] = [
+                    a + b for a, b in zip(stats["buckets"], other["buckets"])
+                ]
+                for kind, count in other["errors"].items():
+                    stats["errors"][kind] = stats["errors"].get(kind, 0) + count
+        self._maybe_dump()
+
+    def cache_lookup(self, hit: bool) -> None:
+        """Record an extraction cache hit or miss"""
+        with self._lock:
+            self._cache["hits" if hit else "misses"] += 1
+
+    def coalesced(self) -> None:
+        """Record a read that waited for an identical in-flight extraction"""
+        with self._lock:
+            self._cache["coalesced"] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the metrics as JSON-serialisable data"""
+        with self._lock:
+            hits, misses = self._cache["hits"], self._cache["misses"]
+            result: dict[str, Any] = {
+                "uptime_s": round(time.time() - self.started, 3),
+                "cache": {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": round(hits / (hits + misses), 4)
+                    if hits + misses
+                    else None,
+                    "coalesced": self._cache["coalesced"],
+                },
+                "tools": {},
+                "readers": {},
+            }
+            for (group, name), stats in sorted(self._operations.items()):
+                calls = stats["calls"]
+                cumulative = list(itertools.accumulate(stats["buckets"]))
+                result.setdefault(group, {})[name] = {
+                    "calls": calls,
+                    "errors": sum(stats["errors"].values()),
+                    "errors_by_type": dict(stats["errors"]),
+                    "bytes_in": stats["bytes_in"],
+                    "chars_out": stats["chars_out"],
+                    "latency_s": {
+                        "sum": round(stats["seconds"], 6),
+                        "mean": round(stats["seconds"] / calls, 6),
+                        "p50": self._quantile(cumulative, 0.5),
+                        "p99": self._quantile(cumulative, 0.99),
+                        "max": round(stats["max_seconds"], 6),
+                        "buckets": {
+                            str(bound): count
+                            for bound, count in zip([*self.buckets, "+Inf"], cumulative)
+                        },
+                    },
+                }
+            return result
+
+    def prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        prefix = "mcp_documents_reader"
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_uptime_seconds Seconds since the metrics started",
+            f"# TYPE {prefix}_uptime_seconds gauge",
+            f"{prefix}_uptime_seconds {snapshot['uptime_s']}",
+        ]
+        for outcome in ("hits", "misses", "coalesced"):
+            metric = f"{prefix}_cache_{outcome}_total"
+            lines += [
+                f"# HELP {metric} Extraction cache {outcome}",
+                f"# TYPE {metric} counter",
+                f"{metric} {snapshot['cache'][outcome]}",
+            ]
+        operations = [
+            (group, name, stats)
+            for group in ("tools", "readers")
+            for name, stats in snapshot[group].items()
+        ]
+        counters = (
+            ("calls", "Calls"),
+            ("bytes_in", "Bytes of input documents"),
+            ("chars_out", "Characters of text returned"),
+        )
+        for key, description in counters:
+            metric = f"{prefix}_{key}_total"
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+            lines += [
+                f'{metric}{{group="{group}",name="{name}"}} {stats[key]}'
+                for group, name, stats in operations
+            ]
+        metric = f"{prefix}_errors_total"
+        lines += [f"# HELP {metric} Errors by type", f"# TYPE {metric} counter"]
+        lines += [
+            f'{metric}{{group="{group}",name="{name}",type="{kind}"}} {count}'
+            for group, name, stats in operations
+            for kind, count in stats["errors_by_type"].items()
+        ]
+        metric = f"{prefix}_latency_seconds"
+        lines += [f"# HELP {metric} Call latency", f"# TYPE {metric} histogram"]
+        for group, name, stats in operations:
+            labels = f'group="{group}",name="{name}"'
+            latency = stats["latency_s"]
+            lines += [
+                f'{metric}_bucket{{{labels},le="{bound}"}} {count}'
+                for bound, count in latency["buckets"].items()
+            ]
+            lines += [
+                f"{metric}_sum{{{labels}}} {latency['sum']}",
+                f"{metric}_count{{{labels}}} {stats['calls']}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def dump(self) -> None:
+        """Write the Prometheus text to ``prometheus_path`` atomically"""
+        if self.prometheus_path is None:
+            return
+        folder = os.path.dirname(self.prometheus_path) or "."
+        os.makedirs(folder, exist_ok=True)
+        partial = f"{self.prometheus_path}.{os.getpid()}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(partial, self.prometheus_path)
+
+    def _maybe_dump(self) -> None:
+        if self.prometheus_path is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._dumped < self.prometheus_interval:
+                return
+            self._dumped = now
+        try:
+            self.dump()
+        except OSError:
+            pass
+
+    def _operation(self, group: str, name: str) -> dict[str, Any]:
+        """The record of an operation, created empty; call with the lock held"""
+        stats = self._operations.get((group, name))
+        if stats is None:
+            stats = self._operations[(group, name)] = {
+                "calls": 0,
+                "errors": {},
+                "bytes_in": 0,
+                "chars_out": 0,
+                "seconds": 0.0,
+                "max_seconds": 0.0,
+                "buckets": [0] * (len(self.buckets) + 1),
+            }
+        return stats
+
+    def _quantile(self, cumulative: list[int], q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (None if unbounded)"""
+        rank = q * cumulative[-1]
+        index = bisect.bisect_left(cumulative, rank)
+        return self.buckets[index] if index < len(self.buckets) else None
+
+
+metrics = Metrics.from_env()
+
 
 class DocumentReader(ABC):
     """Abstract base class for document readers"""
 
+    name = "document"
+    empty_message = "No text found in the document."
+    separator = "\n"
+    search_window = 4096
+    # Rough extraction cost of a byte of input relative to plain text, used to
+    # schedule calls fairly
+    cost_factor = 1.0
+
     @abstractmethod
     def read(self, file_path: str) -> str:
         """Read and extract text from a document"""
         pass
 
+    def iter_blocks(self, file_path: str, start: Any = None) -> Iterator[Block]:  # noqa: ARG002
+        """Yield (position, text) blocks of the document in reading order
+
+        Blocks are joined with ``separator`` to form the extracted text.
+        ``position`` is a JSON-serialisable resume point: passing it back as
+        ``start`` restarts iteration at that block without re-extracting the
+        blocks before it. The default yields the whole of ``read()``.
+        """
+        yield 0, self.read(file_path)
+
+    def iter_chunks(
+        self,
+        file_path: str,
+        cursor: str | None = None,
+        max_chars: int = DEFAULT_CHUNK_CHARS,
+        max_bytes: int | None = None,
+    ) -> Generator[tuple[str, str | None], None, None]:
+        """Yield (chunk, next_cursor) pairs of at most ``max_chars`` characters
+
+        With ``max_bytes``, chunks are also capped at that many bytes of UTF-8.
+        ``next_cursor`` is None for the final chunk; passing any other cursor
+        back resumes extraction where that chunk ended.
+        """
+        if max_chars < 1 or (max_bytes is not None and max_bytes < 1):
+            raise ValueError("max_chars and max_bytes must be at least 1")
+        start, skip, primed = (
+            decode_cursor(cursor) if cursor is not None else (None, 0, False)
+        )
+        buffer: list[str] = []
+        size = used = 0
+
+        for position, text in self.iter_blocks(file_path, start):
+            try:
+                check_interrupted()
+            except ExtractionInterrupted as e:
+                e.partial = "".join(buffer)
+                raise
+            block_primed = primed
+            piece = self.separator + text if primed else text
+            primed = True
+            # A skip longer than this block carries on into the next one
+            offset = min(skip, len(piece))
+            skip -= offset
+            while offset < len(piece):
+                take = min(max_chars - size, len(piece) - offset)
+                if max_bytes is not None:
+                    take = _utf8_prefix(piece[offset : offset + take], max_bytes - used)
+                    if take == 0 and not buffer:
+                        # Always make progress, even past a tiny byte budget
+                        take = 1
+                if take == 0:
+                    yield "".join(buffer), encode_cursor(position, offset, block_primed)
+                    buffer, size, used = [], 0, 0
+                    continue
+                part = piece[offset : offset + take]
+                buffer.append(part)
+                size += take
+                if max_bytes is not None:
+                    used += _utf8_size(part)
+                offset += take
+
+        yield "".join(buffer), None
+
+    def remaining(self, file_path: str, cursor: str) -> str | None:  # noqa: ARG002
+        """Describe how much of the document lies past a chunk cursor
+
+        Used to tell callers how much a budgeted read left out. Returns None
+        when that cannot be worked out without extracting the rest.
+        """
+        return None
+
+    def search(
+        self, file_path: str, pattern: re.Pattern[str], context_chars: int = 80
+    ) -> Generator[dict[str, Any], None, None]:
+        """Yield the matches of ``pattern`` in the extracted text, in order
+
+        Blocks are searched as they are extracted, so closing the generator
+        stops extraction. Matches may span blocks as long as they are at most
+        ``search_window`` characters long. Each match is reported as
+        ``{"match", "context", "line", ...}``, where ``line`` is the 1-based
+        line of the extracted text and the remaining keys come from
+        :meth:`location`.
+        """
+        window = max(self.search_window, context_chars)
+        text = ""
+        # Offset of text[0] within the whole extracted text, and the line
+        # number at text[counted]
+        base = counted = 0
+        line = 1
+        # (offset of the block's text, position, block text), oldest first
+        blocks: list[tuple[int, Any, str]] = []
+        searched = 0
+        primed = False
+        stream = self.iter_blocks(file_path)
+        while True:
+            block = next(stream, None)
+            check_interrupted()
+            if block is not None:
+                position, block_text = block
+                if primed:
+                    text += self.separator
+                primed = True
+                blocks.append((base + len(text), position, block_text))
+                text += block_text
+            limit = len(text) if block is None else len(text) - window
+            for match in pattern.finditer(text, searched - base):
+                start, end = match.span()
+                if end > limit:
+                    # More text could still change or extend this match
+                    break
+                offset = base + start
+                index = bisect.bisect_right(blocks, offset, key=lambda b: b[0]) - 1
+                block_offset, position, block_text = blocks[max(index, 0)]
+                line += text.count("\n", counted, start)
+                counted = start
+                found = {
+                    "match": match.group(),
+                    "context": text[
+                        max(0, start - context_chars) : end + context_chars
+                    ],
+                    "line": line,
+                }
+                found.update(self.location(position, block_text, offset - block_offset))
+                yield found
+                searched = base + max(end, start + 1)
+            else:
+                searched = max(searched, base + limit)
+            if block is None:
+                return
+            # Keep the unsearched tail plus the context that precedes it
+            cut = max(0, min(searched - base, len(text)) - context_chars)
+            if cut > counted:
+                line += text.count("\n", counted, cut)
+                counted = cut
+            counted -= cut
+            text = text[cut:]
+            base += cut
+            while len(blocks) > 1 and blocks[1][0] <= base:
+                blocks.pop(0)
+
+    def location(self, position: Any, block: str, offset: int) -> dict[str, Any]:  # noqa: ARG002
+        """Describe where ``offset`` of the block at ``position`` lies
+
+        Used to locate search matches; readers add keys such as ``page`` or
+        ``sheet``/``cell``. The default adds nothing.
+        """
+        return {}
+
+    def inspect(self, file_path: str) -> dict[str, Any]:  # noqa: ARG002
+        """Return format-specific metadata without extracting any text
+
+        Implementations only read headers, zip directories and similar
+        structures, so inspecting a file costs a fraction of reading it.
+        The default reports nothing.
+        """
+        return {}
+
+    def _extract(self, file_path: str) -> str:
+        """Join all blocks, reporting errors and empty documents as messages
+
+        An :class:`ExtractionInterrupted` is raised rather than reported, with
+        the blocks joined so far as its partial text.
+        """
+        started = time.perf_counter()
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        blocks: list[str] = []
+        try:
+            check_interrupted()
+            for _, block in self.iter_blocks(file_path):
+                blocks.append(block)
+                check_interrupted()
+            text = self.separator.join(blocks)
+        except Exception as e:
+            metrics.observe(
+                "readers",
+                self.name,
+                time.perf_counter() - started,
+                bytes_in=size,
+                error=type(e).__name__,
+            )
+            if isinstance(e, ExtractionInterrupted):
+                e.partial = self.separator.join(blocks)
+                raise
+            return ErrorMessage(f"Error reading {self.name}: {str(e)}")
+        metrics.observe(
+            "readers",
+            self.name,
+            time.perf_counter() - started,
+            bytes_in=size,
+            chars_out=len(text),
+        )
+        return text if text else self.empty_message
+
+
+_RELATIONSHIP_ID = (
+    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+)
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _package_relationships(
+    archive: zipfile.ZipFile, part: str
+) -> dict[str, tuple[str, str]]:
+    """Map the relationship ids of an OOXML part to (type, archive path)"""
+    folder, name = posixpath.split(part)
+    try:
+        data = archive.read(posixpath.join(folder, "_rels", name + ".rels"))
+    except KeyError:
+        return {}
+    relationships = {}
+    for rel in ElementTree.fromstring(data).iter(f"{_PACKAGE_REL_NS}Relationship"):
+        target = rel.get("Target", "")
+        if rel.get("TargetMode") == "External":
+            continue
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join(folder, target))
+        relationships[rel.get("Id", "")] = (rel.get("Type", ""), target)
+    return relationships
+
+
+def _main_part(archive: zipfile.ZipFile, default: str) -> str:
+    """Return the archive path of an OOXML package's main document part"""
+    return next(
+        (
+            target
+            for kind, target in _package_relationships(archive, "").values()
+            if kind.endswith("/officeDocument")
+        ),
+        default,
+    )
+
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+(
+    _W_BODY,
+    _W_P,
+    _W_TBL,
+    _W_TR,
+    _W_TC,
+    _W_T,
+    _W_TAB,
+    _W_PTAB,
+    _W_BR,
+    _W_CR,
+    _W_NO_BREAK_HYPHEN,
+    _W_PPR,
+    _W_RPR,
+    _W_TCPR,
+    _W_VMERGE,
+    _W_VAL,
+) = (
+    _WORD_NS + tag
+    for tag in (
+        "body",
+        "p",
+        "tbl",
+        "tr",
+        "tc",
+        "t",
+        "tab",
+        "ptab",
+        "br",
+        "cr",
+        "noBreakHyphen",
+        "pPr",
+        "rPr",
+        "tcPr",
+        "vMerge",
+        "val",
+    )
+)
+_WORD_PREFIX = re.compile(
+    rb'xmlns(?::([\w.-]+))?="'
+    rb'http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+)
+_EXTENDED_PROPERTIES_NS = (
+    "{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}"
+)
+# Properties hold tab stops rather than text, and the VML fallback of a
+# text box repeats the DrawingML choice next to it
+_DOCX_SKIP = {
+    _W_PPR,
+    _W_RPR,
+    "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback",
+}
+_DOCX_CHARS = {
+    _W_TAB: "\t",
+    _W_PTAB: "\t",
+    _W_BR: "\n",
+    _W_CR: "\n",
+    _W_NO_BREAK_HYPHEN: "-",
+}
+
+
+def _docx_text(element: ElementTree.Element, parts: list[str]) -> None:
+    """Append the visible text under a WordprocessingML element to ``parts``"""
+    for child in element:
+        tag = child.tag
+        if tag == _W_T:
+            if child.text:
+                parts.append(child.text)
+        elif tag in _DOCX_CHARS:
+            parts.append(_DOCX_CHARS[tag])
+        elif tag not in _DOCX_SKIP:
+            if tag == _W_P and parts:
+                # A paragraph nested in a text box starts on its own line
+                parts.append("\n")
+            _docx_text(child, parts)
+
+
+def _docx_find(element: ElementTree.Element, tag: str) -> Iterator[ElementTree.Element]:
+    """Yield the outermost ``tag`` elements under an element, in order"""
+    for child in element:
+        if child.tag == tag:
+            yield child
+        elif child.tag not in _DOCX_SKIP:
+            yield from _docx_find(child, tag)
+
+
+def _docx_row_text(row: ElementTree.Element) -> str:
+    """Tab-join the non-empty cells of a table row, each merged cell once"""
+    cells = []
+    # Nested tables are not searched; their text belongs to the outer cell
+    for cell in _docx_find(row, _W_TC):
+        merge = cell.find(f"{_W_TCPR}/{_W_VMERGE}")
+        if merge is not None and merge.get(_W_VAL, "continue") == "continue":
+            continue
+        texts = []
+        for paragraph in _docx_find(cell, _W_P):
+            parts: list[str] = []
+            _docx_text(paragraph, parts)
+            texts.append("".join(parts))
+        text = " ".join(texts).strip()
+        if text:
+            cells.append(text)
+    return "\t".join(cells)
+
 
 class DocxReader(DocumentReader):
-    """DOCX document reader implementation"""
+    """DOCX document reader implementation
+
+    ``engine`` picks the parser. ``"python-docx"`` (the default) returns all
+    body paragraphs followed by all table rows. ``"xml"`` streams
+    ``word/document.xml`` with ``iterparse``: paragraphs and table rows come
+    out in document order, merged cells appear once, and each finished block
+    is dropped from the tree, so memory stays bounded on very long documents.
+    """
+
+    name = "DOCX"
+    empty_message = "No text found in the DOCX."
+    cost_factor = 2.0
+    engines = ("python-docx", "xml")
+    scan_bytes = 1024 * 1024
+
+    def __init__(self, engine: str = "python-docx") -> None:
+        if engine not in self.engines:
+            raise ValueError(
+                f"Unknown DOCX engine '{engine}' (use one of: "
+                f"{', '.join(self.engines)})"
+            )
+        self.engine = engine
 
     @override
     def read(self, file_path: str) -> str:
         """Read and extract text from DOCX file"""
-        try:
-            doc = DocxDocument(file_path)
-            text = []
-
-            for paragraph in doc.paragraphs:
-                if paragraph.text:
-                    text.append(paragraph.text)
-
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        cell_text = " ".join([p.text for p in cell.paragraphs]).strip()
-                        if cell_text:
-                            row_text.append(cell_text)
-                    if row_text:
-                        text.append("\t".join(row_text))
-
-            extracted_text = "\n".join(text)
-            return extracted_text if extracted_text else "No text found in the DOCX."
-        except Exception as e:
-            return f"Error reading DOCX: {str(e)}"
+        return self._extract(file_path)
+
+    @override
+    def iter_blocks(self, file_path: str, start: Any = None) -> Iterator[Block]:
+        """Yield the paragraphs and table rows of a DOCX file
+
+        With the python-docx engine positions are ``["p", paragraph]`` and
+        ``["t", table, row]``; with the xml engine they are ``[block, row]``,
+        counting body paragraphs and tables together, with row 0 for
+        paragraphs and 1-based rows for tables.
+        """
+        if self.engine == "xml":
+            yield from self._iter_xml_blocks(file_path, start)
+            return
+
+        from docx import Document as DocxDocument
+
+        doc = DocxDocument(file_path)
+        kind, *index = start if start is not None else ("p", 0)
+
+        if kind == "p":
+            for number, paragraph in enumerate(doc.paragraphs):
+                if number >= index[0] and paragraph.text:
+                    yield ["p", number], paragraph.text
+            index = [0, 0]
+
+        for table_number, table in enumerate(doc.tables):
+            if table_number < index[0]:
+                continue
+            for row_number, row in enumerate(table.rows):
+                if table_number == index[0] and row_number < index[1]:
+                    continue
+                row_text = []
+                for cell in row.cells:
+                    cell_text = " ".join([p.text for p in cell.paragraphs]).strip()
+                    if cell_text:
+                        row_text.append(cell_text)
+                if row_text:
+                    yield ["t", table_number, row_number], "\t".join(row_text)
+
+    def _iter_xml_blocks(self, file_path: str, start: Any) -> Iterator[Block]:
+        """Stream body paragraphs and table rows straight from the XML"""
+        first = list(start) if start is not None else [0, 0]
+        with zipfile.ZipFile(file_path) as archive:
+            part = _main_part(archive, "word/document.xml")
+            with archive.open(part) as source:
+                # Open elements, and how many paragraphs/tables are open
+                stack: list[ElementTree.Element] = []
+                depth = {_W_P: 0, _W_TBL: 0}
+                block, row = 0, 1
+                events = ElementTree.iterparse(source, events=("start", "end"))
+                for event, element in events:
+                    tag = element.tag
+                    if event == "start":
+                        stack.append(element)
+                        if tag in depth:
+                            depth[tag] += 1
+                        continue
+                    stack.pop()
+                    if tag in depth:
+                        depth[tag] -= 1
+                    if depth[_W_P]:
+                        continue
+                    if tag == _W_TR and depth[_W_TBL] == 1:
+                        if [block, row] >= first:
+                            text = _docx_row_text(element)
+                            if text:
+                                yield [block, row], text
+                        row += 1
+                    elif depth[_W_TBL]:
+                        continue
+                    elif tag == _W_P:
+                        if [block, 0] >= first:
+                            parts: list[str] = []
+                            _docx_text(element, parts)
+                            if parts:
+                                yield [block, 0], "".join(parts)
+                        block += 1
+                    elif tag == _W_TBL:
+                        block += 1
+                        row = 1
+                    # Finished block-level content is no longer needed
+                    if stack and tag != _W_BODY:
+                        stack[-1].remove(element)
+
+    @override
+    def location(self, position: Any, block: str, offset: int) -> dict[str, Any]:
+        """Locate a block by 0-based paragraph/table index and 1-based row
+
+        With the xml engine, ``block`` counts paragraphs and tables together.
+        """
+        if self.engine == "xml":
+            number, row = position
+            return {"block": number, "row": row} if row else {"block": number}
+        if position[0] == "p":
+            return {"paragraph": position[1]}
+        return {"table": position[1], "row": position[2] + 1}
+
+    @override
+    def inspect(self, file_path: str) -> dict[str, Any]:
+        """Count paragraphs and tables, and read the saved document statistics
+
+        The counts come from a byte scan of the decompressed document XML
+        rather than a parse, and include paragraphs inside tables and text
+        boxes. ``pages``, ``words`` and ``characters`` are the statistics the
+        authoring application stored in ``docProps/app.xml``, when present.
+        """
+        with zipfile.ZipFile(file_path) as archive:
+            part = _main_part(archive, "word/document.xml")
+            info: dict[str, Any] = {"xml_bytes": archive.getinfo(part).file_size}
+            info.update(self._count_blocks(archive, part))
+            try:
+                app = ElementTree.fromstring(archive.read("docProps/app.xml"))
+            except KeyError:
+                return info
+        for field in ("Pages", "Words", "Characters"):
+            value = app.findtext(f"{_EXTENDED_PROPERTIES_NS}{field}")
+            if value and value.isdigit():
+                info[field.lower()] = int(value)
+        return info
+
+    @classmethod
+    def _count_blocks(cls, archive: zipfile.ZipFile, part: str) -> dict[str, int]:
+        """Count the paragraph and table start tags of a document part"""
+        counts = {b"p": 0, b"tbl": 0}
+        pattern = None
+        pending = b""
+        with archive.open(part) as source:
+            while True:
+                chunk = source.read(cls.scan_bytes)
+                data = pending + chunk
+                if pattern is None:
+                    declared = _WORD_PREFIX.search(data)
+                    if declared is None and chunk and len(data) < 64 * 1024:
+                        # The root tag declaring the namespace is not complete
+                        pending = data
+                        continue
+                    prefix = declared.group(1) if declared else b"w"
+                    pattern = re.compile(
+                        b"<"
+                        + (re.escape(prefix) + b":" if prefix else b"")
+                        + rb"(p|tbl)[\s/>]"
+                    )
+                # Markup cannot contain "<", so a tag cut off by the chunk
+                # boundary starts at the last one and is counted next round
+                cut = data.rfind(b"<") if chunk else len(data)
+                if cut < 0:
+                    cut = len(data)
+                for kind in pattern.findall(data, 0, cut):
+                    counts[kind] += 1
+                pending = data[cut:]
+                if not chunk:
+                    break
+        return {"paragraphs": counts[b"p"], "tables": counts[b"tbl"]}
+
+
+_pdf_pools: dict[int, ProcessPoolExecutor] = {}
+_pdf_pools_lock = threading.Lock()
+
+
+def _pdf_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared process pool used for parallel PDF extraction"""
+    with _pdf_pools_lock:
+        pool = _pdf_pools.get(workers)
+        if pool is None:
+            # Spawned, not forked: the server already runs executor threads
+            pool = _pdf_pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return pool
+
+
+def _extract_pdf_pages(file_path: str, indices: list[int]) -> list[str]:
+    """Extract the text of the given pages; runs inside a pool worker
+
+    Each worker opens the file itself and memory-maps it, so only the page
+    indices and the extracted text cross the process boundary.
+    """
+    from pypdf import PdfReader as PyPdfReader
+
+    with (
+        open(file_path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        pdf_reader = PyPdfReader(cast(BinaryIO, mapped))
+        return [pdf_reader.pages[index].extract_text() for index in indices]
 
 
 class PdfReader(DocumentReader):
-    """PDF document reader implementation"""
+    """PDF document reader implementation
+
+    Pages are 1-based. ``start_page``/``end_page`` select an inclusive range and
+    ``pages`` an explicit list; only the selected pages are extracted.
+
+    With ``workers`` > 1, selections of at least ``parallel_threshold`` pages
+    are split across a process pool and merged back in page order.
+    """
+
+    name = "PDF"
+    empty_message = "No text found in the PDF."
+    separator = "\n\n"
+    cost_factor = 4.0
+
+    def __init__(
+        self,
+        start_page: int | None = None,
+        end_page: int | None = None,
+        pages: list[int] | None = None,
+        workers: int | None = None,
+        parallel_threshold: int | None = None,
+    ) -> None:
+        if pages is not None and (start_page is not None or end_page is not None):
+            raise ValueError("Use either pages or start_page/end_page, not both")
+        self.start_page = start_page
+        self.end_page = end_page
+        self.pages = pages
+        self.workers = _env_int("PDF_WORKERS", 0) if workers is None else workers
+        self.parallel_threshold = (
+            _env_int("PDF_PARALLEL_THRESHOLD", 64)
+            if parallel_threshold is None
+            else parallel_threshold
+        )
+
+    def page_indices(self, page_count: int) -> list[int]:
+        """Resolve the page selection to 0-based indices for a document"""
+        if self.pages is not None:
+            for number in self.pages:
+                if not 1 <= number <= page_count:
+                    raise ValueError(
+                        f"Page {number} is out of range (document has "
+                        f"{page_count} pages)"
+                    )
+            return [number - 1 for number in self.pages]
+
+        start = 1 if self.start_page is None else self.start_page
+        end = min(self.end_page or page_count, page_count)
+        if start < 1 or (self.start_page is not None and start > page_count):
+            raise ValueError(
+                f"Start page {start} is out of range (document has {page_count} pages)"
+            )
+        if self.end_page is not None and self.end_page < start:
+            raise ValueError(f"End page {self.end_page} is before start page {start}")
+        return list(range(start - 1, end))
 
     @override
     def read(self, file_path: str) -> str:
         """Read and extract text from PDF file"""
+        return self._extract(file_path)
+
+    @override
+    def iter_blocks(self, file_path: str, start: Any = None) -> Iterator[Block]:
+        """Yield the text of each selected page; positions are 0-based indices"""
+        from pypdf import PdfReader as PyPdfReader
+
+        with open(file_path, "rb") as file:
+            pdf_reader = PyPdfReader(file)
+            indices = self.page_indices(len(pdf_reader.pages))
+            if start is not None:
+                if start not in indices:
+                    raise ValueError("Invalid cursor")
+                indices = indices[indices.index(start) :]
+
+            if self.workers > 1 and len(indices) >= self.parallel_threshold:
+                texts = self._extract_parallel(file_path, indices)
+            else:
+                texts = (pdf_reader.pages[index].extract_text() for index in indices)
+
+            for index, page_text in zip(indices, texts):
+                if page_text:
+                    yield index, page_text.strip()
+
+    @override
+    def remaining(self, file_path: str, cursor: str) -> str | None:
+        """Count the selected pages from the cursor's page onwards"""
+        from pypdf import PdfReader as PyPdfReader
+
+        position = decode_cursor(cursor)[0]
+        with open(file_path, "rb") as file:
+            indices = self.page_indices(len(PyPdfReader(file).pages))
+        count = sum(1 for index in indices if index >= position)
+        return f"{count} page(s) starting at page {position + 1}"
+
+    @override
+    def location(self, position: Any, block: str, offset: int) -> dict[str, Any]:
+        """Locate a block by its 1-based page number"""
+        return {"page": position + 1}
+
+    @override
+    def inspect(self, file_path: str) -> dict[str, Any]:
+        """Report the page count, encryption and outline of a PDF
+
+        Only the cross-reference table, page tree and outline are read; no
+        content stream is parsed. Outline entries are flattened to
+        ``{"title", "page", "level"}`` with 1-based pages (None when an entry
+        does not point at a page of this document).
+        """
+        from pypdf import PdfReader as PyPdfReader
+
+        with open(file_path, "rb") as file:
+            pdf_reader = PyPdfReader(file)
+            info: dict[str, Any] = {
+                "pages": len(pdf_reader.pages),
+                "encrypted": pdf_reader.is_encrypted,
+            }
+            outline: list[dict[str, Any]] = []
+            self._flatten_outline(pdf_reader, pdf_reader.outline, 0, outline)
+            info["outline"] = outline
+        return info
+
+    @classmethod
+    def _flatten_outline(
+        cls, pdf_reader: Any, items: list[Any], level: int, out: list[dict[str, Any]]
+    ) -> None:
+        """Append outline entries depth-first; nested lists are child entries"""
+        for item in items:
+            if isinstance(item, list):
+                cls._flatten_outline(pdf_reader, item, level + 1, out)
+                continue
+            try:
+                page = pdf_reader.get_destination_page_number(item)
+            except Exception:
+                page = None
+            out.append(
+                {
+                    "title": str(item.title or ""),
+                    "page": page + 1 if page is not None and page >= 0 else None,
+                    "level": level,
+                }
+            )
+
+    def _extract_parallel(self, file_path: str, indices: list[int]) -> Iterator[str]:
+        """Extract pages on the process pool, yielding texts in page order"""
+        pool = _pdf_pool(self.workers)
+        # Several batches per worker keep the pool busy when pages differ in cost
+        size = max(1, -(-len(indices) // (self.workers * 4)))
+        futures = [
+            pool.submit(_extract_pdf_pages, file_path, indices[i : i + size])
+            for i in range(0, len(indices), size)
+        ]
         try:
-            with open(file_path, "rb") as file:
-                pdf_reader = PyPdfReader(file)
-                text = []
+            for future in futures:
+                while future not in wait([future], timeout=0.1).done:
+                    check_interrupted()
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
 
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text.append(page_text.strip())
 
-                extracted_text = "\n\n".join(text)
-                return extracted_text if extracted_text else "No text found in the PDF."
-        except Exception as e:
-            return f"Error reading PDF: {str(e)}"
+class LineIndex:
+    """Sparse newline index of a text file
+
+    ``counts[i]`` is the number of newlines in the first ``i`` segments of
+    ``segment_bytes`` bytes, so a line is located by a binary search followed
+    by a scan of at most one segment. Indexes are kept in memory and, when
+    ``MCP_DOCUMENTS_READER_INDEX_DIR`` or ``MCP_DOCUMENTS_READER_CACHE_DIR``
+    is set, persisted to disk keyed on the file's path, size and mtime.
+    """
+
+    segment_bytes = 64 * 1024
+    _memory: OrderedDict[tuple[str, int, int], "LineIndex"] = OrderedDict()
+    _memory_entries = 32
+    _lock = threading.Lock()
+
+    def __init__(self, counts: array, size: int, ends_with_newline: bool) -> None:
+        self.counts = counts
+        self.size = size
+        self.ends_with_newline = ends_with_newline
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines, counting a final line without a trailing newline"""
+        newlines = self.counts[-1]
+        return newlines + (0 if self.ends_with_newline or not self.size else 1)
+
+    @classmethod
+    def build(cls, data: mmap.mmap) -> "LineIndex":
+        """Count the newlines of every segment in one sequential pass"""
+        counts = array("Q", [0])
+        for start in range(0, len(data), cls.segment_bytes):
+            segment = data[start : start + cls.segment_bytes]
+            counts.append(counts[-1] + segment.count(b"\n"))
+        return cls(counts, len(data), data[-1:] == b"\n")
+
+    @classmethod
+    def directory(cls) -> str | None:
+        """Directory where indexes are persisted, or None to keep them in memory"""
+        index_dir = os.environ.get(ENV_PREFIX + "INDEX_DIR")
+        cache_dir = os.environ.get(ENV_PREFIX + "CACHE_DIR")
+        if index_dir:
+            return index_dir
+        return os.path.join(cache_dir, "line-index") if cache_dir else None
+
+    @classmethod
+    def for_file(cls, file_path: str, data: mmap.mmap) -> "LineIndex":
+        """Return the index of a file, loading or building it on first use"""
+        index = cls.cached(file_path)
+        if index is None:
+            index = cls.build(data)
+            index_path = cls._index_path(file_path)
+            if index_path is not None:
+                index._save(index_path)
+            cls._remember(file_path, index)
+        return index
+
+    @classmethod
+    def cached(cls, file_path: str) -> "LineIndex | None":
+        """Return the index of a file if one is in memory or on disk"""
+        signature = ExtractionCache.signature(file_path)
+        assert signature is not None
+        with cls._lock:
+            index = cls._memory.get(signature)
+            if index is not None:
+                cls._memory.move_to_end(signature)
+                return index
+
+        index_path = cls._index_path(file_path)
+        index = cls._load(index_path) if index_path is not None else None
+        if index is not None:
+            cls._remember(file_path, index)
+        return index
+
+    @classmethod
+    def _index_path(cls, file_path: str) -> str | None:
+        directory = cls.directory()
+        if directory is None:
+            return None
+        signature = ExtractionCache.signature(file_path)
+        name = hashlib.sha256(repr(signature).encode("utf-8")).hexdigest()
+        return os.path.join(directory, name + ".lines")
+
+    @classmethod
+    def _remember(cls, file_path: str, index: "LineIndex") -> None:
+        signature = ExtractionCache.signature(file_path)
+        assert signature is not None
+        with cls._lock:
+            cls._memory[signature] = index
+            while len(cls._memory) > cls._memory_entries:
+                cls._memory.popitem(last=False)
+
+    @classmethod
+    def _load(cls, index_path: str) -> "LineIndex | None":
+        try:
+            with open(index_path, "rb") as f:
+                header = array("Q")
+                header.fromfile(f, 3)
+                segment_bytes, size, ends_with_newline = header
+                if segment_bytes != cls.segment_bytes:
+                    return None
+                counts = array("Q")
+                counts.frombytes(f.read())
+        except (OSError, EOFError):
+            return None
+        return cls(counts, size, bool(ends_with_newline))
+
+    def _save(self, index_path: str) -> None:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        header = array(
+            "Q", [self.segment_bytes, self.size, int(self.ends_with_newline)]
+        )
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            header.tofile(f)
+            self.counts.tofile(f)
+        os.replace(temp_path, index_path)
+
+    def line_offset(self, data: mmap.mmap, line: int) -> int:
+        """Byte offset where a 1-based line starts (the file size past the end)"""
+        skip = line - 1
+        if skip <= 0:
+            return 0
+        if skip > self.counts[-1]:
+            return self.size
+        # The skip-th newline lies in the segment before the first count >= skip
+        segment = bisect.bisect_left(self.counts, skip) - 1
+        position = segment * self.segment_bytes
+        for _ in range(skip - self.counts[segment]):
+            position = data.find(b"\n", position) + 1
+        return position
 
 
 class TxtReader(DocumentReader):
-    """TXT document reader implementation"""
+    """TXT document reader implementation
+
+    The encoding is detected once, from a byte-order mark or a bounded sample
+    of the file, and the file is then decoded in a single incremental pass.
+    An all-ASCII sample fits every candidate, so it is inconclusive: such
+    files are decoded strictly, and the first bytes that do not fit switch
+    the read, once, to the next candidate that fits them. The encoding used
+    is kept in ``encoding``.
+
+    ``offset``/``length`` select a byte range and ``start_line``/``end_line`` an
+    inclusive, 1-based line range. Ranges are served from a memory map, using a
+    :class:`LineIndex` for line ranges, so only the selected window is decoded.
+    """
+
+    name = "TXT"
+    empty_message = "No text found in the TXT file."
+    separator = ""
+    encodings = ["utf-8", "gbk", "gb2312", "latin-1"]
+    # UTF-32 marks come first: the UTF-32-LE mark starts with the UTF-16-LE one
+    boms = [
+        (codecs.BOM_UTF32_LE, "utf-32"),
+        (codecs.BOM_UTF32_BE, "utf-32"),
+        (codecs.BOM_UTF8, "utf-8-sig"),
+        (codecs.BOM_UTF16_LE, "utf-16"),
+        (codecs.BOM_UTF16_BE, "utf-16"),
+    ]
+    sample_bytes = 64 * 1024
+    _non_ascii = re.compile(rb"[\x80-\xff]")
+    inspect_samples = 8
+    block_chars = 64 * 1024
+    block_bytes = 1024 * 1024
+
+    def __init__(
+        self,
+        offset: int | None = None,
+        length: int | None = None,
+        start_line: int | None = None,
+        end_line: int | None = None,
+    ) -> None:
+        byte_range = offset is not None or length is not None
+        line_range = start_line is not None or end_line is not None
+        if byte_range and line_range:
+            raise ValueError(
+                "Use either offset/length or start_line/end_line, not both"
+            )
+        if (offset or 0) < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        if (start_line is not None and start_line < 1) or (
+            end_line is not None and end_line < (start_line or 1)
+        ):
+            raise ValueError("Line numbers start at 1 and end_line >= start_line")
+        self.offset = offset
+        self.length = length
+        self.start_line = start_line
+        self.end_line = end_line
+        self.encoding: str | None = None
 
     @override
     def read(self, file_path: str) -> str:
         """Read and extract text from TXT file with encoding handling"""
-        encodings = ["utf-8", "gbk", "gb2312", "latin-1"]
+        return self._extract(file_path)
+
+    def detect_encoding(self, file_path: str) -> str:
+        """Detect the encoding from a byte-order mark or a sampled prefix"""
+        return self._detect(file_path)[0]
+
+    def _detect(self, file_path: str) -> tuple[str, bool]:
+        """Detect the encoding, and whether the sample settles it"""
+        with open(file_path, "rb") as f:
+            sample = f.read(self.sample_bytes)
+            complete = not f.read(1)
+
+        for bom, encoding in self.boms:
+            if sample.startswith(bom):
+                return encoding, True
+
+        encoding = self._first_fit(self.encodings, sample, complete)
+        if encoding is None:
+            raise ValueError("Could not decode file with any supported encoding.")
+        return encoding, complete or not sample.isascii()
 
+    @staticmethod
+    def _first_fit(encodings: list[str], sample: bytes, complete: bool) -> str | None:
+        """Return the first of ``encodings`` that decodes ``sample``"""
         for encoding in encodings:
             try:
-                with open(file_path, "r", encoding=encoding) as f:
-                    text = f.read()
-                return text if text else "No text found in the TXT file."
+                decoder = codecs.getincrementaldecoder(encoding)()
+                decoder.decode(sample, final=complete)
+                return encoding
             except UnicodeDecodeError:
                 continue
-            except Exception as e:
-                return f"Error reading TXT: {str(e)}"
+        return None
 
-        return "Error reading TXT: Could not decode file with any supported encoding."
+    def _sniff(
+        self,
+        data: bytes | mmap.mmap,
+        begin: int,
+        end: int,
+        complete: bool,
+        encodings: list[str] | None = None,
+    ) -> str | None:
+        """Pick the encoding of ``data[begin:end]`` from its non-ASCII bytes
 
+        The sample starts at the first non-ASCII byte, which is where an
+        inconclusive sample stopped telling encodings apart; ``complete``
+        says whether ``end`` is the end of the text. Returns None when the
+        range is all ASCII.
+        """
+        match = self._non_ascii.search(data, begin, end)
+        if match is None:
+            return None
+        stop = min(match.start() + self.sample_bytes, end)
+        sample = data[match.start() : stop]
+        candidates = self.encodings if encodings is None else encodings
+        return (
+            self._first_fit(candidates, sample, complete and stop == end)
+            or self.encodings[-1]
+        )
 
-class ExcelReader(DocumentReader):
-    """Excel document reader implementation"""
+    def _fallback_encoding(self, file_path: str, offset: int) -> str:
+        """Pick the candidate after ``encoding`` for bytes it failed to decode"""
+        with (
+            open(file_path, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+        ):
+            candidates = self.encodings[self.encodings.index(str(self.encoding)) + 1 :]
+            return (
+                self._sniff(data, offset, len(data), True, candidates)
+                or self.encodings[-1]
+            )
 
     @override
-    def read(self, file_path: str) -> str:
-        """Read and extract text from Excel file"""
-        try:
-            wb = load_workbook(file_path, read_only=True)
-            text = []
+    def iter_blocks(self, file_path: str, start: Any = None) -> Iterator[Block]:
+        """Yield decoded blocks; positions are text-stream ``tell()`` cookies
+
+        When the sample settled the encoding, bytes past it that do not fit
+        are replaced rather than triggering another pass over the file.
+        Otherwise they switch the read to the next candidate encoding from
+        the block they are in.
+        """
+        self.encoding, conclusive = self._detect(file_path)
+        if self.ranged:
+            yield from self._iter_range(file_path, start, conclusive)
+            return
 
-            for sheet_name in wb.sheetnames:
-                sheet = wb[sheet_name]
-                text.append(f"=== Sheet: {sheet_name} ===")
+        errors = "replace" if conclusive else "strict"
+        position = start
+        while True:
+            try:
+                with open(file_path, "r", encoding=self.encoding, errors=errors) as f:
+                    if position is not None:
+                        f.seek(position)
+                    while True:
+                        position = f.tell()
+                        block = f.read(self.block_chars)
+                        if not block:
+                            return
+                        yield position, block
+            except UnicodeDecodeError:
+                if errors == "replace":
+                    raise
+                # The low 64 bits of a text-stream cookie are the byte offset
+                offset = (position or 0) & (2**64 - 1)
+                self.encoding = self._fallback_encoding(file_path, offset)
+                errors = "replace"
 
-                for row in sheet.iter_rows(values_only=True):
-                    row_text = [str(cell) if cell is not None else "" for cell in row]
-                    if any(row_text):
-                        text.append("\t".join(row_text))
+    @property
+    def ranged(self) -> bool:
+        """Whether a byte or line range is selected"""
+        return any(
+            value is not None
+            for value in (self.offset, self.length, self.start_line, self.end_line)
+        )
 
-                text.append("")
+    @override
+    def remaining(self, file_path: str, cursor: str) -> str | None:
+        """Estimate the bytes left from the cursor to the end of the read"""
+        position, offset, _ = decode_cursor(cursor)
+        encoding = self.encoding or self.detect_encoding(file_path)
+        if self.ranged:
+            with open(file_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    _, end = self._byte_range(file_path, data)
+                    window = data[position : position + self.block_bytes]
+            text = window.decode(encoding, errors="replace")[:offset]
+            start = position + len(text.encode(encoding, errors="replace"))
+        else:
+            end = os.path.getsize(file_path)
+            with open(file_path, "r", encoding=encoding, errors="replace") as f:
+                f.seek(position)
+                f.read(offset)
+                # The low 64 bits of a text-stream cookie are the byte offset
+                start = f.tell() & (2**64 - 1)
+        return f"about {max(0, end - start):,} bytes"
 
-            extracted_text = "\n".join(text)
-            wb.close()
-            return (
-                extracted_text if extracted_text else "No text found in the Excel file."
+    @override
+    def inspect(self, file_path: str) -> dict[str, Any]:
+        """Report the encoding and line count of a text file
+
+        The line count is exact when the file fits in one sample or a
+        :class:`LineIndex` already exists for it; otherwise it is estimated
+        from the newline density of samples taken across the file, and
+        ``lines_estimated`` is true. When the leading sample is all ASCII,
+        the encoding is taken from the first sample with other bytes; if
+        none has any and the samples miss part of the file,
+        ``encoding_estimated`` is true.
+        """
+        encoding, conclusive = self._detect(file_path)
+        size = os.path.getsize(file_path)
+        samples = max(1, min(self.inspect_samples, size // self.sample_bytes))
+        step = (size - self.sample_bytes) // max(1, samples - 1)
+        newlines = sampled = 0
+        with open(file_path, "rb") as f:
+            for number in range(samples):
+                f.seek(number * step)
+                sample = f.read(self.sample_bytes)
+                newlines += sample.count(b"\n")
+                sampled += len(sample)
+                if not conclusive:
+                    # Start at a line, which starts at a character
+                    begin = sample.find(b"\n") + 1 if number else 0
+                    complete = number * step + len(sample) >= size
+                    sniffed = self._sniff(sample, begin, len(sample), complete)
+                    if sniffed is not None:
+                        encoding, conclusive = sniffed, True
+            f.seek(max(0, size - 1))
+            last = f.read(1)
+        info: dict[str, Any] = {"encoding": encoding}
+        if not conclusive and sampled < size:
+            info["encoding_estimated"] = True
+        index = LineIndex.cached(file_path) if size else None
+        if index is not None:
+            info["lines"] = index.line_count
+        elif sampled >= size:
+            info["lines"] = newlines + (0 if last in (b"\n", b"") else 1)
+        else:
+            info["lines"] = round(newlines * size / sampled) + (
+                0 if last == b"\n" else 1
             )
-        except Exception as e:
-            return f"Error reading Excel: {str(e)}"
+            info["lines_estimated"] = True
+        return info
 
+    def _iter_range(
+        self, file_path: str, start: Any, conclusive: bool = True
+    ) -> Iterator[Block]:
+        """Decode only the selected window; positions are byte offsets
 
-class DocumentReaderFactory:
-    """Factory for creating document readers based on file extension"""
+        Unless the sample settled the encoding, it is taken from the first
+        non-ASCII bytes of the window itself.
+        """
+        assert self.encoding is not None
+        if self.encoding.startswith(("utf-16", "utf-32")):
+            raise ValueError("Byte and line ranges require an 8-bit based encoding")
 
-    _readers: dict[str, type[DocumentReader]] = {
-        ".txt": TxtReader,
-        ".docx": DocxReader,
-        ".pdf": PdfReader,
-        ".xlsx": ExcelReader,
-        ".xls": ExcelReader,
-    }
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                begin, end = self._byte_range(file_path, data)
+                if not conclusive:
+                    self.encoding = self._sniff(data, begin, end, True) or self.encoding
+                decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+                position = begin if start is None else start
+                pending = 0
+                while position < end:
+                    stop = min(position + self.block_bytes, end)
+                    # Keep CRLF pairs together so newline translation is stable
+                    if stop < end and data[stop - 1 : stop] == b"\r":
+                        stop += 1
+                    text = decoder.decode(data[position:stop], final=stop == end)
+                    text_start = position - pending
+                    pending = len(decoder.getstate()[0])
+                    position = stop
+                    if text:
+                        text = text.replace("\r\n", "\n").replace("\r", "\n")
+                        yield text_start, text
 
-    @classmethod
-    def get_reader(cls, file_path: str) -> DocumentReader:
-        """Get appropriate reader for the given file"""
-        _, ext = os.path.splitext(file_path.lower())
-        if ext not in cls._readers:
-            raise ValueError(f"Unsupported document type: {ext}")
-        return cls._readers[ext]()
+    def _byte_range(self, file_path: str, data: mmap.mmap) -> tuple[int, int]:
+        """Resolve the selection to a [begin, end) byte range of the file"""
+        size = len(data)
+        if self.start_line is not None or self.end_line is not None:
+            index = LineIndex.for_file(file_path, data)
+            begin = index.line_offset(data, self.start_line or 1)
+            end = (
+                index.line_offset(data, self.end_line + 1)
+                if self.end_line is not None
+                else size
+            )
+            return begin, end
 
-    @classmethod
-    def is_supported(cls, file_path: str) -> bool:
-        """Check if the file type is supported"""
-        _, ext = os.path.splitext(file_path.lower())
-        return ext in cls._readers
+        begin = min(self.offset or 0, size)
+        end = size if self.length is None else min(begin + self.length, size)
+        if self.encoding in ("utf-8", "utf-8-sig"):
+            # Snap both ends to character boundaries instead of emitting U+FFFD
+            while begin < end and 0x80 <= data[begin] < 0xC0:
+                begin += 1
+            while end < size and end > begin and 0x80 <= data[end] < 0xC0:
+                end -= 1
+        return begin, end
 
 
-@mcp.tool()
-def read_document(filename: str) -> str:
-    """
-    Reads and extracts text from a specified document file.
-    Supports multiple document types: TXT, DOCX, PDF, Excel (XLSX, XLS).
+_SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_ROW, _VALUE, _FORMULA, _INLINE, _TEXT, _RUN = (
+    _SHEET_NS + tag for tag in ("row", "v", "f", "is", "t", "r")
+)
 
-    :param filename: Path to the document file to read
-        (supports absolute or relative paths)
-    :return: Extracted text from the document
+
+@functools.lru_cache(maxsize=4096)
+def _column_number(letters: str) -> int:
+    """Return the 1-based number of a column given by its letters"""
+    number = 0
+    for char in letters.upper():
+        number = number * 26 + ord(char) - 64
+    return number
+
+
+def _inline_text(element: ElementTree.Element) -> str:
+    """Concatenate the plain and rich-text runs of a string item"""
+    parts = []
+    plain = element.findtext(_TEXT)
+    if plain:
+        parts.append(plain)
+    for run in element.iterfind(_RUN):
+        text = run.findtext(_TEXT)
+        if text:
+            parts.append(text)
+    return "".join(parts)
+
+
+def _table_formula(r1: str | None, r2: str | None) -> str:
+    """Spell out a data-table formula the way Excel displays it"""
+    return "=TABLE(" + ",".join(ref for ref in (r1, r2) if ref) + ")"
+
+
+def _cell_text(value: Any) -> str:
+    """Render an Excel cell value as text"""
+    if value is None:
+        return ""
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    kind = getattr(value, "t", None)
+    if kind == "array":
+        return value.text or ""
+    if kind == "dataTable":
+        return _table_formula(value.r1, value.r2)
+    return str(value)
+
+
+class _XlsxStream:
+    """Streaming view of an XLSX package, used by ExcelReader's xml engine
+
+    Worksheets are parsed straight out of the zip with ``iterparse`` and each
+    row is cleared as soon as it is converted, so no cell objects accumulate
+    however tall a sheet is. Cell values are converted the way openpyxl's
+    read-only mode converts them, so both engines produce the same text.
     """
-    file_path = Path(filename)
 
-    if not file_path.exists():
-        return f"Error: File '{filename}' not found."
+    def __init__(self, file_path: str) -> None:
+        from openpyxl.utils.datetime import (
+            CALENDAR_MAC_1904,
+            WINDOWS_EPOCH,
+            from_excel,
+            from_ISO8601,
+        )
 
-    if not DocumentReaderFactory.is_supported(str(file_path)):
-        return f"Error: Unsupported document type for file '{filename}'."
+        self._from_excel = from_excel
+        self._from_iso8601 = from_ISO8601
+        self.archive = zipfile.ZipFile(file_path)
+        try:
+            workbook_part = _main_part(self.archive, "xl/workbook.xml")
+            relationships = _package_relationships(self.archive, workbook_part)
+            root = ElementTree.fromstring(self.archive.read(workbook_part))
+            properties = root.find(f"{_SHEET_NS}workbookPr")
+            date1904 = properties is not None and properties.get("date1904") in (
+                "1",
+                "true",
+            )
+            self.epoch = CALENDAR_MAC_1904 if date1904 else WINDOWS_EPOCH
+            self.sheetnames: list[str] = []
+            self.sheet_parts: list[str | None] = []
+            for sheet in root.iterfind(f"{_SHEET_NS}sheets/{_SHEET_NS}sheet"):
+                kind, target = relationships.get(
+                    sheet.get(_RELATIONSHIP_ID, ""), ("", "")
+                )
+                self.sheetnames.append(sheet.get("name", ""))
+                self.sheet_parts.append(target if kind.endswith("/worksheet") else None)
+            self.parts = {
+                kind.rsplit("/", 1)[-1]: target
+                for kind, target in relationships.values()
+            }
+        except BaseException:
+            self.archive.close()
+            raise
 
-    try:
-        reader = DocumentReaderFactory.get_reader(str(file_path))
-        return reader.read(str(file_path))
-    except Exception as e:
-        return f"Error reading document: {str(e)}"
+    def close(self) -> None:
+        """Close the underlying zip archive"""
+        self.archive.close()
+
+    def dimension(self, index: int) -> str | None:
+        """Return the used range a sheet declares, without reading its cells"""
+        part = self.sheet_parts[index]
+        if part is None:
+            return None
+        with self.archive.open(part) as source:
+            for _, element in ElementTree.iterparse(source, events=("start",)):
+                if element.tag == f"{_SHEET_NS}dimension":
+                    return element.get("ref")
+                if element.tag == f"{_SHEET_NS}sheetData":
+                    break
+        return None
+
+    # Strings and styles are only needed to convert cells, so a workbook that
+    # is merely inspected never loads them
+    @functools.cached_property
+    def shared_strings(self) -> list[str]:
+        """The shared string table"""
+        strings: list[str] = []
+        part = self.parts.get("sharedStrings")
+        if part is None:
+            return strings
+        with self.archive.open(part) as source:
+            for _, element in ElementTree.iterparse(source):
+                if element.tag == f"{_SHEET_NS}si":
+                    strings.append(_inline_text(element).replace("x005F_", ""))
+                    element.clear()
+        return strings
+
+    @functools.cached_property
+    def date_styles(self) -> set[int]:
+        """Cell style ids with a date or time number format"""
+        return self._styles[0]
+
+    @functools.cached_property
+    def timedelta_styles(self) -> set[int]:
+        """Cell style ids with an elapsed-time number format"""
+        return self._styles[1]
+
+    @functools.cached_property
+    def _styles(self) -> tuple[set[int], set[int]]:
+        """Return the cell style ids with date and with timedelta formats"""
+        dates: set[int] = set()
+        timedeltas: set[int] = set()
+        part = self.parts.get("styles")
+        if part is None:
+            return dates, timedeltas
+        from openpyxl.styles.numbers import (
+            BUILTIN_FORMATS,
+            is_date_format,
+            is_timedelta_format,
+        )
+
+        root = ElementTree.fromstring(self.archive.read(part))
+        custom = {
+            int(fmt.get("numFmtId", 0)): fmt.get("formatCode")
+            for fmt in root.iterfind(f"{_SHEET_NS}numFmts/{_SHEET_NS}numFmt")
+        }
+        cell_styles = root.iterfind(f"{_SHEET_NS}cellXfs/{_SHEET_NS}xf")
+        for style_id, style in enumerate(cell_styles):
+            format_id = int(style.get("numFmtId", 0))
+            fmt = custom.get(format_id, BUILTIN_FORMATS.get(format_id))
+            if is_date_format(fmt):
+                dates.add(style_id)
+            if is_timedelta_format(fmt):
+                timedeltas.add(style_id)
+        return dates, timedeltas
+
+    def iter_rows(
+        self,
+        index: int,
+        min_row: int,
+        max_row: int | None,
+        min_col: int | None,
+        max_col: int | None,
+    ) -> Iterator[tuple[int, list[Any]]]:
+        """Yield (row number, values) for the non-missing rows of a sheet
+
+        Row bounds and widths follow openpyxl's read-only ``iter_rows``: when
+        not given, they come from the sheet's ``<dimension>`` element.
+        """
+        part = self.sheet_parts[index]
+        if part is None:
+            return
+        min_col = min_col or 1
+        next_row = min_row
+        row_number = 0
+        shared: dict[str, Any] = {}
+        with self.archive.open(part) as source:
+            for _, element in ElementTree.iterparse(source):
+                tag = element.tag
+                if tag == _ROW:
+                    number = element.get("r")
+                    row_number = int(number) if number else row_number + 1
+                    if max_row is not None and row_number > max_row:
+                        break
+                    cells = self._parse_row(element, shared, row_number >= next_row)
+                    # Only an empty shell of each finished row stays in the tree
+                    element.clear()
+                    if row_number < next_row:
+                        continue
+                    next_row = row_number + 1
+                    if not cells and not max_col:
+                        yield row_number, []
+                        continue
+                    last_col = max_col or cells[-1][0]
+                    values: list[Any] = [None] * (last_col + 1 - min_col)
+                    for column, value in cells:
+                        if min_col <= column <= last_col:
+                            values[column - min_col] = value
+                    yield row_number, values
+                elif tag == f"{_SHEET_NS}dimension":
+                    from openpyxl.utils.cell import range_boundaries
+
+                    bounds = range_boundaries(element.get("ref", ""))
+                    max_col = max_col or bounds[2]
+                    max_row = max_row or bounds[3]
+                elif tag == f"{_SHEET_NS}sheetData":
+                    break
+
+    def _parse_row(
+        self, row: ElementTree.Element, shared: dict[str, Any], wanted: bool
+    ) -> list[tuple[int, Any]]:
+        """Convert the cells of a row to (column, value) pairs
+
+        Rows that are not ``wanted`` are only scanned for shared formulas,
+        which later cells may refer back to.
+        """
+        cells = []
+        column = 0
+        for cell in row:
+            reference = cell.get("r")
+            if reference:
+                column = _column_number(reference.rstrip("0123456789"))
+            else:
+                column += 1
+            formula = cell.find(_FORMULA)
+            if formula is not None:
+                value = self._formula(formula, reference, shared)
+            elif not wanted:
+                continue
+            else:
+                value = self._value(cell)
+            cells.append((column, value))
+        return cells
+
+    @staticmethod
+    def _formula(
+        formula: ElementTree.Element, reference: str | None, shared: dict[str, Any]
+    ) -> str:
+        """Return a cell formula as text, expanding shared formulas"""
+        value = "=" + (formula.text or "")
+        kind = formula.get("t")
+        if kind == "shared":
+            from openpyxl.formula.translate import Translator
+
+            index = formula.get("si", "")
+            if index in shared:
+                return shared[index].translate_formula(reference)
+            if value != "=":
+                shared[index] = Translator(value, reference)
+        elif kind == "dataTable":
+            return _table_formula(formula.get("r1"), formula.get("r2"))
+        return value
+
+    def _value(self, cell: ElementTree.Element) -> Any:
+        """Convert a formula-free cell to its Python value"""
+        data_type = cell.get("t", "n")
+        if data_type == "inlineStr":
+            inline = cell.find(_INLINE)
+            return None if inline is None else _inline_text(inline)
+        value = cell.findtext(_VALUE) or None
+        if value is None:
+            return None
+        if data_type == "n":
+            number = (
+                float(value)
+                if "." in value or "E" in value or "e" in value
+                else int(value)
+            )
+            if self.date_styles:
+                style_id = int(cell.get("s", 0))
+                if style_id in self.date_styles:
+                    try:
+                        return self._from_excel(
+                            number,
+                            self.epoch,
+                            timedelta=style_id in self.timedelta_styles,
+                        )
+                    except (OverflowError, ValueError):
+                        return "#VALUE!"
+            return number
+        if data_type == "s":
+            return self.shared_strings[int(value)]
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            return self._from_iso8601(value)
+        return value
+
+
+class ExcelReader(DocumentReader):
+    """Excel document reader implementation
+
+    ``sheet`` selects one sheet by name or 1-based index; other sheets are
+    never parsed. ``start_row``/``end_row`` (1-based, inclusive) or an A1-style
+    ``cell_range`` such as ``"A1:D100"`` or ``"Sales!A1:D100"`` limit the
+    cells read, and
+    ``max_rows`` caps the rows read from each sheet.
+
+    ``engine`` picks the parser: ``"openpyxl"`` (the default) or ``"xml"``,
+    which streams the worksheet XML directly and is about twice as fast on
+    large sheets while producing the same text. The workbook's sheet names
+    are kept in ``sheetnames`` once iteration starts.
+    """
+
+    name = "Excel"
+    empty_message = "No text found in the Excel file."
+    cost_factor = 3.0
+    engines = ("openpyxl", "xml")
+
+    def __init__(
+        self,
+        sheet: str | int | None = None,
+        start_row: int | None = None,
+        end_row: int | None = None,
+        cell_range: str | None = None,
+        max_rows: int | None = None,
+        engine: str = "openpyxl",
+    ) -> None:
+        if engine not in self.engines:
+            raise ValueError(
+                f"Unknown Excel engine '{engine}' (use one of: "
+                f"{', '.join(self.engines)})"
+            )
+        if cell_range is not None and (start_row is not None or end_row is not None):
+            raise ValueError("Use either cell_range or start_row/end_row, not both")
+        if (start_row is not None and start_row < 1) or (
+            end_row is not None and end_row < (start_row or 1)
+        ):
+            raise ValueError("Row numbers start at 1 and end_row >= start_row")
+        if max_rows is not None and max_rows < 1:
+            raise ValueError("max_rows must be at least 1")
+        if cell_range is not None and "!" in cell_range:
+            sheet_name, cell_range = cell_range.rsplit("!", 1)
+            if sheet is not None:
+                raise ValueError("Give the sheet either in cell_range or in sheet")
+            sheet = sheet_name.strip("'")
+        self.sheet = sheet
+        self.start_row = start_row
+        self.end_row = end_row
+        self.cell_range = cell_range
+        self.max_rows = max_rows
+        self.engine = engine
+        self.sheetnames: list[str] = []
+
+    @override
+    def read(self, file_path: str) -> str:
+        """Read and extract text from Excel file"""
+        return self._extract(file_path)
+
+    def sheet_indices(self, sheet_names: list[str]) -> list[int]:
+        """Resolve the sheet selection to 0-based indices into ``sheet_names``"""
+        if self.sheet is None:
+            return list(range(len(sheet_names)))
+        if isinstance(self.sheet, int):
+            if not 1 <= self.sheet <= len(sheet_names):
+                raise ValueError(
+                    f"Sheet {self.sheet} is out of range (workbook has "
+                    f"{len(sheet_names)} sheets)"
+                )
+            return [self.sheet - 1]
+        if self.sheet not in sheet_names:
+            raise ValueError(f"Sheet '{self.sheet}' not found")
+        return [sheet_names.index(self.sheet)]
+
+    def bounds(self) -> tuple[int, int | None, int | None, int | None]:
+        """Return (min_row, max_row, min_col, max_col) for ``iter_rows``"""
+        min_col = max_col = None
+        if self.cell_range is not None:
+            from openpyxl.utils.cell import range_boundaries
+
+            min_col, min_row, max_col, max_row = range_boundaries(self.cell_range)
+            min_row = min_row or 1
+        else:
+            min_row, max_row = self.start_row or 1, self.end_row
+        if self.max_rows is not None:
+            limit = min_row + self.max_rows - 1
+            max_row = limit if max_row is None else min(max_row, limit)
+        return min_row, max_row, min_col, max_col
+
+    @override
+    def iter_blocks(self, file_path: str, start: Any = None) -> Iterator[Block]:
+        """Yield a header, the non-empty rows and a blank line per sheet
+
+        Positions are ``[sheet, row]`` with row 0 for the sheet header and
+        -1 for the trailing blank line.
+        """
+        first_sheet, first_row = start if start is not None else (0, 0)
+        min_row, max_row, min_col, max_col = self.bounds()
+        if self.engine == "xml":
+            book = _XlsxStream(file_path)
+            rows = book.iter_rows
+        else:
+            from openpyxl import load_workbook
+
+            book = load_workbook(file_path, read_only=True)
+            rows = functools.partial(self._openpyxl_rows, book)
+        self.sheetnames = list(book.sheetnames)
+        try:
+            for sheet_number in self.sheet_indices(book.sheetnames):
+                if sheet_number < first_sheet:
+                    continue
+                sheet_name = book.sheetnames[sheet_number]
+                row = first_row if sheet_number == first_sheet else 0
+                if row == 0:
+                    yield [sheet_number, 0], f"=== Sheet: {sheet_name} ==="
+                if row != -1:
+                    sheet_rows = rows(
+                        sheet_number, max(row, min_row), max_row, min_col, max_col
+                    )
+                    for row_number, values in sheet_rows:
+                        check_interrupted()
+                        row_text = [_cell_text(cell) for cell in values]
+                        if any(row_text):
+                            yield [sheet_number, row_number], "\t".join(row_text)
+                yield [sheet_number, -1], ""
+        finally:
+            book.close()
+
+    @override
+    def location(self, position: Any, block: str, offset: int) -> dict[str, Any]:
+        """Locate a row by sheet name and row number, and a match by its cell"""
+        from openpyxl.utils.cell import get_column_letter
+
+        sheet_number, row = position
+        found: dict[str, Any] = {"sheet": self.sheetnames[sheet_number]}
+        if row > 0:
+            # Rows are tab-joined cell by cell, starting at the first column read
+            column = (self.bounds()[2] or 1) + block.count("\t", 0, offset)
+            found["row"] = row
+            found["cell"] = f"{get_column_letter(column)}{row}"
+        return found
+
+    @override
+    def inspect(self, file_path: str) -> dict[str, Any]:
+        """List the sheets of a workbook with the used range each declares
+
+        Names come from the workbook part and ranges from the ``<dimension>``
+        element that precedes each sheet's cells, so no cell is read.
+        ``rows``/``columns`` are None when a sheet declares no range, as with
+        chart sheets and streaming writers; ``xml_bytes``, the uncompressed
+        size of the sheet from the zip directory, is there as a size hint.
+        """
+        from openpyxl.utils.cell import range_boundaries
+
+        book = _XlsxStream(file_path)
+        try:
+            sheets = []
+            for index, name in enumerate(book.sheetnames):
+                ref = book.dimension(index)
+                rows = columns = None
+                if ref:
+                    min_col, min_row, max_col, max_row = range_boundaries(ref)
+                    if min_row is not None and max_row is not None:
+                        rows = max_row - min_row + 1
+                    if min_col is not None and max_col is not None:
+                        columns = max_col - min_col + 1
+                part = book.sheet_parts[index]
+                sheets.append(
+                    {
+                        "name": name,
+                        "dimension": ref,
+                        "rows": rows,
+                        "columns": columns,
+                        "xml_bytes": (
+                            book.archive.getinfo(part).file_size if part else None
+                        ),
+                    }
+                )
+        finally:
+            book.close()
+        return {"sheets": sheets}
+
+    @staticmethod
+    def _openpyxl_rows(
+        wb: Any,
+        index: int,
+        min_row: int,
+        max_row: int | None,
+        min_col: int | None,
+        max_col: int | None,
+    ) -> Iterator[tuple[int, tuple[Any, ...]]]:
+        """Yield (row number, values) from an openpyxl read-only workbook"""
+        rows = wb[wb.sheetnames[index]].iter_rows(
+            min_row=min_row,
+            max_row=max_row,
+            min_col=min_col,
+            max_col=max_col,
+            values_only=True,
+        )
+        return enumerate(rows, start=min_row)
+
+
+def _file_digest(file_path: str) -> str | None:
+    """Return the SHA-256 of a file's contents, or None if it cannot be read"""
+    sha = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+    except OSError:
+        return None
+    return sha.hexdigest()
+
+
+class ExtractionCache:
+    """Two-tier cache of extracted text: in-memory LRU backed by SQLite
+
+    Entries are keyed on the resolved path, size, mtime and (optionally) a
+    SHA-256 of the file contents, so a modified file never hits a stale entry.
+    Both tiers evict least-recently-used entries once their byte budget is
+    exceeded.
+    """
+
+    # Disk hits queue their access time; the queue is written in one
+    # transaction once it holds this many entries, or with the next put
+    touch_batch = 64
+
+    def __init__(
+        self,
+        memory_bytes: int = 64 * 1024 * 1024,
+        disk_path: str | None = None,
+        disk_bytes: int = 1024 * 1024 * 1024,
+        hash_content: bool = False,
+    ) -> None:
+        self.memory_bytes = memory_bytes
+        self.disk_path = disk_path
+        self.disk_bytes = disk_bytes
+        self.hash_content = hash_content
+        self._memory: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._memory_size = 0
+        self._db: sqlite3.Connection | None = None
+        # Bytes held by the disk tier, loaded once when it is opened
+        self._disk_size = 0
+        self._touched: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ExtractionCache":
+        """Build a cache configured from ``MCP_DOCUMENTS_READER_CACHE_*``"""
+        cache_dir = os.environ.get(ENV_PREFIX + "CACHE_DIR")
+        return cls(
+            memory_bytes=_env_int("CACHE_MEMORY_BYTES", 64 * 1024 * 1024),
+            disk_path=(
+                os.path.join(cache_dir, "extraction-cache.sqlite3")
+                if cache_dir
+                else None
+            ),
+            disk_bytes=_env_int("CACHE_DISK_BYTES", 1024 * 1024 * 1024),
+            hash_content=_env_flag("CACHE_HASH"),
+        )
+
+    @staticmethod
+    def signature(file_path: str) -> tuple[str, int, int] | None:
+        """Return (resolved path, size, mtime_ns), or None if unavailable"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (os.path.realpath(file_path), stat.st_size, stat.st_mtime_ns)
+
+    def key(self, file_path: str, options: dict | None = None) -> str | None:
+        """Build the cache key for a file, or None if it cannot be cached"""
+        signature = self.signature(file_path)
+        if signature is None:
+            return None
+        digest = None
+        if self.hash_content:
+            digest = _file_digest(file_path)
+            if digest is None:
+                return None
+        material = json.dumps(
+            [*signature, digest, options or {}], sort_keys=True, default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Look up a cached extraction, promoting disk hits into memory"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry[0]
+            db = self._connect()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT text FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._touched[key] = time.time()
+                if len(self._touched) >= self.touch_batch:
+                    self._flush_touched(db)
+                    db.commit()
+            except sqlite3.Error:
+                return None
+            self._remember(key, row[0], len(row[0].encode("utf-8")))
+            return row[0]
+
+    def put(self, key: str, text: str) -> None:
+        """Store an extraction in both tiers"""
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            self._remember(key, text, size)
+            db = self._connect()
+            if db is None or size > self.disk_bytes:
+                return
+            try:
+                self._touched.pop(key, None)
+                self._flush_touched(db)
+                replaced = db.execute(
+                    "SELECT size FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO entries (key, text, size, accessed) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, text, size, time.time()),
+                )
+                total = self._disk_size + size - (replaced[0] if replaced else 0)
+                if total > self.disk_bytes:
+                    # Served from the covering index, without reading any text
+                    evicted = []
+                    rows = db.execute("SELECT key, size FROM entries ORDER BY accessed")
+                    for old_key, old_size in rows:
+                        if total <= self.disk_bytes:
+                            break
+                        evicted.append((old_key,))
+                        total -= old_size
+                    rows.close()
+                    db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+                db.commit()
+                self._disk_size = total
+            except sqlite3.Error:
+                db.rollback()
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            self._touched.clear()
+            db = self._connect()
+            if db is not None:
+                db.execute("DELETE FROM entries")
+                db.commit()
+                self._disk_size = 0
+
+    def _flush_touched(self, db: sqlite3.Connection) -> None:
+        """Write the queued access times of disk hits, without committing"""
+        if self._touched:
+            db.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _remember(self, key: str, text: str, size: int) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= previous[1]
+        if size > self.memory_bytes:
+            return
+        self._memory[key] = (text, size)
+        self._memory_size += size
+        while self._memory_size > self.memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_size -= evicted_size
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if self.disk_path is None:
+            return None
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.disk_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, "
+                "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            # Covers the eviction scan and the byte total, which would
+            # otherwise read past each row's text to reach its size
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed "
+                "ON entries (accessed, key, size)"
+            )
+            self._db.commit()
+            self._disk_size = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+        return self._db
+
+
+class SingleFlight:
+    """Run concurrent calls that share a key once and hand all callers the result
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and receive the same result, or exception,
+    instead of repeating the work. Once it completes the key is released, so
+    later calls run afresh. A waiter whose own :class:`Cancellation` stops
+    it raises :class:`ExtractionInterrupted` while the call carries on.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Any, Future] = {}
+
+    def run(self, key: Any, func: Callable[[], T]) -> T:
+        """Call ``func``, or wait for the in-flight call with the same key"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = self._calls[key] = Future()
+        if not leader:
+            metrics.coalesced()
+            # Wait in slices, so this caller's own deadline or cancellation
+            # stops its wait without stopping the shared call
+            while future not in wait([future], timeout=0.1).done:
+                check_interrupted()
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
+
+
+def _process_rss(pid: int) -> int | None:
+    """Resident set size of a process in bytes, where ``/proc`` provides it"""
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _pool_worker(conn: Any) -> None:
+    """Serve tasks sent over ``conn`` until it closes; runs in a pool worker"""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        func, args = task
+        try:
+            reply = (True, func(*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # The result or exception could not be pickled
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+def _isolated_read(
+    file_path: str, options: dict[str, Any]
+) -> tuple[str, dict[tuple[str, str], dict[str, Any]]]:
+    """Read a document and return its text and reader metrics; runs in a worker"""
+    metrics.reset()
+    text = DocumentReaderFactory.get_reader(file_path, **options).read(file_path)
+    return text, metrics.export()
+
+
+class _PoolWorker:
+    """A worker process of a :class:`WorkerPool` and the parent end of its pipe"""
+
+    def __init__(self, process: Any, conn: Any) -> None:
+        self.process = process
+        self.conn = conn
+        self.tasks = 0
+
+
+class WorkerPool:
+    """Worker processes that isolate extraction from crashes and leaks
+
+    Each task runs in one of up to ``processes`` worker processes. A task
+    running longer than ``timeout`` seconds, or whose worker's resident
+    memory grows beyond ``max_rss_bytes`` (checked where ``/proc`` is
+    available), has its worker killed and raises :class:`TimeoutError` or
+    :class:`MemoryError`; a worker that dies mid-task raises
+    :class:`ChildProcessError`. Zero disables either limit. Workers are
+    spawned on demand, replaced after being killed, and retired after
+    ``max_tasks_per_child`` tasks so leaks in the backends cannot pile up.
+    """
+
+    poll_interval = 0.05
+
+    def __init__(
+        self,
+        processes: int = 2,
+        timeout: float = 300,
+        max_rss_bytes: int = 0,
+        max_tasks_per_child: int = 100,
+    ) -> None:
+        self.processes = processes
+        self.timeout = timeout
+        self.max_rss_bytes = max_rss_bytes
+        self.max_tasks_per_child = max_tasks_per_child
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(processes)
+        self._lock = threading.Lock()
+        self._idle: list[_PoolWorker] = []
+        self._workers: set[_PoolWorker] = set()
+        self._closed = False
+        self._registered = False
+        self._counts: dict[str, int] = dict.fromkeys(
+            (
+                "tasks",
+                "timeouts",
+                "memory_kills",
+                "crashes",
+                "interrupted",
+                "recycled",
+            ),
+            0,
+        )
+
+    @classmethod
+    def from_env(cls) -> "WorkerPool | None":
+        """Build a pool from ``MCP_DOCUMENTS_READER_WORKER_*``, None if disabled"""
+        processes = _env_int("WORKER_PROCESSES", 0)
+        if processes <= 0:
+            return None
+        return cls(
+            processes=processes,
+            timeout=_env_int("WORKER_TIMEOUT", 300),
+            max_rss_bytes=_env_int("WORKER_MAX_RSS_BYTES", 0),
+            max_tasks_per_child=_env_int("WORKER_MAX_TASKS", 100),
+        )
+
+    def run(
+        self, func: Callable[..., T], *args: Any, timeout: float | None = None
+    ) -> T:
+        """Call ``func(*args)`` in a worker and return its result
+
+        ``func`` and its arguments must be picklable. Exceptions raised by
+        ``func`` are re-raised here and leave the worker running. When the
+        current :class:`Cancellation` expires or is cancelled, the worker is
+        killed and :class:`ExtractionInterrupted` raised.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        while not self._slots.acquire(timeout=self.poll_interval):
+            check_interrupted()
+        try:
+            worker = self._checkout()
+            healthy = False
+            try:
+                ok, value = self._call(worker, func, args, timeout)
+                healthy = True
+            finally:
+                self._checkin(worker, healthy)
+        finally:
+            self._slots.release()
+        if not ok:
+            raise value
+        return value
+
+    def extract(self, file_path: str, options: dict[str, Any]) -> str:
+        """Read a document in a worker, reporting a killed worker as an error"""
+        name = DocumentReaderFactory.get_reader(file_path, **options).name
+        started = time.perf_counter()
+        try:
+            text, operations = self.run(_isolated_read, file_path, options)
+        except (
+            TimeoutError,
+            MemoryError,
+            ChildProcessError,
+            ExtractionInterrupted,
+        ) as e:
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                size = 0
+            metrics.observe(
+                "readers",
+                name,
+                time.perf_counter() - started,
+                bytes_in=size,
+                error=type(e).__name__,
+            )
+            if isinstance(e, ExtractionInterrupted):
+                raise
+            return ErrorMessage(f"Error reading {name}: {e}")
+        metrics.merge(operations)
+        return text
+
+    def stats(self) -> dict[str, int]:
+        """Worker counts and how many tasks ran, timed out, hit the memory
+        limit, crashed or were interrupted, and how many workers were recycled"""
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "workers": len(self._workers),
+                "idle": len(self._idle),
+                **self._counts,
+            }
+
+    def close(self) -> None:
+        """Stop all workers; running tasks fail with :class:`ChildProcessError`"""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._idle.clear()
+        for worker in workers:
+            self._stop(worker, kill=True)
+
+    def _call(
+        self, worker: _PoolWorker, func: Callable, args: tuple, timeout: float
+    ) -> tuple[bool, Any]:
+        worker.conn.send((func, args))
+        deadline = time.monotonic() + timeout if timeout else None
+        token = Cancellation.current()
+        while not worker.conn.poll(self.poll_interval):
+            reason = token.reason() if token is not None else None
+            if reason is not None:
+                self._count("interrupted")
+                raise ExtractionInterrupted(reason)
+            if deadline is not None and time.monotonic() >= deadline:
+                self._count("timeouts")
+                raise TimeoutError(f"Extraction timed out after {timeout:g} s")
+            if self.max_rss_bytes:
+                rss = _process_rss(worker.process.pid)
+                if rss is not None and rss > self.max_rss_bytes:
+                    self._count("memory_kills")
+                    raise MemoryError(
+                        f"Extraction exceeded the memory limit of "
+                        f"{self.max_rss_bytes} bytes"
+                    )
+        try:
+            reply = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(1)
+            self._count("crashes")
+            raise ChildProcessError(
+                f"Extraction worker exited with code {worker.process.exitcode}"
+            ) from None
+        self._count("tasks")
+        return reply
+
+    def _checkout(self) -> _PoolWorker:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            if not self._registered:
+                atexit.register(self.close)
+                self._registered = True
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_pool_worker, args=(child,), name="document-reader-worker"
+        )
+        process.start()
+        child.close()
+        worker = _PoolWorker(process, parent)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _checkin(self, worker: _PoolWorker, healthy: bool) -> None:
+        worker.tasks += 1
+        with self._lock:
+            if healthy and not self._closed and worker.tasks < self.max_tasks_per_child:
+                self._idle.append(worker)
+                return
+            if healthy:
+                self._counts["recycled"] += 1
+        self._stop(worker, kill=not healthy)
+
+    def _stop(self, worker: _PoolWorker, kill: bool) -> None:
+        if not kill:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(1)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
+        with self._lock:
+            self._workers.discard(worker)
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+
+
+class DocumentReaderFactory:
+    """Factory for creating document readers based on file extension"""
+
+    _readers: dict[str, type[DocumentReader]] = {
+        ".txt": TxtReader,
+        ".docx": DocxReader,
+        ".pdf": PdfReader,
+        ".xlsx": ExcelReader,
+        ".xls": ExcelReader,
+    }
+
+    cache: ExtractionCache | None = ExtractionCache.from_env()
+    in_flight: SingleFlight | None = SingleFlight()
+    workers: WorkerPool | None = WorkerPool.from_env()
+
+    @classmethod
+    def get_reader(cls, file_path: str, **options: Any) -> DocumentReader:
+        """Get appropriate reader for the given file, configured with options"""
+        _, ext = os.path.splitext(file_path.lower())
+        if ext not in cls._readers:
+            raise ValueError(f"Unsupported document type: {ext}")
+        reader_cls = cls._readers[ext]
+        try:
+            inspect.signature(reader_cls).bind(**options)
+        except TypeError:
+            raise ValueError(
+                f"Unsupported option(s) for {ext} documents: "
+                f"{', '.join(sorted(options))}"
+            ) from None
+        return reader_cls(**options)
+
+    @classmethod
+    def is_supported(cls, file_path: str) -> bool:
+        """Check if the file type is supported"""
+        _, ext = os.path.splitext(file_path.lower())
+        return ext in cls._readers
+
+    @classmethod
+    def estimate_cost(cls, file_path: str) -> float:
+        """Estimate the cost of extracting a file from its size and type
+
+        The cost is the file size weighted by the reader's ``cost_factor``;
+        missing and unsupported files cost nothing.
+        """
+        _, ext = os.path.splitext(file_path.lower())
+        reader_cls = cls._readers.get(ext)
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return 0.0
+        return size * reader_cls.cost_factor if reader_cls is not None else 0.0
+
+    @classmethod
+    def read(cls, file_path: str, **options: Any) -> str:
+        """Read a document, serving repeat reads from the extraction cache
+
+        Concurrent reads of the same file version with the same options share
+        a single extraction, which runs in :attr:`workers` when a worker pool
+        is configured. Reads stopped by the current :class:`Cancellation`
+        raise :class:`ExtractionInterrupted` and are not cached.
+        """
+        cache = cls.cache
+        key = cache.key(file_path, options) if cache is not None else None
+        if cache is not None and key is not None:
+            cached = cache.get(key)
+            metrics.cache_lookup(cached is not None)
+            if cached is not None:
+                return cached
+
+        signature = ExtractionCache.signature(file_path)
+
+        def extract() -> str:
+            reader = cls.get_reader(file_path, **options)
+            workers = cls.workers
+            if workers is None:
+                text = reader.read(file_path)
+            else:
+                text = workers.extract(file_path, options)
+            # Errors are not cached, nor are files that changed while being read
+            if (
+                cache is not None
+                and key is not None
+                and not isinstance(text, ErrorMessage)
+                and ExtractionCache.signature(file_path) == signature
+            ):
+                cache.put(key, text)
+            return text
+
+        in_flight = cls.in_flight
+        if in_flight is None or signature is None:
+            return extract()
+        flight = json.dumps([*signature, options], sort_keys=True, default=str)
+        while True:
+            try:
+                return in_flight.run(flight, extract)
+            except ExtractionInterrupted:
+                token = Cancellation.current()
+                if token is not None and token.reason() is not None:
+                    raise
+                # The deadline or cancellation of another caller stopped the
+                # shared extraction; run it again for this one
+
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+# Han and kana are written without spaces, so each character is a term of its
+# own and a word of several characters is matched as a phrase
+_TERM = re.compile(f"[{_CJK}]|[^\\W_{_CJK}]+")
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+MAX_TERM_CHARS = 64
+
+
+def _terms(text: str) -> list[str]:
+    """Split text into case-folded index terms, in order"""
+    return [term[:MAX_TERM_CHARS] for term in _TERM.findall(text.casefold())]
+
+
+def _pack(values: Iterable[int]) -> bytes:
+    """Serialise unsigned ints, compressing all but the shortest runs"""
+    data = array("I", values).tobytes()
+    if len(data) <= 64:
+        return b"\x00" + data
+    return b"\x01" + zlib.compress(data, 1)
+
+
+def _unpack(data: bytes) -> array:
+    """Inverse of :func:`_pack`"""
+    values = array("I")
+    values.frombytes(zlib.decompress(data[1:]) if data[:1] == b"\x01" else data[1:])
+    return values
+
+
+def _deltas(values: list[int]) -> Iterator[int]:
+    """Yield the first value and then the gaps of an ascending list"""
+    yield values[0]
+    yield from (b - a for a, b in zip(values, values[1:]))
+
+
+def _document_terms(file_path: str) -> tuple[int, dict[str, list[int]]]:
+    """Extract a document and return its length in terms and term positions"""
+    text = DocumentReaderFactory.read(file_path)
+    if isinstance(text, ErrorMessage):
+        raise ValueError(text)
+    if text == DocumentReaderFactory.get_reader(file_path).empty_message:
+        text = ""
+    terms = _terms(text)
+    positions: dict[str, list[int]] = {}
+    for position, term in enumerate(terms):
+        positions.setdefault(term, []).append(position)
+    return len(terms), positions
+
+
+class CorpusIndex:
+    """On-disk inverted index of a document directory, ranked with BM25
+
+    Every document is extracted once through :class:`DocumentReaderFactory`.
+    Documents are indexed in segments: each segment stores one SQLite row per
+    term holding the delta-encoded ids, frequencies and positions of the
+    documents that contain it, so a query reads a few rows per term and its
+    cost does not depend on how expensive the corpus was to extract.
+
+    Replacing or removing a document only drops its ``documents`` row; its
+    old postings are skipped by queries until segments are merged, which
+    happens once there are more than ``max_segments`` of them or dead
+    postings outnumber live ones. One database is kept per directory, in
+    ``MCP_DOCUMENTS_READER_INDEX_DIR``, else the ``corpus`` folder of
+    ``MCP_DOCUMENTS_READER_CACHE_DIR``, else ``~/.cache/mcp-documents-reader``.
+    """
+
+    k1 = 1.2
+    b = 0.75
+    segment_terms = 2_000_000
+    max_segments = 16
+    max_errors = 20
+    _open: dict[str, "CorpusIndex"] = {}
+    _open_lock = threading.Lock()
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._lengths: dict[int, int] | None = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            # AUTOINCREMENT: ids of dropped documents must never be reused
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT UNIQUE NOT NULL, "
+            "size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+            "length INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, documents INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "term TEXT NOT NULL, segment INTEGER NOT NULL, "
+            "documents BLOB NOT NULL, frequencies BLOB NOT NULL, "
+            "positions BLOB NOT NULL, PRIMARY KEY (term, segment));"
+            "CREATE TABLE IF NOT EXISTS failures ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, error TEXT NOT NULL);"
+        )
+
+    @classmethod
+    def directory(cls) -> str:
+        """Directory where corpus indexes are stored"""
+        index_dir = os.environ.get(ENV_PREFIX + "INDEX_DIR")
+        cache_dir = os.environ.get(ENV_PREFIX + "CACHE_DIR")
+        if index_dir:
+            return index_dir
+        if cache_dir:
+            return os.path.join(cache_dir, "corpus")
+        return os.path.join(os.path.expanduser("~"), ".cache", "mcp-documents-reader")
+
+    @classmethod
+    def for_directory(cls, directory: str, create: bool = True) -> "CorpusIndex | None":
+        """Return the index of a document directory
+
+        With ``create=False``, returns None if the directory was never indexed.
+        """
+        root = os.path.realpath(directory)
+        name = hashlib.sha256(root.encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(cls.directory(), f"corpus-{name}.sqlite3")
+        with cls._open_lock:
+            index = cls._open.get(path)
+            if index is None:
+                if not create and not os.path.exists(path):
+                    return None
+                index = cls._open[path] = cls(path)
+            return index
+
+    def close(self) -> None:
+        """Close the database and forget the open index"""
+        with self._open_lock:
+            self._open.pop(self.path, None)
+        with self._lock:
+            self._db.close()
+
+    def documents(self) -> dict[str, tuple[int, int]]:
+        """Map every indexed path to the (size, mtime_ns) it was indexed at"""
+        with self._lock:
+            rows = self._db.execute("SELECT path, size, mtime_ns FROM documents")
+            return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def failures(self) -> dict[str, tuple[int, int, str]]:
+        """Map paths that failed to extract to their (size, mtime_ns, error)"""
+        with self._lock:
+            rows = self._db.execute("SELECT path, size, mtime_ns, error FROM failures")
+            return {
+                path: (size, mtime_ns, error) for path, size, mtime_ns, error in rows
+            }
+
+    def update(
+        self,
+        directory: str,
+        recursive: bool = True,
+        max_workers: int = 4,
+        changes: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Bring the index in line with the supported files of a directory
+
+        New files and files whose size or mtime changed are extracted and
+        indexed, files that are gone are dropped and the rest are skipped.
+        Files that fail to extract are left out, and retried once they change.
+        ``changes`` from :meth:`ChangeTracker.diff` replaces the index's own
+        comparison of the directory with the indexed files.
+        """
+        started = time.perf_counter()
+        with self._update_lock:
+            if changes is None:
+                known = self.documents()
+                known.update((path, stat[:2]) for path, stat in self.failures().items())
+                changes = _diff_files(known, _scan_documents(directory, recursive))
+            entries = changes["entries"]
+            with self._lock, self._db:
+                for path in changes["deleted"]:
+                    self._delete(path)
+                for path in changes["touched"]:
+                    for table in ("documents", "failures"):
+                        self._db.execute(
+                            f"UPDATE {table} SET size = ?, mtime_ns = ? WHERE path = ?",
+                            (*entries[path][:2], path),
+                        )
+
+            changed = changes["added"] + changes["modified"]
+            indexed = 0
+            batch: list[tuple[str, tuple[int, int], int, dict[str, list[int]]]] = []
+            batch_terms = 0
+            for path, result in _map_bounded(_document_terms, changed, max_workers):
+                if isinstance(result, Exception):
+                    with self._lock, self._db:
+                        self._delete(path)
+                        self._db.execute(
+                            "INSERT INTO failures (path, size, mtime_ns, error) "
+                            "VALUES (?, ?, ?, ?)",
+                            (path, *entries[path][:2], str(result)),
+                        )
+                    continue
+                length, positions = result
+                batch.append((path, entries[path][:2], length, positions))
+                batch_terms += length
+                indexed += 1
+                if batch_terms >= self.segment_terms:
+                    self._write_segment(batch)
+                    batch, batch_terms = [], 0
+            self._write_segment(batch)
+            self._merge_segments()
+
+            with self._lock:
+                documents = self._db.execute("SELECT COUNT(*) FROM documents")
+                failed = self._db.execute("SELECT COUNT(*) FROM failures")
+                errors = self._db.execute(
+                    "SELECT path, error FROM failures ORDER BY path LIMIT ?",
+                    (self.max_errors,),
+                )
+                summary = {
+                    "index_path": self.path,
+                    "documents": documents.fetchone()[0],
+                    "indexed": indexed,
+                    "unchanged": changes["unchanged"] + len(changes["touched"]),
+                    "removed": len(changes["deleted"]),
+                    "failed": failed.fetchone()[0],
+                    "errors": [
+                        {"path": path, "error": error} for path, error in errors
+                    ],
+                }
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        return summary
+
+    def search(self, query: str, limit: int = 10) -> dict[str, Any]:
+        """Rank indexed documents against a query with BM25
+
+        Words are OR-ed together; ``"quoted text"``, and words that split into
+        several terms, must match as a phrase, using the stored positions.
+        """
+        clauses: dict[tuple[str, ...], str] = {}
+        for quoted, word in _QUERY_PART.findall(query):
+            terms = tuple(_terms(quoted or word))
+            if terms:
+                clauses.setdefault(terms, quoted or word)
+
+        with self._lock:
+            lengths = self._live_lengths()
+            count = len(lengths)
+            average = sum(lengths.values()) / count if count else 0.0
+            scores: dict[int, float] = {}
+            matched: dict[int, dict[str, int]] = {}
+            for clause, label in clauses.items() if count else ():
+                if len(clause) == 1:
+                    frequencies = self._term_frequencies(clause[0], lengths)
+                else:
+                    frequencies = self._phrase_frequencies(clause, lengths)
+                idf = math.log(
+                    1 + (count - len(frequencies) + 0.5) / (len(frequencies) + 0.5)
+                )
+                for document, frequency in frequencies.items():
+                    norm = 1 - self.b + self.b * lengths[document] / (average or 1)
+                    scores[document] = scores.get(document, 0.0) + idf * (
+                        frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+                    )
+                    matched.setdefault(document, {})[label] = frequency
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            paths = {
+                document: self._db.execute(
+                    "SELECT path FROM documents WHERE id = ?", (document,)
+                ).fetchone()[0]
+                for document, _ in top
+            }
+        return {
+            "results": [
+                {
+                    "path": paths[document],
+                    "score": round(score, 4),
+                    "matches": matched[document],
+                }
+                for document, score in top
+            ],
+            "total": len(scores),
+        }
+
+    def _live_lengths(self) -> dict[int, int]:
+        """Map the ids of live documents to their lengths; caller holds the lock"""
+        if self._lengths is None:
+            rows = self._db.execute("SELECT id, length FROM documents")
+            self._lengths = dict(rows.fetchall())
+        return self._lengths
+
+    def _term_frequencies(self, term: str, live: dict[int, int]) -> dict[int, int]:
+        """Map the live documents containing a term to its frequency"""
+        frequencies: dict[int, int] = {}
+        rows = self._db.execute(
+            "SELECT documents, frequencies FROM postings WHERE term = ?", (term,)
+        )
+        for documents, counts in rows:
+            for document, count in zip(
+                itertools.accumulate(_unpack(documents)), _unpack(counts)
+            ):
+                if document in live:
+                    frequencies[document] = count
+        return frequencies
+
+    def _phrase_frequencies(
+        self, clause: tuple[str, ...], live: dict[int, int]
+    ) -> dict[int, int]:
+        """Map the live documents containing a phrase to its frequency"""
+        positions: dict[str, dict[int, set[int]]] = {}
+        for term in dict.fromkeys(clause):
+            found: dict[int, set[int]] = {}
+            rows = self._db.execute(
+                "SELECT documents, frequencies, positions FROM postings WHERE term = ?",
+                (term,),
+            )
+            for documents, counts, packed in rows:
+                deltas = _unpack(packed)
+                offset = 0
+                for document, count in zip(
+                    itertools.accumulate(_unpack(documents)), _unpack(counts)
+                ):
+                    if document in live and (
+                        not positions or document in positions[clause[0]]
+                    ):
+                        found[document] = set(
+                            itertools.accumulate(deltas[offset : offset + count])
+                        )
+                    offset += count
+            positions[term] = found
+        frequencies = {}
+        for document in set.intersection(*(set(docs) for docs in positions.values())):
+            frequency = sum(
+                all(
+                    start + i in positions[term][document]
+                    for i, term in enumerate(clause)
+                )
+                for start in positions[clause[0]][document]
+            )
+            if frequency:
+                frequencies[document] = frequency
+        return frequencies
+
+    def _write_segment(
+        self, batch: list[tuple[str, tuple[int, int], int, dict[str, list[int]]]]
+    ) -> None:
+        """Store a batch of documents as a new segment"""
+        if not batch:
+            return
+        with self._lock, self._db:
+            segment = self._db.execute(
+                "INSERT INTO segments (documents) VALUES (?)", (len(batch),)
+            ).lastrowid
+            postings: dict[str, tuple[list[int], list[int], list[int]]] = {}
+            for path, stat, length, positions in batch:
+                self._delete(path)
+                document = self._db.execute(
+                    "INSERT INTO documents (path, size, mtime_ns, length) "
+                    "VALUES (?, ?, ?, ?)",
+                    (path, *stat, length),
+                ).lastrowid
+                assert document is not None
+                for term, found in positions.items():
+                    entry = postings.get(term)
+                    if entry is None:
+                        entry = postings[term] = ([], [], [])
+                    entry[0].append(document)
+                    entry[1].append(len(found))
+                    entry[2].extend(_deltas(found))
+            self._db.executemany(
+                "INSERT INTO postings (term, segment, documents, frequencies, "
+                "positions) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (term, segment, _pack(_deltas(ids)), _pack(counts), _pack(deltas))
+                    for term, (ids, counts, deltas) in postings.items()
+                ),
+            )
+            self._lengths = None
+
+    def _merge_segments(self) -> None:
+        """Merge all segments into one, dropping dead postings, when due"""
+        with self._lock:
+            segments, referenced = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(documents), 0) FROM segments"
+            ).fetchone()
+            live = self._live_lengths()
+            if segments <= 1 or (
+                segments <= self.max_segments and referenced <= 2 * len(live)
+            ):
+                return
+            with self._db:
+                merged = self._db.execute(
+                    "INSERT INTO segments (documents) VALUES (?)", (len(live),)
+                ).lastrowid
+                rows = self._db.execute(
+                    "SELECT term, documents, frequencies, positions FROM postings "
+                    "WHERE segment < ? ORDER BY term, segment",
+                    (merged,),
+                )
+                writes = []
+                for term, group in itertools.groupby(rows, key=lambda row: row[0]):
+                    ids: list[int] = []
+                    counts: list[int] = []
+                    deltas = array("I")
+                    for _, documents, frequencies, packed in group:
+                        positions = _unpack(packed)
+                        offset = 0
+                        for document, count in zip(
+                            itertools.accumulate(_unpack(documents)),
+                            _unpack(frequencies),
+                        ):
+                            if document in live:
+                                ids.append(document)
+                                counts.append(count)
+                                deltas.extend(positions[offset : offset + count])
+                            offset += count
+                    if ids:
+                        writes.append(
+                            (
+                                term,
+                                merged,
+                                _pack(_deltas(ids)),
+                                _pack(counts),
+                                _pack(deltas),
+                            )
+                        )
+                self._db.executemany(
+                    "INSERT INTO postings (term, segment, documents, frequencies, "
+                    "positions) VALUES (?, ?, ?, ?, ?)",
+                    writes,
+                )
+                self._db.execute("DELETE FROM postings WHERE segment < ?", (merged,))
+                self._db.execute("DELETE FROM segments WHERE id < ?", (merged,))
+
+    def _delete(self, path: str) -> None:
+        """Drop a document and any failure; the caller holds the lock
+
+        The document's postings stay behind until the next merge.
+        """
+        self._db.execute("DELETE FROM documents WHERE path = ?", (path,))
+        self._db.execute("DELETE FROM failures WHERE path = ?", (path,))
+        self._lengths = None
+
+
+def _map_bounded(
+    func: Callable[[str], T], items: list[str], max_workers: int
+) -> Iterator[tuple[str, T | Exception]]:
+    """Run ``func`` over items on a thread pool, yielding results in order
+
+    Only a small window of calls is in flight, so results never pile up
+    faster than the caller consumes them.
+    """
+    workers = max(1, max_workers)
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="index-directory"
+    ) as pool:
+        pending: deque[tuple[str, Future]] = deque()
+        remaining = iter(items)
+        while True:
+            for item in itertools.islice(remaining, workers * 2 - len(pending)):
+                pending.append((item, pool.submit(func, item)))
+            if not pending:
+                return
+            item, future = pending.popleft()
+            try:
+                yield item, future.result()
+            except Exception as e:
+                yield item, e
+
+
+class ChangeTracker:
+    """Manifest of a directory's documents, diffed to find what changed
+
+    The manifest records the size, mtime and, with ``hash_content``, the
+    SHA-256 of every supported file. A diff only stats the files; contents are
+    hashed only for new files and files whose size or mtime moved, so a file
+    rewritten with identical bytes is reported as touched rather than modified.
+    :meth:`refresh` re-extracts just the new and modified files, into the
+    extraction cache and the directory's :class:`CorpusIndex` if it has one.
+    Manifests are stored next to the corpus indexes, one per directory.
+    """
+
+    max_errors = 20
+    _open: dict[str, "ChangeTracker"] = {}
+    _open_lock = threading.Lock()
+
+    def __init__(self, path: str, hash_content: bool = False) -> None:
+        self.path = path
+        self.hash_content = hash_content
+        self.last_refresh: dict[str, Any] | None = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._watching: threading.Event | None = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, digest TEXT);"
+        )
+
+    @classmethod
+    def for_directory(
+        cls, directory: str, hash_content: bool | None = None
+    ) -> "ChangeTracker":
+        """Return the change tracker of a document directory
+
+        ``hash_content`` defaults to ``MCP_DOCUMENTS_READER_CACHE_HASH``.
+        """
+        root = os.path.realpath(directory)
+        name = hashlib.sha256(root.encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(CorpusIndex.directory(), f"manifest-{name}.sqlite3")
+        with cls._open_lock:
+            tracker = cls._open.get(path)
+            if tracker is None:
+                if hash_content is None:
+                    hash_content = _env_flag("CACHE_HASH")
+                tracker = cls._open[path] = cls(path, hash_content)
+            return tracker
+
+    def close(self) -> None:
+        """Stop watching, close the database and forget the open tracker"""
+        self.stop()
+        with self._open_lock:
+            self._open.pop(self.path, None)
+        with self._lock:
+            self._db.close()
+
+    def manifest(self) -> dict[str, tuple[int, int, str | None]]:
+        """Map every recorded path to its (size, mtime_ns, digest)"""
+        with self._lock:
+            rows = self._db.execute("SELECT path, size, mtime_ns, digest FROM files")
+            return {
+                path: (size, mtime_ns, digest) for path, size, mtime_ns, digest in rows
+            }
+
+    def diff(
+        self, directory: str, recursive: bool = True, max_workers: int = 4
+    ) -> dict[str, Any]:
+        """Compare the directory with the manifest, without recording anything
+
+        Returns ``added``, ``modified``, ``deleted`` and ``touched`` path
+        lists, the ``unchanged`` count and the new ``entries`` of the added,
+        modified and touched files.
+        """
+        known = self.manifest()
+        changes = _diff_files(known, _scan_documents(directory, recursive))
+        if self.hash_content:
+            entries = changes["entries"]
+            paths = changes["added"] + changes["modified"]
+            for path, digest in _map_bounded(_file_digest, paths, max_workers):
+                if isinstance(digest, str):
+                    entries[path] = (*entries[path][:2], digest)
+            changes["touched"] = [
+                path
+                for path in changes["modified"]
+                if entries[path][2] is not None and entries[path][2] == known[path][2]
+            ]
+            touched = set(changes["touched"])
+            changes["modified"] = [
+                path for path in changes["modified"] if path not in touched
+            ]
+        return changes
+
+    def record(self, changes: dict[str, Any]) -> None:
+        """Write the outcome of :meth:`diff` to the manifest"""
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM files WHERE path = ?",
+                ((path,) for path in changes["deleted"]),
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) "
+                "VALUES (?, ?, ?, ?)",
+                ((path, *entry) for path, entry in changes["entries"].items()),
+            )
+
+    def refresh(
+        self, directory: str, recursive: bool = True, max_workers: int = 4
+    ) -> dict[str, Any]:
+        """Re-extract what changed since the last refresh and record it
+
+        New and modified files are extracted into the directory's corpus index
+        when it has one, else into the extraction cache; without either there
+        is nothing to re-extract and the manifest alone is updated.
+        """
+        started = time.perf_counter()
+        with self._refresh_lock:
+            known = set(self.manifest())
+            changes = self.diff(directory, recursive, max_workers)
+            changed = changes["added"] + changes["modified"]
+            summary: dict[str, Any] = {
+                "added": len(changes["added"]),
+                "modified": len(changes["modified"]),
+                "deleted": len(changes["deleted"]),
+                "unchanged": changes["unchanged"] + len(changes["touched"]),
+                "extracted": 0,
+                "failed": 0,
+                "errors": [],
+                "index": None,
+            }
+            index = CorpusIndex.for_directory(directory, create=False)
+            if index is not None:
+                # An index built apart from this manifest compares on its own
+                indexed = set(index.documents()) | set(index.failures())
+                summary["index"] = index.update(
+                    directory,
+                    recursive,
+                    max_workers,
+                    changes=changes if indexed == known else None,
+                )
+                summary["extracted"] = summary["index"]["indexed"]
+                summary["failed"] = summary["index"]["failed"]
+                summary["errors"] = summary["index"]["errors"]
+            elif DocumentReaderFactory.cache is not None:
+                for path, text in _map_bounded(
+                    DocumentReaderFactory.read, changed, max_workers
+                ):
+                    if isinstance(text, str) and not isinstance(text, ErrorMessage):
+                        summary["extracted"] += 1
+                        continue
+                    summary["failed"] += 1
+                    if len(summary["errors"]) < self.max_errors:
+                        summary["errors"].append({"path": path, "error": str(text)})
+            self.record(changes)
+            summary["seconds"] = round(time.perf_counter() - started, 3)
+            self.last_refresh = summary
+            return summary
+
+    def watch(
+        self,
+        directory: str,
+        interval: float,
+        recursive: bool = True,
+        max_workers: int = 4,
+    ) -> None:
+        """Refresh the directory every ``interval`` seconds in the background
+
+        Replaces any running watch; the latest outcome is kept in
+        ``last_refresh``, with an ``error`` entry if the refresh failed.
+        """
+        self.stop()
+        stopped = self._watching = threading.Event()
+
+        def poll() -> None:
+            while not stopped.wait(interval):
+                try:
+                    self.refresh(directory, recursive, max_workers)
+                except Exception as e:
+                    self.last_refresh = {"error": str(e)}
+
+        threading.Thread(target=poll, name="change-tracker", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop the background watch, if any"""
+        if self._watching is not None:
+            self._watching.set()
+            self._watching = None
+
+    @property
+    def watching(self) -> bool:
+        """Whether a background watch is running"""
+        return self._watching is not None
+
+
+def _scan_documents(directory: str, recursive: bool) -> dict[str, tuple[int, int]]:
+    """Map every supported file of a directory to its (size, mtime_ns)
+
+    Paths are resolved like :meth:`ExtractionCache.signature` and come in the
+    order of a sorted top-down walk.
+    """
+    files: dict[str, tuple[int, int]] = {}
+    folders = [os.path.realpath(directory)]
+    while folders:
+        folder = folders.pop()
+        try:
+            with os.scandir(folder) as scan:
+                entries = sorted(scan, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subfolders = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subfolders.append(entry.path)
+                elif DocumentReaderFactory.is_supported(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    path = entry.path
+                    if entry.is_symlink():
+                        path = os.path.realpath(path)
+                    files[path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        if recursive:
+            folders.extend(reversed(subfolders))
+    return files
+
+
+def _diff_files(
+    known: dict[str, tuple], files: dict[str, tuple[int, int]]
+) -> dict[str, Any]:
+    """Compare recorded (size, mtime_ns, ...) tuples with a fresh scan"""
+    added = [path for path in files if path not in known]
+    modified = [
+        path for path, stat in files.items() if known.get(path, stat)[:2] != stat
+    ]
+    return {
+        "added": added,
+        "modified": modified,
+        "deleted": [path for path in known if path not in files],
+        "touched": [],
+        "unchanged": len(files) - len(added) - len(modified),
+        "entries": {path: (*files[path], None) for path in added + modified},
+    }
+
+
+class FairScheduler(Executor):
+    """Thread pool that shares its workers fairly between clients and sizes
+
+    Calls are queued in flows keyed by client and size class, and served by
+    start-time fair queuing: a call is tagged with the later of the current
+    virtual time and the tag of its flow's previous call plus that call's
+    cost, and the queued call with the lowest tag runs next. A client's
+    burst of huge documents therefore queues behind its own earlier calls,
+    while a small read from anyone starts almost at once. On top of that, at
+    most ``class_limits[size_class]`` calls of a class run at the same time,
+    and at most ``bulk_limit`` medium and large calls together, so one worker
+    is always left for small calls.
+    """
+
+    # Upper bound of each size class's estimated cost (bytes times the
+    # reader's cost factor)
+    size_classes = (("small", 1 << 20), ("medium", 64 << 20), ("large", math.inf))
+
+    def __init__(
+        self,
+        max_workers: int,
+        class_limits: dict[str, int] | None = None,
+        bulk_limit: int | None = None,
+    ) -> None:
+        self._max_workers = max_workers
+        self.class_limits = {
+            "small": max_workers,
+            "medium": max(1, max_workers - 1),
+            "large": max(1, max_workers // 2),
+            **(class_limits or {}),
+        }
+        self.bulk_limit = bulk_limit or max(1, max_workers - 1)
+        self._condition = threading.Condition()
+        # flow -> queued (tag, sequence, future, func), oldest first
+        self._flows: dict[tuple[str | None, str], deque] = {}
+        self._tags: dict[tuple[str | None, str], float] = {}
+        self._virtual = 0.0
+        self._sequence = itertools.count()
+        self._running = {name: 0 for name, _ in self.size_classes}
+        self._threads: list[threading.Thread] = []
+        self._idle = 0
+        self._shutdown = False
+
+    def size_class(self, cost: float) -> str:
+        """Name of the size class of a call of the given cost"""
+        return next(name for name, bound in self.size_classes if cost < bound)
+
+    def schedule(
+        self, func: Callable[[], T], cost: float = 0.0, client: str | None = None
+    ) -> "Future[T]":
+        """Queue ``func`` in the flow of ``client`` and its cost's size class"""
+        flow = (client, self.size_class(cost))
+        future: Future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            tag = max(self._virtual, self._tags.get(flow, 0.0))
+            # Zero-cost calls still advance their flow, keeping it FIFO-fair
+            self._tags[flow] = tag + max(cost, 1.0)
+            queue = self._flows.setdefault(flow, deque())
+            queue.append((tag, next(self._sequence), future, func))
+            if self._idle == 0 and len(self._threads) < self._max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"document-reader-fair-{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+        return future
+
+    @override
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> "Future[T]":
+        """Queue a call as a zero-cost call without a client"""
+        return self.schedule(functools.partial(fn, *args, **kwargs))
+
+    @override
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._condition:
+            self._shutdown = True
+            if cancel_futures:
+                for queue in self._flows.values():
+                    for _, _, future, _ in queue:
+                        future.cancel()
+                self._flows.clear()
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def stats(self) -> dict[str, Any]:
+        """Running and queued calls per size class, and the number of flows"""
+        with self._condition:
+            queued = dict.fromkeys(self._running, 0)
+            for (_, size_class), queue in self._flows.items():
+                queued[size_class] += len(queue)
+            return {
+                "workers": self._max_workers,
+                "running": dict(self._running),
+                "queued": queued,
+                "flows": len(self._flows),
+            }
+
+    def _next(self) -> tuple[str, Future, Callable] | None:
+        """Pop the queued call with the lowest tag whose class has room"""
+        best = None
+        bulk_full = self._running["medium"] + self._running["large"] >= self.bulk_limit
+        for flow, queue in self._flows.items():
+            if self._running[flow[1]] >= self.class_limits[flow[1]]:
+                continue
+            if bulk_full and flow[1] != "small":
+                continue
+            if best is None or queue[0][:2] < self._flows[best][0][:2]:
+                best = flow
+        if best is None:
+            return None
+        queue = self._flows[best]
+        tag, _, future, func = queue.popleft()
+        if not queue:
+            del self._flows[best]
+        self._virtual = max(self._virtual, tag)
+        if len(self._tags) > 1024:
+            # Flows whose tags fell behind the virtual time restart from it
+            # anyway, so forgetting them changes nothing
+            self._tags = {
+                flow: tag for flow, tag in self._tags.items() if tag > self._virtual
+            }
+        return best[1], future, func
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while (picked := self._next()) is None:
+                    if self._shutdown and not self._flows:
+                        return
+                    self._idle += 1
+                    self._condition.wait()
+                    self._idle -= 1
+                size_class, future, func = picked
+                self._running[size_class] += 1
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = func()
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._condition:
+                    self._running[size_class] -= 1
+                    # A class may have dropped below its limit
+                    self._condition.notify_all()
+
+
+class ServerBusy(RuntimeError):
+    """A call was rejected because the server's queues are full"""
+
+
+class AdmissionControl:
+    """Bound on the MCP calls running or queued at once
+
+    Calls beyond ``max_in_flight`` are rejected with :class:`ServerBusy`
+    instead of waiting in an unbounded queue, and :meth:`middleware` turns
+    tool calls arriving over HTTP while the bound is reached into
+    ``429 Too Many Requests`` responses, so clients back off and retry.
+    """
+
+    def __init__(self, max_in_flight: int, retry_after_s: int = 1) -> None:
+        self.max_in_flight = max_in_flight
+        self.retry_after_s = retry_after_s
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    def full(self) -> bool:
+        """Whether a new call would be rejected"""
+        return self._in_flight >= self.max_in_flight
+
+    def acquire(self) -> None:
+        """Admit a call, raising :class:`ServerBusy` when the bound is reached"""
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self._rejected += 1
+                raise ServerBusy(
+                    f"Server busy: {self._in_flight} calls in flight; "
+                    f"retry in {self.retry_after_s} s"
+                )
+            self._in_flight += 1
+
+    def release(self) -> None:
+        """Mark an admitted call as finished"""
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> dict[str, int]:
+        """The bound, the calls in flight and the calls rejected so far"""
+        with self._lock:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def middleware(self, app: Callable) -> Callable:
+        """Wrap an ASGI app to answer tool calls with 429 while full
+
+        Only POST bodies are read, and only while the bound is reached, to
+        tell ``tools/call`` requests apart; other messages, such as
+        notifications and responses to the server, are passed on with the
+        body replayed, so clients can still cancel calls and finish sessions.
+        """
+
+        async def guarded(scope: dict, receive: Callable, send: Callable) -> None:
+            if scope["type"] != "http" or scope["method"] != "POST" or not self.full():
+                await app(scope, receive, send)
+                return
+            messages = []
+            while True:
+                message = await receive()
+                messages.append(message)
+                if message["type"] != "http.request" or not message.get("more_body"):
+                    break
+            calls = _tool_calls(b"".join(m.get("body", b"") for m in messages))
+            if not calls:
+
+                async def replay() -> dict:
+                    return messages.pop(0) if messages else await receive()
+
+                await app(scope, replay, send)
+                return
+            with self._lock:
+                self._rejected += 1
+            body = json.dumps(
+                {
+                    "jsonrpc": "2.0",
+                    "id": calls[0].get("id") if len(calls) == 1 else None,
+                    "error": {"code": -32000, "message": "Server busy; retry later"},
+                }
+            ).encode()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"retry-after", str(self.retry_after_s).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+
+        return guarded
+
+
+def _tool_calls(body: bytes) -> list[dict[str, Any]]:
+    """The ``tools/call`` requests in a JSON-RPC message or batch"""
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return []
+    messages = message if isinstance(message, list) else [message]
+    return [
+        item
+        for item in messages
+        if isinstance(item, dict) and item.get("method") == "tools/call"
+    ]
+
+
+# Bound on in-flight MCP calls, set when serving over HTTP
+admission: AdmissionControl | None = None
+
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+# Runs the per-file reads of read_documents, sized like the executor
+_batch_executor: ThreadPoolExecutor | None = None
+
+
+def _default_workers() -> int:
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def configure_executor(max_workers: int | None = None, kind: str = "thread") -> None:
+    """Replace the executor that runs blocking extraction work
+
+    :param max_workers: Maximum number of extractions running at once
+    :param kind: ``"thread"``, ``"process"`` or ``"fair"`` (a
+        :class:`FairScheduler`)
+    """
+    global _executor, _batch_executor
+    if kind not in ("thread", "process", "fair"):
+        raise ValueError(f"Unsupported executor kind: {kind}")
+    workers = max_workers or _default_workers()
+    with _executor_lock:
+        previous = _executor
+        if kind == "process":
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        elif kind == "fair":
+            _executor = FairScheduler(workers)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="document-reader"
+            )
+        previous_batch, _batch_executor = _batch_executor, None
+    if previous is not None:
+        previous.shutdown(wait=False)
+    if previous_batch is not None:
+        previous_batch.shutdown(wait=False)
+
+
+def get_executor() -> Executor:
+    """Return the shared extraction executor, creating it from the environment"""
+    if _executor is None:
+        configure_executor(
+            _env_int("MAX_WORKERS", 0) or None,
+            os.environ.get(ENV_PREFIX + "EXECUTOR", "thread"),
+        )
+    assert _executor is not None
+    return _executor
+
+
+def _batch_pool() -> ThreadPoolExecutor:
+    """Return the pool for per-file reads of multi-file tools
+
+    Its size matches the configured executor, so batches together never read
+    more files at once than the executor would run calls. It is separate from
+    the executor because the batch itself runs there, and waiting on the same
+    pool could deadlock it.
+    """
+    global _batch_executor
+    workers = getattr(get_executor(), "_max_workers", None) or _default_workers()
+    with _executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="read-documents"
+            )
+        return _batch_executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the extraction executor without stalling the loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+# Observed tool functions by name, so executor processes can look them up
+_observed_tools: dict[str, Callable[..., Any]] = {}
+
+
+def _observed_call(
+    tool_name: str, *args: Any, **kwargs: Any
+) -> tuple[bool, Any, dict[tuple[str, str], dict[str, Any]]]:
+    """Call a tool in an executor process; runs in the worker
+
+    Returns whether it succeeded, its result or exception, and the metrics
+    recorded during the call, for the parent to merge.
+    """
+    metrics.reset()
+    try:
+        result = _observed_tools[tool_name](*args, **kwargs)
+    except Exception as e:
+        return False, e, metrics.export()
+    return True, result, metrics.export()
+
+
+def _offload_tool(func: Callable[..., T]) -> Callable[..., T]:
+    """Register ``func`` as an MCP tool whose calls run on the executor
+
+    The function itself is returned unchanged, so it stays usable as a plain
+    synchronous API. Each call runs under a :class:`Cancellation` that is
+    cancelled when the client cancels the request. On a
+    :class:`FairScheduler`, calls are queued by client and estimated cost.
+    While :data:`admission` is set, calls beyond its bound raise
+    :class:`ServerBusy`. On a process executor, calls run through
+    :func:`_observed_call` and their metrics are merged back here; a client
+    cancellation does not reach them there.
+    """
+
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def observed(*args: Any, **kwargs: Any) -> T:
+        started = time.perf_counter()
+        try:
+            filename = signature.bind_partial(*args, **kwargs).arguments.get("filename")
+            size = os.path.getsize(filename) if filename else 0
+        except (OSError, TypeError):
+            size = 0
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            metrics.observe(
+                "tools",
+                func.__name__,
+                time.perf_counter() - started,
+                bytes_in=size,
+                error=type(e).__name__,
+            )
+            raise
+        error = _error_kind(result)
+        metrics.observe(
+            "tools",
+            func.__name__,
+            time.perf_counter() - started,
+            bytes_in=size,
+            chars_out=len(result) if isinstance(result, str) and not error else 0,
+            error=error,
+        )
+        return result
+
+    _observed_tools[func.__name__] = observed
+
+    @functools.wraps(func)
+    async def tool(*args: Any, **kwargs: Any) -> T:
+        limit = admission
+        if limit is None:
+            return await run(*args, **kwargs)
+        try:
+            limit.acquire()
+        except ServerBusy as e:
+            metrics.observe("tools", func.__name__, 0.0, error=type(e).__name__)
+            raise
+        try:
+            return await run(*args, **kwargs)
+        finally:
+            limit.release()
+
+    async def run(*args: Any, **kwargs: Any) -> T:
+        token = Cancellation()
+        call = functools.partial(token.run, observed, *args, **kwargs)
+        executor = get_executor()
+        if isinstance(executor, ProcessPoolExecutor):
+            # Closures and tokens cannot be pickled into the worker process
+            ok, result, operations = await run_blocking(
+                _observed_call, func.__name__, *args, **kwargs
+            )
+            metrics.merge(operations)
+            if not ok:
+                raise result
+            return result
+        try:
+            if isinstance(executor, FairScheduler):
+                arguments = signature.bind_partial(*args, **kwargs).arguments
+                future = executor.schedule(call, _call_cost(arguments), _client_id())
+                return await asyncio.wrap_future(future)
+            return await run_blocking(call)
+        except asyncio.CancelledError:
+            # The client gave up; stop the extraction still running for it
+            token.cancel()
+            raise
+
+    mcp.tool()(tool)
+    return func
+
+
+# Directory-wide calls are scheduled as large, whatever the directory holds
+DIRECTORY_COST = float(1 << 30)
+
+
+def _call_cost(arguments: dict[str, Any]) -> float:
+    """Estimate the cost of a tool call from the documents it names"""
+    if isinstance(arguments.get("filename"), str):
+        return DocumentReaderFactory.estimate_cost(arguments["filename"])
+    if isinstance(arguments.get("filenames"), list):
+        return sum(
+            DocumentReaderFactory.estimate_cost(filename)
+            for filename in arguments["filenames"]
+            if isinstance(filename, str)
+        )
+    if "directory" in arguments:
+        return DIRECTORY_COST
+    return 0.0
+
+
+def _client_id() -> str | None:
+    """Identify the MCP client of the current request, if any
+
+    Clients that send a ``client_id`` in the request metadata are told apart
+    by it, others by their session.
+    """
+    try:
+        context = mcp.get_context().request_context
+    except ValueError:
+        return None
+    client = getattr(context.meta, "client_id", None) if context.meta else None
+    return str(client) if client else f"session-{id(context.session):x}"
+
+
+def _error_kind(result: Any) -> str | None:
+    """Classify an error returned (rather than raised) by a tool, else None"""
+    if isinstance(result, dict):
+        result = result.get("error")
+    elif not isinstance(result, ErrorMessage):
+        return None
+    if not isinstance(result, str) or not result.startswith("Error"):
+        return None
+    if result.endswith("not found."):
+        return "NotFound"
+    if result.startswith("Error: Unsupported"):
+        return "UnsupportedFormat"
+    if result.startswith("Error:"):
+        return "InvalidArgument"
+    return "ExtractionError"
+
+
+def _check_document(filename: str) -> ErrorMessage | None:
+    """Return an error message if the file cannot be read, otherwise None"""
+    file_path = Path(filename)
+
+    if not file_path.exists():
+        return ErrorMessage(f"Error: File '{filename}' not found.")
+
+    if not DocumentReaderFactory.is_supported(str(file_path)):
+        return ErrorMessage(f"Error: Unsupported document type for file '{filename}'.")
+
+    return None
+
+
+def _file_stamp(file_path: str) -> str:
+    """Short fingerprint of a file's size and mtime, used to validate cursors"""
+    signature = ExtractionCache.signature(file_path)
+    return hashlib.sha256(repr(signature).encode("utf-8")).hexdigest()[:12]
+
+
+def _tool_cursor(position: str, stamp: str, options: dict[str, Any]) -> str:
+    """Join a reader cursor, the reader options and the file stamp"""
+    if not options:
+        return f"{position}.{stamp}"
+    payload = json.dumps(options, separators=(",", ":"), sort_keys=True)
+    encoded = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+    return f"{position}.{encoded}.{stamp}"
+
+
+def _parse_tool_cursor(cursor: str) -> tuple[str, dict[str, Any], str]:
+    """Split a tool cursor into (reader cursor, reader options, file stamp)"""
+    parts = cursor.split(".")
+    if len(parts) < 2:
+        raise ValueError("Invalid cursor")
+    position, *encoded, stamp = parts
+    options: Any = {}
+    if encoded:
+        try:
+            options = json.loads(base64.urlsafe_b64decode(encoded[0]))
+        except ValueError:
+            options = None
+    if not position or len(encoded) > 1 or not isinstance(options, dict):
+        raise ValueError("Invalid cursor")
+    return position, options, stamp
+
+
+@_offload_tool
+def read_document(
+    filename: str,
+    start_page: int | None = None,
+    end_page: int | None = None,
+    pages: list[int] | None = None,
+    offset: int | None = None,
+    length: int | None = None,
+    start_line: int | None = None,
+    end_line: int | None = None,
+    sheet: str | int | None = None,
+    start_row: int | None = None,
+    end_row: int | None = None,
+    cell_range: str | None = None,
+    max_rows: int | None = None,
+    engine: str | None = None,
+    max_chars: int | None = None,
+    max_bytes: int | None = None,
+    timeout_s: float | None = None,
+    partial: bool = False,
+) -> str:
+    """
+    Reads and extracts text from a specified document file.
+    Supports multiple document types: TXT, DOCX, PDF, Excel (XLSX, XLS).
+
+    :param filename: Path to the document file to read
+        (supports absolute or relative paths)
+    :param start_page: First PDF page to extract (1-based, inclusive)
+    :param end_page: Last PDF page to extract (1-based, inclusive)
+    :param pages: Explicit list of PDF pages to extract (1-based)
+    :param offset: First TXT byte to read
+    :param length: Number of TXT bytes to read from offset
+    :param start_line: First TXT line to read (1-based, inclusive)
+    :param end_line: Last TXT line to read (1-based, inclusive)
+    :param sheet: Excel sheet to read, by name or 1-based index
+    :param start_row: First Excel row to read (1-based, inclusive)
+    :param end_row: Last Excel row to read (1-based, inclusive)
+    :param cell_range: A1-style Excel cell range to read, e.g. "A1:D100"
+    :param max_rows: Maximum number of rows to read from each Excel sheet
+    :param engine: Parser for Excel ("openpyxl", the default, or "xml") or
+        DOCX ("python-docx", the default, or "xml") files; "xml" streams the
+        document XML, which is faster on large files and, for DOCX, keeps
+        paragraphs and tables in document order
+    :param max_chars: Stop extracting after this many characters
+    :param max_bytes: Stop extracting after this many bytes of UTF-8 text
+    :param timeout_s: Stop extracting after this many seconds; defaults to
+        MCP_DOCUMENTS_READER_TIMEOUT, unlimited when that is unset
+    :param partial: When the timeout or a cancellation stops extraction,
+        return the text extracted so far instead of an error
+    :return: Extracted text from the document. When a budget cuts it short,
+        a final bracketed note says how much was left out and gives a cursor
+        for read_document_chunk to continue from; a partial result ends with
+        a bracketed note saying why it stopped
+    """
+    error = _check_document(filename)
+    if error is not None:
+        return error
+
+    file_path = Path(filename)
+    if timeout_s is None:
+        timeout_s = _env_int("TIMEOUT", 0) or None
+    try:
+        options = {
+            name: value
+            for name, value in (
+                ("start_page", start_page),
+                ("end_page", end_page),
+                ("pages", pages),
+                ("offset", offset),
+                ("length", length),
+                ("start_line", start_line),
+                ("end_line", end_line),
+                ("sheet", sheet),
+                ("start_row", start_row),
+                ("end_row", end_row),
+                ("cell_range", cell_range),
+                ("max_rows", max_rows),
+                ("engine", engine),
+            )
+            if value is not None
+        }
+        with Cancellation(timeout_s):
+            if max_chars is None and max_bytes is None:
+                return DocumentReaderFactory.read(str(file_path), **options)
+            return _read_budgeted(str(file_path), options, max_chars, max_bytes)
+    except ExtractionInterrupted as e:
+        if partial and e.partial:
+            return (
+                f"{e.partial}\n\n[Partial result: {e}; "
+                f"{len(e.partial):,} characters extracted.]"
+            )
+        return ErrorMessage(f"Error reading document: {str(e)}")
+    except Exception as e:
+        return ErrorMessage(f"Error reading document: {str(e)}")
+
+
+def _read_budgeted(
+    file_path: str,
+    options: dict[str, Any],
+    max_chars: int | None,
+    max_bytes: int | None,
+) -> str:
+    """Extract up to a character/byte budget, stopping as soon as it is spent"""
+    stamp = _file_stamp(file_path)
+    reader = DocumentReaderFactory.get_reader(file_path, **options)
+    chunks = reader.iter_chunks(
+        file_path, None, sys.maxsize if max_chars is None else max_chars, max_bytes
+    )
+    try:
+        text, position = next(chunks)
+    finally:
+        chunks.close()
+    if position is None:
+        return text or reader.empty_message
+
+    left = reader.remaining(file_path, position) or "unknown until extracted"
+    cursor = _tool_cursor(position, stamp, options)
+    return (
+        f"{text}\n\n[Truncated after {len(text):,} characters "
+        f"({_utf8_size(text):,} bytes); remaining: {left}. Call "
+        f'read_document_chunk with cursor="{cursor}" to continue.]'
+    )
+
+
+@_offload_tool
+def read_document_chunk(
+    filename: str,
+    cursor: str | None = None,
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    max_bytes: int | None = None,
+) -> dict[str, Any]:
+    """
+    Reads one chunk of a document's text, for documents too large to return
+    in one piece. Pass the returned next_cursor back to fetch the following
+    chunk; it is null once the end of the document has been reached. Cursors
+    from a truncated read_document call continue that read, with the same
+    page, line, sheet or row selection.
+
+    :param filename: Path to the document file to read
+        (supports absolute or relative paths)
+    :param cursor: Continuation cursor from a previous call
+        (omit for the first chunk)
+    :param max_chars: Maximum number of characters to return
+    :param max_bytes: Maximum number of bytes of UTF-8 text to return
+    :return: {"text": ..., "next_cursor": ...} plus "encoding" for TXT files,
+        or {"error": ...} on failure
+    """
+    error = _check_document(filename)
+    if error is not None:
+        return {"error": error}
+
+    try:
+        stamp = _file_stamp(filename)
+        position = None
+        options: dict[str, Any] = {}
+        if cursor:
+            position, options, cursor_stamp = _parse_tool_cursor(cursor)
+            if cursor_stamp != stamp:
+                return {
+                    "error": f"Error: File '{filename}' has changed since the "
+                    "cursor was issued."
+                }
+        reader = DocumentReaderFactory.get_reader(filename, **options)
+        chunks = reader.iter_chunks(filename, position, max_chars, max_bytes)
+        try:
+            text, next_position = next(chunks)
+        finally:
+            chunks.close()
+    except Exception as e:
+        return {"error": f"Error reading document: {str(e)}"}
+
+    next_cursor = (
+        _tool_cursor(next_position, stamp, options)
+        if next_position is not None
+        else None
+    )
+    chunk: dict[str, Any] = {"text": text, "next_cursor": next_cursor}
+    encoding = getattr(reader, "encoding", None)
+    if encoding is not None:
+        chunk["encoding"] = encoding
+    return chunk
+
+
+DEFAULT_SEARCH_MATCHES = 100
+
+
+@_offload_tool
+def search_document(
+    filename: str,
+    pattern: str,
+    regex: bool = False,
+    case_sensitive: bool = False,
+    context_chars: int = 80,
+    max_matches: int = DEFAULT_SEARCH_MATCHES,
+) -> dict[str, Any]:
+    """
+    Searches a document and returns only the matches, with their location,
+    instead of its full text. Extraction stops as soon as max_matches matches
+    have been found.
+
+    :param filename: Path to the document file to search
+        (supports absolute or relative paths)
+    :param pattern: Text to find, or a Python regular expression with regex
+    :param regex: Treat pattern as a regular expression
+    :param case_sensitive: Match letter case exactly
+    :param context_chars: Characters of surrounding text to return on each
+        side of a match
+    :param max_matches: Stop after this many matches
+    :return: {"matches": [...], "truncated": ...}, where each match has
+        "match", "context", "line" (1-based, in the extracted text) and its
+        location: "page" for PDF, "sheet"/"row"/"cell" for Excel,
+        "paragraph" or "table"/"row" for DOCX; "truncated" is true when
+        the search stopped at max_matches, so more matches may follow.
+        {"error": ...} on failure
+    """
+    error = _check_document(filename)
+    if error is not None:
+        return {"error": error}
+    if not pattern:
+        return {"error": "Error: pattern must not be empty."}
+    if max_matches < 1 or context_chars < 0:
+        return {
+            "error": "Error: max_matches must be at least 1 and context_chars "
+            "must not be negative."
+        }
+
+    try:
+        compiled = re.compile(
+            pattern if regex else re.escape(pattern),
+            0 if case_sensitive else re.IGNORECASE,
+        )
+    except re.error as e:
+        return {"error": f"Error: Invalid pattern: {str(e)}"}
+
+    matches: list[dict[str, Any]] = []
+    try:
+        reader = DocumentReaderFactory.get_reader(filename)
+        found = reader.search(filename, compiled, context_chars)
+        try:
+            for match in found:
+                matches.append(match)
+                if len(matches) == max_matches:
+                    return {"matches": matches, "truncated": True}
+        finally:
+            found.close()
+    except Exception as e:
+        return {"error": f"Error searching document: {str(e)}"}
+    return {"matches": matches, "truncated": False}
+
+
+@_offload_tool
+def inspect_document(filename: str) -> dict[str, Any]:
+    """
+    Returns a document's metadata without extracting its text, to decide
+    how to read it: page count and outline for PDF, sheet names and used
+    ranges for Excel, paragraph and table counts for DOCX, and encoding and
+    line count for TXT. Only headers and zip directories are read, so it is
+    cheap enough to call on every file of a large folder.
+
+    :param filename: Path to the document file to inspect
+        (supports absolute or relative paths)
+    :return: {"filename", "format", "size_bytes", "modified", ...} with the
+        format-specific fields, or {"error": ...} on failure
+    """
+    error = _check_document(filename)
+    if error is not None:
+        return {"error": error}
+
+    try:
+        reader = DocumentReaderFactory.get_reader(filename)
+        stat = os.stat(filename)
+        info: dict[str, Any] = {
+            "filename": filename,
+            "format": reader.name,
+            "size_bytes": stat.st_size,
+            "modified": stat.st_mtime,
+        }
+        info.update(reader.inspect(filename))
+    except Exception as e:
+        return {"error": f"Error inspecting document: {str(e)}"}
+    return info
+
+
+DEFAULT_BATCH_MAX_CHARS = 2_000_000
+
+
+@_offload_tool
+def read_documents(
+    filenames: list[str],
+    max_workers: int = 8,
+    max_total_chars: int = DEFAULT_BATCH_MAX_CHARS,
+    timeout_s: float | None = None,
+    partial: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Reads and extracts text from several document files in parallel.
+    Supports the same document types as read_document.
+
+    :param filenames: Paths to the document files to read
+        (supports absolute or relative paths)
+    :param max_workers: Maximum number of files extracted at the same time
+    :param max_total_chars: Cap on the combined length of all returned texts;
+        the file that crosses it is truncated and later files are skipped
+    :param timeout_s: Stop extracting after this many seconds for the whole
+        batch; files still being read then fail or, with partial, return what
+        was extracted so far
+    :param partial: Return the text extracted so far from files stopped by
+        the timeout or a cancellation, instead of an error
+    :return: One entry per file, in input order: {"filename", "text"}
+        (plus "truncated" when cut short) or {"filename", "error"}
+    """
+    pool = _batch_pool()
+    workers = max(1, min(max_workers, len(filenames) or 1))
+    results: list[dict[str, Any]] = []
+    remaining = max_total_chars
+    pending: deque[Future] = deque()
+    queued = iter(filenames)
+
+    with Cancellation(timeout_s) as batch:
+        for filename in filenames:
+            if remaining <= 0:
+                results.append(
+                    {
+                        "filename": filename,
+                        "error": "Error: Skipped, total output limit reached.",
+                    }
+                )
+                continue
+            # At most ``workers`` files of this batch are read at once
+            for next_filename in itertools.islice(queued, workers - len(pending)):
+                # Each file runs in a copy of this context, so it sees the
+                # batch token
+                pending.append(
+                    pool.submit(
+                        contextvars.copy_context().run,
+                        functools.partial(
+                            read_document, next_filename, partial=partial
+                        ),
+                    )
+                )
+            text = pending.popleft().result()
+            if isinstance(text, ErrorMessage):
+                results.append({"filename": filename, "error": str(text)})
+                continue
+            entry: dict[str, Any] = {"filename": filename, "text": text[:remaining]}
+            if len(text) > remaining:
+                entry["truncated"] = True
+            remaining -= len(text)
+            results.append(entry)
+            if remaining <= 0:
+                # The remaining files are skipped: drop the queued reads and
+                # stop the ones already running
+                for future in pending:
+                    future.cancel()
+                batch.cancel()
+
+    return results
+
+
+@_offload_tool
+def index_directory(
+    directory: str, recursive: bool = True, max_workers: int = 4
+) -> dict[str, Any]:
+    """
+    Builds or refreshes the full-text index of a document directory, for
+    search_corpus. Each document is extracted once; later calls only extract
+    new and modified files and drop deleted ones.
+
+    :param directory: Directory of documents to index
+        (supports absolute or relative paths)
+    :param recursive: Include documents in subdirectories
+    :param max_workers: Maximum number of files extracted at the same time
+    :return: {"index_path", "documents", "indexed", "unchanged", "removed",
+        "failed", "errors", "seconds"}, or {"error": ...} on failure
+    """
+    if not os.path.isdir(directory):
+        return {"error": f"Error: Directory '{directory}' not found."}
+    try:
+        index = CorpusIndex.for_directory(directory)
+        assert index is not None
+        return index.update(directory, recursive, max_workers)
+    except Exception as e:
+        return {"error": f"Error indexing directory: {str(e)}"}
+
+
+@_offload_tool
+def search_corpus(query: str, directory: str, limit: int = 10) -> dict[str, Any]:
+    """
+    Searches every document of a directory indexed with index_directory and
+    returns the best matches ranked by BM25, without extracting any document.
+    Words match in any order and case; "quoted text" matches as a phrase.
+
+    :param query: Words and "quoted phrases" to search for
+    :param directory: Directory previously passed to index_directory
+    :param limit: Maximum number of documents to return
+    :return: {"results": [{"path", "score", "matches"}], "total": ...}, where
+        "matches" counts each query term or phrase in the document and
+        "total" is the number of matching documents, or {"error": ...}
+    """
+    index = CorpusIndex.for_directory(directory, create=False)
+    if index is None:
+        return {
+            "error": f"Error: Directory '{directory}' has not been indexed; "
+            "call index_directory first."
+        }
+    try:
+        return index.search(query, max(1, limit))
+    except Exception as e:
+        return {"error": f"Error searching corpus: {str(e)}"}
+
+
+@_offload_tool
+def refresh_directory(
+    directory: str,
+    recursive: bool = True,
+    max_workers: int = 4,
+    watch_interval_s: float | None = None,
+) -> dict[str, Any]:
+    """
+    Finds the documents of a directory that were added, modified or deleted
+    since the last refresh and re-extracts only those, updating the
+    directory's index (see index_directory) or else the extraction cache.
+    The first refresh of a directory records every file as added.
+
+    :param directory: Directory of documents to refresh
+        (supports absolute or relative paths)
+    :param recursive: Include documents in subdirectories
+    :param max_workers: Maximum number of files extracted at the same time
+    :param watch_interval_s: Keep refreshing in the background every this
+        many seconds; 0 stops a running watch, omitted leaves it as it is
+    :return: {"added", "modified", "deleted", "unchanged", "extracted",
+        "failed", "errors", "index", "seconds", "watching"}, where "index" is
+        the index_directory summary when the directory is indexed, or
+        {"error": ...} on failure
+    """
+    if not os.path.isdir(directory):
+        return {"error": f"Error: Directory '{directory}' not found."}
+    try:
+        tracker = ChangeTracker.for_directory(directory)
+        result = tracker.refresh(directory, recursive, max_workers)
+        if watch_interval_s is not None and watch_interval_s <= 0:
+            tracker.stop()
+        elif watch_interval_s is not None:
+            tracker.watch(directory, watch_interval_s, recursive, max_workers)
+        result["watching"] = tracker.watching
+        return result
+    except Exception as e:
+        return {"error": f"Error refreshing directory: {str(e)}"}
+
+
+@_offload_tool
+def get_server_stats(prometheus: bool = False) -> dict[str, Any] | str:
+    """
+    Returns the server's metrics since startup: for every tool and reader
+    the call count, errors by type, bytes read, characters returned and a
+    latency histogram, plus the extraction cache hit ratio and, when in
+    use, the worker pool's counters, the fair scheduler's queues and the
+    admission bound of an HTTP server.
+
+    :param prometheus: Return the metrics in the Prometheus text format
+        instead of JSON
+    :return: {"uptime_s", "cache": {"hits", "misses", "hit_ratio"},
+        "tools": {...}, "readers": {...}}, where each entry has "calls",
+        "errors", "errors_by_type", "bytes_in", "chars_out" and "latency_s"
+        ({"sum", "mean", "p50", "p99", "max", "buckets"}; p50 and p99 are histogram
+        bucket bounds), plus "workers" ({"processes", "workers", "idle",
+        "tasks", "timeouts", "memory_kills", "crashes", "interrupted",
+        "recycled"}) with a worker pool and "scheduler" ({"workers",
+        "running", "queued", "flows"}) with the fair scheduler and
+        "admission" ({"max_in_flight", "in_flight", "rejected"}) when serving
+        over HTTP, or the Prometheus text
+    """
+    if prometheus:
+        return metrics.prometheus()
+    snapshot = metrics.snapshot()
+    workers = DocumentReaderFactory.workers
+    if workers is not None:
+        snapshot["workers"] = workers.stats()
+    executor = get_executor()
+    if isinstance(executor, FairScheduler):
+        snapshot["scheduler"] = executor.stats()
+    if admission is not None:
+        snapshot["admission"] = admission.stats()
+    return snapshot
+
+
+def _extracted_records(out: str) -> dict[str, tuple[int, int]]:
+    """Map the files recorded in an :func:`extract_directory` output to their
+    (size, mtime_ns), cutting off a last line left incomplete by an interruption
+    """
+    done: dict[str, tuple[int, int]] = {}
+    try:
+        with open(out, "r+b") as output:
+            complete = 0
+            for line in output:
+                if not line.endswith(b"\n"):
+                    break
+                complete += len(line)
+                try:
+                    record = json.loads(line)
+                    done[record["path"]] = (record["size"], record["mtime_ns"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+            output.truncate(complete)
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _timed_read(file_path: str) -> tuple[str, float]:
+    """Read a document and time the read; runs in a worker"""
+    started = time.perf_counter()
+    text = DocumentReaderFactory.get_reader(file_path).read(file_path)
+    return text, time.perf_counter() - started
+
+
+def _extract_record(
+    workers: WorkerPool, file_path: str, stat: tuple[int, int]
+) -> dict[str, Any]:
+    """Extract one file in a worker into an :func:`extract_directory` record
+
+    ``seconds`` is the time the read took in the worker, excluding worker
+    start-up; for a killed worker it is the time until it was killed.
+    """
+    reader = DocumentReaderFactory.get_reader(file_path)
+    started = time.perf_counter()
+    try:
+        text, seconds = workers.run(_timed_read, file_path)
+    except (TimeoutError, MemoryError, ChildProcessError) as e:
+        text, seconds = (
+            ErrorMessage(f"Error reading {reader.name}: {e}"),
+            time.perf_counter() - started,
+        )
+    error = str(text) if isinstance(text, ErrorMessage) else None
+    if text == reader.empty_message:
+        text = ""
+    return {
+        "path": file_path,
+        "format": reader.name,
+        "size": stat[0],
+        "mtime_ns": stat[1],
+        "seconds": round(seconds, 3),
+        "chars": 0 if error else len(text),
+        "text": None if error else text,
+        "error": error,
+    }
+
+
+def extract_directory(
+    directory: str,
+    out: str,
+    jobs: int | None = None,
+    recursive: bool = True,
+    timeout: float | None = 300,
+    resume: bool = True,
+) -> dict[str, Any]:
+    """Extract every supported document of a directory into a JSONL file
+
+    Files are read in a :class:`WorkerPool` of ``jobs`` processes, so a
+    document that crashes, hangs past ``timeout`` seconds or leaks only costs
+    its own record. As each file finishes, one JSON record is appended to
+    ``out``: ``{"path", "format", "size", "mtime_ns", "seconds", "chars",
+    "text", "error"}``, with ``text`` null and ``error`` set on failure.
+
+    The output is its own checkpoint: with ``resume``, files already recorded
+    with the same size and mtime are skipped, so an interrupted run picks up
+    where it stopped. Modified files get a new record, which supersedes the
+    earlier one.
+
+    :return: {"files", "skipped", "extracted", "failed", "seconds"}
+    """
+    started = time.perf_counter()
+    files = _scan_documents(directory, recursive)
+    done = _extracted_records(out) if resume else {}
+    todo = [path for path, stat in files.items() if done.get(path) != stat]
+    workers = WorkerPool(
+        processes=max(1, jobs or os.cpu_count() or 1),
+        timeout=timeout or 0,
+        max_rss_bytes=_env_int("WORKER_MAX_RSS_BYTES", 0),
+        max_tasks_per_child=_env_int("WORKER_MAX_TASKS", 100),
+    )
+    threads = ThreadPoolExecutor(
+        max_workers=workers.processes, thread_name_prefix="extract"
+    )
+    summary: dict[str, Any] = {
+        "files": len(files),
+        "skipped": len(files) - len(todo),
+        "extracted": 0,
+        "failed": 0,
+    }
+    try:
+        with open(out, "a" if resume else "w", encoding="utf-8") as output:
+
+            def write(finished: Iterable[Future]) -> None:
+                for future in finished:
+                    record = future.result()
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    summary["failed" if record["error"] else "extracted"] += 1
+                output.flush()
+
+            pending: set[Future] = set()
+            for path in todo:
+                # Keep every worker busy without queueing the whole tree
+                if len(pending) >= 2 * workers.processes:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    write(finished)
+                pending.add(threads.submit(_extract_record, workers, path, files[path]))
+            write(wait(pending).done)
+    finally:
+        # On an interruption, fail the running extractions rather than wait
+        workers.close()
+        threads.shutdown(cancel_futures=True)
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Serve the MCP server over stdio, or over HTTP for many clients
+
+    Over ``streamable-http`` or ``sse`` one process serves every client, so
+    they share the extraction cache, the worker pool and the executor. At
+    most ``--max-concurrency`` extractions run at once and ``--max-queue``
+    more wait; beyond that, requests are rejected with HTTP 429.
+    ``extract DIR --out FILE`` runs :func:`extract_directory` instead.
+    """
+    global admission
+    parser = argparse.ArgumentParser(
+        prog="mcp-documents-reader", description="MCP server for reading documents"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=("stdio", "streamable-http", "sse"),
+        default=os.environ.get(ENV_PREFIX + "TRANSPORT", "stdio"),
+        help="MCP transport (default: stdio)",
+    )
+    parser.add_argument(
+        "--host",
+        default=os.environ.get(ENV_PREFIX + "HOST", "127.0.0.1"),
+        help="Address to listen on over HTTP (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=_env_int("PORT", 8000),
+        help="Port to listen on over HTTP (default: 8000)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=_env_int("MAX_WORKERS", 0) or None,
+        help="Extractions running at once (default: min(32, cpu_count + 4))",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=_env_int("MAX_QUEUE", 64),
+        help="Calls waiting for a worker over HTTP before rejecting (default: 64)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    extract = commands.add_parser(
+        "extract",
+        help="Extract every document of a directory into a JSONL file",
+        description="Extract every supported document of a directory into a "
+        "JSONL file, one record per file, resuming from that file's records",
+    )
+    extract.add_argument("directory", help="Directory of documents to extract")
+    extract.add_argument("--out", required=True, help="JSONL file to write")
+    extract.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: cpu_count)",
+    )
+    extract.add_argument(
+        "--timeout",
+        type=float,
+        default=_env_int("WORKER_TIMEOUT", 300),
+        help="Seconds a file may take, 0 for no limit (default: 300)",
+    )
+    extract.add_argument(
+        "--no-recursive",
+        dest="recursive",
+        action="store_false",
+        help="Skip subdirectories",
+    )
+    extract.add_argument(
+        "--no-resume",
+        dest="resume",
+        action="store_false",
+        help="Overwrite the output instead of skipping files already in it",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "extract":
+        if not os.path.isdir(args.directory):
+            parser.error(f"directory '{args.directory}' not found")
+        summary = extract_directory(
+            args.directory,
+            args.out,
+            jobs=args.jobs,
+            recursive=args.recursive,
+            timeout=args.timeout or None,
+            resume=args.resume,
+        )
+        print(json.dumps(summary))
+        return
+
+    if args.transport == "stdio":
+        if args.max_concurrency is not None:
+            configure_executor(
+                args.max_concurrency,
+                os.environ.get(ENV_PREFIX + "EXECUTOR", "thread"),
+            )
+        mcp.run()
+        return
 
+    import uvicorn
 
-def main():
-    mcp.run()
+    # Many clients share the executor, so queue their calls fairly by default
+    workers = args.max_concurrency or _default_workers()
+    configure_executor(workers, os.environ.get(ENV_PREFIX + "EXECUTOR", "fair"))
+    admission = AdmissionControl(workers + max(args.max_queue, 0))
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    if args.host not in ("127.0.0.1", "localhost", "::1"):
+        # DNS rebinding protection only applies to servers bound to loopback
+        mcp.settings.transport_security = None
+    app = mcp.streamable_http_app() if args.transport != "sse" else mcp.sse_app()
+    uvicorn.run(
+        admission.middleware(app),
+        host=args.host,
+        port=args.port,
+        log_level=mcp.settings.log_level.lower(),
+    )
 
 
 if __name__ == "__main__":
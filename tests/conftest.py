@@ -11,6 +11,8 @@ from typing import Generator
 
 import pytest
 
+from mcp_documents_reader import DocumentReaderFactory
+
 PROJECT_ROOT = Path(__file__).parent.parent
 FIXTURES_DIR = PROJECT_ROOT / "tests" / "fixtures"
 
@@ -77,6 +79,19 @@ def sample_pdf_file(fixtures_dir: Path) -> Path:
     return fixtures_dir / "sample.pdf"
 
 
+@pytest.fixture
+def multipage_pdf_file(fixtures_dir: Path) -> Path:
+    """获取 5 页示例 PDF 文件路径。
+
+    Args:
+        fixtures_dir: fixtures 目录路径
+
+    Returns:
+        Path: 多页 PDF 文件路径
+    """
+    return fixtures_dir / "multipage.pdf"
+
+
 @pytest.fixture
 def sample_excel_file(fixtures_dir: Path) -> Path:
     """获取示例 Excel 文件路径。
@@ -151,3 +166,18 @@ def temp_document_dir() -> Generator[str, None, None]:
     """
     with tempfile.TemporaryDirectory() as tmpdir:
         yield tmpdir
+
+
+@pytest.fixture(autouse=True)
+def reset_extraction_cache() -> Generator[None, None, None]:
+    """在每个测试前后清空工厂的提取缓存，避免测试间相互影响。
+
+    Yields:
+        None
+    """
+    cache = DocumentReaderFactory.cache
+    if cache is not None:
+        cache.clear()
+    yield
+    if cache is not None:
+        cache.clear()
@@ -5,6 +5,7 @@
 - sample_gbk.txt: GBK 编码的文本文件
 - sample.docx: 包含文本和表格的 Word 文档
 - sample.pdf: 包含文本的 PDF 文档
+- multipage.pdf: 每页带页码文本的 5 页 PDF 文档
 - sample.xlsx: 包含多工作表的 Excel 文件
 - empty.*: 各种空文档文件
 """
@@ -79,6 +80,16 @@ Special characters: 中文, English, 123, !@#$%
     c.save()
     print("Created: sample.pdf")
 
+    # 创建多页 PDF 文件
+    multipage_pdf_path = fixtures_dir / "multipage.pdf"
+    c_multi = canvas.Canvas(str(multipage_pdf_path), pagesize=letter)
+    for page_number in range(1, 6):
+        c_multi.setFont("Helvetica", 12)
+        c_multi.drawString(100, 750, f"Page {page_number} content.")
+        c_multi.showPage()
+    c_multi.save()
+    print("Created: multipage.pdf")
+
     # 创建空 PDF 文件
     empty_pdf_path = fixtures_dir / "empty.pdf"
     c_empty = canvas.Canvas(str(empty_pdf_path), pagesize=letter)
@@ -0,0 +1,246 @@
+"""ExtractionCache 提取缓存测试。
+
+测试内容：
+- 缓存键（路径、大小、修改时间、内容哈希）
+- 内存 LRU 层及按字节淘汰
+- SQLite 磁盘层持久化及按字节淘汰
+- DocumentReaderFactory.read 缓存集成
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from unittest import mock
+
+from mcp_documents_reader import DocumentReaderFactory, ErrorMessage, ExtractionCache
+
+
+class TestExtractionCacheKey:
+    """缓存键测试类。"""
+
+    def test_key_for_missing_file_is_none(self) -> None:
+        """测试不存在的文件无法生成缓存键。"""
+        cache = ExtractionCache()
+
+        assert cache.key("/nonexistent/path/file.txt") is None
+
+    def test_key_changes_when_file_modified(self, temp_document_dir: str) -> None:
+        """测试文件修改后缓存键随之变化。"""
+        file_path = Path(temp_document_dir) / "doc.txt"
+        file_path.write_text("first", encoding="utf-8")
+        cache = ExtractionCache()
+        first_key = cache.key(str(file_path))
+
+        file_path.write_text("second version", encoding="utf-8")
+
+        assert cache.key(str(file_path)) != first_key
+
+    def test_key_includes_options(self, temp_document_dir: str) -> None:
+        """测试不同的读取选项生成不同的缓存键。"""
+        file_path = Path(temp_document_dir) / "doc.txt"
+        file_path.write_text("content", encoding="utf-8")
+        cache = ExtractionCache()
+
+        assert cache.key(str(file_path)) != cache.key(str(file_path), {"start_page": 2})
+
+    def test_key_with_content_hash(self, temp_document_dir: str) -> None:
+        """测试启用内容哈希时相同大小和修改时间的不同内容生成不同键。"""
+        file_path = Path(temp_document_dir) / "doc.txt"
+        file_path.write_text("aaaa", encoding="utf-8")
+        stat = os.stat(file_path)
+        cache = ExtractionCache(hash_content=True)
+        first_key = cache.key(str(file_path))
+
+        file_path.write_text("bbbb", encoding="utf-8")
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert ExtractionCache().key(str(file_path)) is not None
+        assert cache.key(str(file_path)) != first_key
+
+
+class TestExtractionCacheTiers:
+    """缓存分层存储测试类。"""
+
+    def test_memory_lru_eviction(self) -> None:
+        """测试内存层超出字节预算时淘汰最久未使用的条目。"""
+        cache = ExtractionCache(memory_bytes=10)
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        assert cache.get("a") == "aaaa"
+
+        cache.put("c", "cccc")
+
+        assert cache.get("a") == "aaaa"
+        assert cache.get("b") is None
+        assert cache.get("c") == "cccc"
+
+    def test_oversized_entry_not_kept_in_memory(self) -> None:
+        """测试超过内存预算的条目不会进入内存层。"""
+        cache = ExtractionCache(memory_bytes=4)
+        cache.put("a", "too large")
+
+        assert cache.get("a") is None
+
+    def test_disk_tier_survives_restart(self, temp_document_dir: str) -> None:
+        """测试磁盘层在新实例（模拟重启）中仍然可用。"""
+        disk_path = os.path.join(temp_document_dir, "cache", "cache.sqlite3")
+        ExtractionCache(disk_path=disk_path).put("key", "cached text")
+
+        restarted = ExtractionCache(disk_path=disk_path)
+
+        assert restarted.get("key") == "cached text"
+        assert restarted.get("missing") is None
+
+    def test_disk_tier_eviction(self, temp_document_dir: str) -> None:
+        """测试磁盘层超出字节预算时淘汰最早访问的条目。"""
+        disk_path = os.path.join(temp_document_dir, "cache.sqlite3")
+        cache = ExtractionCache(memory_bytes=0, disk_path=disk_path, disk_bytes=10)
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        cache.put("c", "cccc")
+
+        assert cache.get("a") is None
+        assert cache.get("b") == "bbbb"
+        assert cache.get("c") == "cccc"
+
+    def test_disk_hits_are_batched(self, temp_document_dir: str) -> None:
+        """测试磁盘命中的访问时间批量写入，并在淘汰前生效。"""
+        disk_path = os.path.join(temp_document_dir, "cache.sqlite3")
+        cache = ExtractionCache(memory_bytes=0, disk_path=disk_path, disk_bytes=10)
+        cache.touch_batch = 2
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+
+        with mock.patch.object(
+            cache, "_flush_touched", wraps=cache._flush_touched
+        ) as flush:
+            assert cache.get("b") == "bbbb"
+            flush.assert_not_called()
+            assert cache.get("a") == "aaaa"
+            flush.assert_called_once()
+
+        cache.put("c", "cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "aaaa"
+
+    def test_disk_index_on_access_time(self, temp_document_dir: str) -> None:
+        """测试磁盘层按访问时间建立索引。"""
+        disk_path = os.path.join(temp_document_dir, "cache.sqlite3")
+        ExtractionCache(disk_path=disk_path).put("key", "text")
+
+        with sqlite3.connect(disk_path) as db:
+            indexes = db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            ).fetchall()
+
+        assert ("entries_accessed",) in indexes
+
+    def test_disk_size_is_tracked(self, temp_document_dir: str) -> None:
+        """测试写入时按累计字节数淘汰，不再汇总整个磁盘层；重新打开时加载累计值。"""
+        disk_path = os.path.join(temp_document_dir, "cache.sqlite3")
+        cache = ExtractionCache(memory_bytes=0, disk_path=disk_path, disk_bytes=10)
+        cache.put("a", "aaaa")
+        statements: list[str] = []
+        assert cache._db is not None
+        cache._db.set_trace_callback(statements.append)
+
+        cache.put("a", "aaaaa")
+        cache.put("b", "bbbb")
+
+        assert not any("SUM(" in statement for statement in statements)
+        assert cache._disk_size == 9
+
+        reopened = ExtractionCache(memory_bytes=0, disk_path=disk_path, disk_bytes=10)
+        reopened.put("c", "cc")
+
+        assert reopened._disk_size == 6
+        assert reopened.get("a") is None
+        assert reopened.get("b") == "bbbb"
+
+    def test_clear_empties_both_tiers(self, temp_document_dir: str) -> None:
+        """测试 clear 同时清空内存层和磁盘层。"""
+        disk_path = os.path.join(temp_document_dir, "cache.sqlite3")
+        cache = ExtractionCache(disk_path=disk_path)
+        cache.put("key", "text")
+
+        cache.clear()
+
+        assert cache.get("key") is None
+
+    def test_from_env(self, temp_document_dir: str) -> None:
+        """测试通过环境变量配置缓存。"""
+        env = {
+            "MCP_DOCUMENTS_READER_CACHE_DIR": temp_document_dir,
+            "MCP_DOCUMENTS_READER_CACHE_MEMORY_BYTES": "1024",
+            "MCP_DOCUMENTS_READER_CACHE_HASH": "1",
+        }
+        with mock.patch.dict(os.environ, env):
+            cache = ExtractionCache.from_env()
+
+        assert cache.memory_bytes == 1024
+        assert cache.hash_content is True
+        assert cache.disk_path is not None
+        assert cache.disk_path.startswith(temp_document_dir)
+
+
+class TestFactoryCachedRead:
+    """DocumentReaderFactory.read 缓存集成测试类。"""
+
+    def test_repeat_read_served_from_cache(self, temp_document_dir: str) -> None:
+        """测试重复读取同一文件时不再调用 Reader。"""
+        file_path = Path(temp_document_dir) / "doc.txt"
+        file_path.write_text("cached content", encoding="utf-8")
+
+        with mock.patch(
+            "mcp_documents_reader.TxtReader.read", return_value="cached content"
+        ) as mock_read:
+            first = DocumentReaderFactory.read(str(file_path))
+            second = DocumentReaderFactory.read(str(file_path))
+
+        assert first == second == "cached content"
+        mock_read.assert_called_once()
+
+    def test_errors_are_not_cached(self, temp_document_dir: str) -> None:
+        """测试读取错误不会被缓存。"""
+        file_path = Path(temp_document_dir) / "doc.txt"
+        file_path.write_text("content", encoding="utf-8")
+
+        with mock.patch(
+            "mcp_documents_reader.TxtReader.read",
+            return_value=ErrorMessage("Error reading TXT: boom"),
+        ) as mock_read:
+            DocumentReaderFactory.read(str(file_path))
+            DocumentReaderFactory.read(str(file_path))
+
+        assert mock_read.call_count == 2
+
+    def test_text_starting_with_error_is_cached(self, temp_document_dir: str) -> None:
+        """测试以 "Error" 开头的正常文档文本会被缓存。"""
+        file_path = Path(temp_document_dir) / "policy.txt"
+        file_path.write_text("Error budget policy", encoding="utf-8")
+
+        with mock.patch(
+            "mcp_documents_reader.TxtReader.read", return_value="Error budget policy"
+        ) as mock_read:
+            DocumentReaderFactory.read(str(file_path))
+            DocumentReaderFactory.read(str(file_path))
+
+        mock_read.assert_called_once()
+
+    def test_modified_file_is_reread(self, temp_document_dir: str) -> None:
+        """测试文件修改后重新提取内容。"""
+        file_path = Path(temp_document_dir) / "doc.txt"
+        file_path.write_text("old", encoding="utf-8")
+        assert DocumentReaderFactory.read(str(file_path)) == "old"
+
+        file_path.write_text("new content", encoding="utf-8")
+
+        assert DocumentReaderFactory.read(str(file_path)) == "new content"
+
+    def test_read_without_cache(self, sample_txt_file: Path) -> None:
+        """测试禁用缓存时直接读取。"""
+        with mock.patch.object(DocumentReaderFactory, "cache", None):
+            result = DocumentReaderFactory.read(str(sample_txt_file))
+
+        assert "测试文本文件" in result
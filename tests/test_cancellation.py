@@ -0,0 +1,383 @@
+"""提取超时与协作式取消测试。
+
+测试内容：
+- Cancellation 的截止时间、取消标志与嵌套
+- 读取器在块/行之间检查取消并保留已提取的部分文本
+- read_document / read_documents 的 timeout_s 与 partial 参数
+- 客户端取消 MCP 调用后停止仍在运行的提取
+- 合并读取时其他调用方的超时不影响本调用
+- 工作进程池在调用被取消时终止工作进程
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Generator, Iterator
+from unittest import mock
+
+import pytest
+
+from mcp_documents_reader import (
+    Cancellation,
+    DocumentReaderFactory,
+    ExcelReader,
+    ExtractionInterrupted,
+    PdfReader,
+    TxtReader,
+    WorkerPool,
+    check_interrupted,
+    mcp,
+    metrics,
+    read_document,
+    read_document_chunk,
+    read_documents,
+    search_document,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def slow_blocks(
+    self: TxtReader,  # noqa: ARG001
+    file_path: str,  # noqa: ARG001
+    start: Any = None,  # noqa: ARG001
+    count: int = 1000,
+) -> Iterator[tuple[int, str]]:
+    """模拟逐块缓慢提取的读取器，每块耗时 10 毫秒。
+
+    Args:
+        self: 读取器
+        file_path: 文件路径
+        start: 起始位置
+        count: 块数
+
+    Yields:
+        tuple[int, str]: 块位置和块文本
+    """
+    for index in range(count):
+        time.sleep(0.01)
+        yield index, f"block {index}"
+
+
+@pytest.fixture
+def slow_txt() -> Generator[str, None, None]:
+    """让 TxtReader 缓慢提取，并禁用提取缓存。
+
+    Yields:
+        str: 示例 TXT 文件路径
+    """
+    metrics.reset()
+    with (
+        mock.patch.object(TxtReader, "iter_blocks", slow_blocks),
+        mock.patch.object(DocumentReaderFactory, "cache", None),
+    ):
+        yield str(FIXTURES_DIR / "sample.txt")
+    metrics.reset()
+
+
+class TestCancellation:
+    """Cancellation 测试类。"""
+
+    def test_not_interrupted(self) -> None:
+        """测试未取消且未超时时继续执行。"""
+        token = Cancellation(timeout_s=60)
+
+        assert token.reason() is None
+        token.check()
+
+    def test_cancel(self) -> None:
+        """测试取消后检查时抛出异常。"""
+        token = Cancellation()
+        token.cancel()
+
+        with pytest.raises(ExtractionInterrupted, match="cancelled"):
+            token.check()
+
+    def test_deadline(self) -> None:
+        """测试超过截止时间后报告超时。"""
+        token = Cancellation(timeout_s=0.01)
+        time.sleep(0.02)
+
+        assert token.reason() == "Extraction timed out after 0.01 s"
+
+    def test_current_and_nesting(self) -> None:
+        """测试进入令牌后成为当前令牌，内层令牌随外层令牌停止。"""
+        assert Cancellation.current() is None
+        check_interrupted()
+
+        with Cancellation() as outer:
+            with Cancellation(timeout_s=60) as inner:
+                assert Cancellation.current() is inner
+                outer.cancel()
+                with pytest.raises(ExtractionInterrupted, match="cancelled"):
+                    check_interrupted()
+            assert Cancellation.current() is outer
+
+        assert Cancellation.current() is None
+
+    def test_run(self) -> None:
+        """测试 run 在令牌生效时调用函数。"""
+        token = Cancellation()
+
+        assert token.run(Cancellation.current) is token
+
+
+class TestReaderInterruption:
+    """读取器中断测试类。"""
+
+    def test_extract_keeps_partial_text(self, slow_txt: str) -> None:
+        """测试超时在下一块处停止提取，并保留已提取的文本。"""
+        started = time.monotonic()
+
+        with Cancellation(timeout_s=0.1):
+            with pytest.raises(ExtractionInterrupted) as raised:
+                TxtReader().read(slow_txt)
+
+        assert time.monotonic() - started < 1
+        assert raised.value.partial.startswith("block 0block 1")
+        stats = metrics.snapshot()["readers"]["TXT"]
+        assert stats["errors_by_type"] == {"ExtractionInterrupted": 1}
+
+    def test_iter_chunks_keeps_partial_text(self, slow_txt: str) -> None:
+        """测试分块读取被中断时保留当前块已缓冲的文本。"""
+        with Cancellation(timeout_s=0.05):
+            with pytest.raises(ExtractionInterrupted) as raised:
+                next(TxtReader().iter_chunks(slow_txt, max_chars=10**6))
+
+        assert raised.value.partial.startswith("block 0")
+
+    def test_search_is_interrupted(self, slow_txt: str) -> None:
+        """测试搜索在超时后停止。"""
+        token = Cancellation(timeout_s=0.05)
+
+        result = token.run(search_document, slow_txt, "no such text")
+
+        assert result == {
+            "error": "Error searching document: Extraction timed out after 0.05 s"
+        }
+
+    def test_excel_rows_are_checked(self, sample_excel_file: Path) -> None:
+        """测试 Excel 逐行检查取消，即使行不产生文本。"""
+        token = Cancellation()
+        token.cancel()
+
+        with token, pytest.raises(ExtractionInterrupted):
+            list(ExcelReader(engine="xml").iter_blocks(str(sample_excel_file)))
+
+    def test_parallel_pdf_is_interrupted(self, sample_pdf_file: Path) -> None:
+        """测试并行提取 PDF 时，等待工作进程的过程中也会检查取消。"""
+        token = Cancellation()
+        token.cancel()
+        reader = PdfReader(workers=2, parallel_threshold=1)
+
+        with (
+            ThreadPoolExecutor(max_workers=1) as pool,
+            mock.patch("mcp_documents_reader._pdf_pool", return_value=pool),
+            mock.patch(
+                "mcp_documents_reader._extract_pdf_pages",
+                side_effect=lambda *_: time.sleep(0.5) or [],
+            ),
+            token,
+            pytest.raises(ExtractionInterrupted),
+        ):
+            list(reader.iter_blocks(str(sample_pdf_file)))
+
+
+class TestReadDocumentTimeout:
+    """read_document / read_documents 超时测试类。"""
+
+    def test_timeout_returns_error(self, slow_txt: str) -> None:
+        """测试超时后返回错误信息。"""
+        result = read_document(slow_txt, timeout_s=0.05)
+
+        assert result == "Error reading document: Extraction timed out after 0.05 s"
+
+    def test_partial_result(self, slow_txt: str) -> None:
+        """测试 partial 为真时返回已提取的文本和说明。"""
+        result = read_document(slow_txt, timeout_s=0.05, partial=True)
+
+        assert result.startswith("block 0")
+        assert result.endswith(
+            "[Partial result: Extraction timed out after 0.05 s; "
+            f"{len(result.split(chr(10) * 2)[0]):,} characters extracted.]"
+        )
+
+    def test_partial_budgeted_read(self, slow_txt: str) -> None:
+        """测试带输出预算的读取超时时同样返回部分结果。"""
+        result = read_document(slow_txt, max_chars=10**6, timeout_s=0.05, partial=True)
+
+        assert result.startswith("block 0")
+        assert "[Partial result" in result
+
+    def test_partial_without_text_returns_error(self, slow_txt: str) -> None:
+        """测试尚未提取任何文本时即使 partial 为真也返回错误。"""
+        token = Cancellation()
+        token.cancel()
+
+        result = token.run(read_document, slow_txt, partial=True)
+
+        assert result == "Error reading document: Extraction cancelled"
+
+    def test_default_timeout_from_env(
+        self, slow_txt: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """测试未指定 timeout_s 时使用环境变量中的默认超时。"""
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_TIMEOUT", "1")
+
+        result = read_document(slow_txt)
+
+        assert result == "Error reading document: Extraction timed out after 1 s"
+
+    def test_interrupted_reads_are_not_cached(self, slow_txt: str) -> None:
+        """测试被中断的读取不写入缓存。"""
+        cache = mock.MagicMock()
+        cache.key.return_value = "key"
+        cache.get.return_value = None
+
+        with mock.patch.object(DocumentReaderFactory, "cache", cache):
+            read_document(slow_txt, timeout_s=0.05, partial=True)
+
+        cache.put.assert_not_called()
+
+    def test_read_documents_timeout(
+        self, slow_txt: str, temp_document_dir: str
+    ) -> None:
+        """测试批量读取的超时作用于整批文件。
+
+        两个文件路径不同，各自提取，而不是合并到同一次提取上。
+        """
+        other = Path(temp_document_dir) / "other.txt"
+        other.write_bytes(Path(slow_txt).read_bytes())
+        started = time.monotonic()
+
+        results = read_documents([slow_txt, str(other)], timeout_s=0.1, partial=True)
+
+        assert time.monotonic() - started < 2
+        assert all(entry["text"].startswith("block 0") for entry in results)
+        assert all("[Partial result" in entry["text"] for entry in results)
+
+    def test_read_document_chunk_is_interrupted(self, slow_txt: str) -> None:
+        """测试分块读取工具在取消后返回错误。"""
+        token = Cancellation()
+        token.cancel()
+
+        result = token.run(read_document_chunk, slow_txt)
+
+        assert "Extraction cancelled" in str(result)
+
+
+class TestToolCancellation:
+    """MCP 调用取消测试类。"""
+
+    async def test_client_cancel_stops_extraction(self, slow_txt: str) -> None:
+        """测试客户端取消调用后，执行器中的提取在下一块处停止。"""
+        task = asyncio.create_task(
+            mcp.call_tool("read_document", {"filename": slow_txt})
+        )
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            stats = metrics.snapshot()["readers"].get("TXT")
+            if stats is not None and stats["errors"]:
+                break
+            await asyncio.sleep(0.01)
+
+        stats = metrics.snapshot()["readers"]["TXT"]
+        assert stats["errors_by_type"] == {"ExtractionInterrupted": 1}
+        assert stats["latency_s"]["max"] < 1
+
+    async def test_timeout_argument(self, slow_txt: str) -> None:
+        """测试通过 MCP 调用时 timeout_s 参数生效。"""
+        result = await mcp.call_tool(
+            "read_document", {"filename": slow_txt, "timeout_s": 0.05}
+        )
+
+        assert "timed out after 0.05 s" in str(result)
+
+
+class TestSharedExtraction:
+    """合并读取的中断测试类。"""
+
+    def test_other_callers_deadline_does_not_fail_waiter(self, slow_txt: str) -> None:
+        """测试共享提取因其他调用方超时而中断时，等待方重新提取。"""
+        results: dict[str, str] = {}
+        calls = []
+        original = TxtReader.read
+        blocks = functools.partialmethod(slow_blocks, count=50)
+
+        def counted(self: TxtReader, file_path: str) -> str:
+            calls.append(file_path)
+            return original(self, file_path)
+
+        def waiter() -> None:
+            while not calls:
+                time.sleep(0.001)
+            results["waiter"] = read_document(slow_txt, timeout_s=30)
+
+        with (
+            mock.patch.object(TxtReader, "iter_blocks", blocks),
+            mock.patch.object(TxtReader, "read", counted),
+        ):
+            thread = threading.Thread(target=waiter)
+            thread.start()
+            results["leader"] = read_document(slow_txt, timeout_s=0.2)
+            thread.join(30)
+
+        assert "timed out" in results["leader"]
+        assert results["waiter"].startswith("block 0")
+        assert results["waiter"].endswith("block 49")
+        assert len(calls) == 2
+
+
+class TestWorkerPoolInterruption:
+    """工作进程池中断测试类。"""
+
+    def test_cancel_kills_worker(self) -> None:
+        """测试调用被取消时终止工作进程并释放名额。"""
+        workers = WorkerPool(processes=1)
+        token = Cancellation(timeout_s=0.2)
+        try:
+            started = time.monotonic()
+            with pytest.raises(ExtractionInterrupted, match="timed out"):
+                token.run(workers.run, time.sleep, 30)
+            assert time.monotonic() - started < 10
+            assert workers.stats()["interrupted"] == 1
+            assert workers.run(os.getpid) != os.getpid()
+        finally:
+            workers.close()
+
+    def test_waiting_for_a_slot_is_interrupted(self) -> None:
+        """测试等待空闲工作进程时也会检查取消。"""
+        workers = WorkerPool(processes=1)
+        token = Cancellation()
+        token.cancel()
+        try:
+            with workers._slots:
+                with pytest.raises(ExtractionInterrupted):
+                    token.run(workers.run, os.getpid)
+        finally:
+            workers.close()
+
+    def test_extract_reraises_interruption(self, sample_pdf_file: Path) -> None:
+        """测试工作进程池中被中断的读取抛出异常并计入指标。"""
+        metrics.reset()
+        workers = WorkerPool(processes=1)
+        token = Cancellation()
+        token.cancel()
+        try:
+            with pytest.raises(ExtractionInterrupted):
+                token.run(workers.extract, str(sample_pdf_file), {})
+        finally:
+            workers.close()
+
+        stats = metrics.snapshot()["readers"]["PDF"]
+        assert stats["errors_by_type"] == {"ExtractionInterrupted": 1}
+        metrics.reset()
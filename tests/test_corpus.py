@@ -0,0 +1,527 @@
+"""CorpusIndex 全文索引测试。
+
+测试内容：
+- 词项切分（拉丁文按词、中日韩文字按字）
+- BM25 排序、短语查询及匹配统计
+- 增量更新：跳过未变化文件、重新索引修改文件、删除已移除文件
+- 提取失败记录及在文件变化前不再重试
+- 段合并及失效倒排记录清理
+- index_directory 与 search_corpus MCP 工具
+- ChangeTracker 变更检测、增量刷新与后台轮询
+- refresh_directory MCP 工具
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Generator
+from unittest import mock
+
+import pytest
+
+from mcp_documents_reader import (
+    ChangeTracker,
+    CorpusIndex,
+    DocumentReaderFactory,
+    _scan_documents,
+    _terms,
+    index_directory,
+    refresh_directory,
+    search_corpus,
+)
+
+
+@pytest.fixture
+def corpus_dir(
+    temp_document_dir: str, monkeypatch: pytest.MonkeyPatch
+) -> Generator[Path, None, None]:
+    """创建带有独立索引目录的示例语料目录。
+
+    Args:
+        temp_document_dir: 临时目录路径
+        monkeypatch: pytest monkeypatch fixture
+
+    Yields:
+        Path: 语料目录路径
+    """
+    root = Path(temp_document_dir)
+    monkeypatch.setenv("MCP_DOCUMENTS_READER_INDEX_DIR", str(root / "index"))
+    corpus = root / "corpus"
+    (corpus / "sub").mkdir(parents=True)
+    (corpus / "fox.txt").write_text(
+        "The quick brown fox jumps over the lazy dog. The fox runs.", encoding="utf-8"
+    )
+    (corpus / "dog.txt").write_text("A lazy dog sleeps all day.", encoding="utf-8")
+    (corpus / "sub" / "report.txt").write_text(
+        "季度报告：销售额增长。brown paper", encoding="utf-8"
+    )
+    (corpus / "notes.bin").write_bytes(b"fox fox fox")
+    yield corpus
+    for index in list(CorpusIndex._open.values()):
+        index.close()
+    for tracker in list(ChangeTracker._open.values()):
+        tracker.close()
+
+
+def _paths(result: dict) -> list[str]:
+    """返回搜索结果中的文件名列表。
+
+    Args:
+        result: CorpusIndex.search 的返回值
+
+    Returns:
+        list[str]: 按排名排列的文件名
+    """
+    return [os.path.basename(entry["path"]) for entry in result["results"]]
+
+
+class TestTerms:
+    """词项切分测试类。"""
+
+    def test_words_are_casefolded(self) -> None:
+        """测试拉丁文按词切分并统一大小写。"""
+        assert _terms("The Quick_brown fox's") == ["the", "quick", "brown", "fox", "s"]
+
+    def test_cjk_split_per_character(self) -> None:
+        """测试中日韩文字按单字切分。"""
+        assert _terms("季度报告abc") == ["季", "度", "报", "告", "abc"]
+
+
+class TestCorpusIndexSearch:
+    """CorpusIndex 查询测试类。"""
+
+    def test_bm25_ranks_more_frequent_term_first(self, corpus_dir: Path) -> None:
+        """测试词频更高的文档排名靠前，不支持的文件不被索引。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        summary = index.update(str(corpus_dir))
+
+        result = index.search("fox")
+
+        assert summary["documents"] == summary["indexed"] == 3
+        assert _paths(result) == ["fox.txt"]
+        assert result["results"][0]["matches"] == {"fox": 2}
+        assert _paths(index.search("lazy dog"))[0] == "dog.txt"
+
+    def test_words_match_any_document(self, corpus_dir: Path) -> None:
+        """测试多个查询词之间为“或”关系。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        index.update(str(corpus_dir))
+
+        result = index.search("sleeps paper")
+
+        assert result["total"] == 2
+        assert sorted(_paths(result)) == ["dog.txt", "report.txt"]
+
+    def test_phrase_requires_adjacent_terms(self, corpus_dir: Path) -> None:
+        """测试引号短语要求词项相邻且有序。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        index.update(str(corpus_dir))
+
+        assert _paths(index.search('"quick brown"')) == ["fox.txt"]
+        assert index.search('"brown quick"')["total"] == 0
+        matches = index.search('"brown paper"')["results"][0]["matches"]
+        assert matches == {"brown paper": 1}
+
+    def test_cjk_word_matches_as_phrase(self, corpus_dir: Path) -> None:
+        """测试中文词语按字组成短语匹配，匹配统计保留原始查询词。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        index.update(str(corpus_dir))
+
+        result = index.search("报告")
+
+        assert _paths(result) == ["report.txt"]
+        assert result["results"][0]["matches"] == {"报告": 1}
+        assert index.search("报度")["total"] == 0
+
+    def test_limit_and_empty_query(self, corpus_dir: Path) -> None:
+        """测试结果数量上限及空查询。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        index.update(str(corpus_dir))
+
+        assert len(index.search("the dog", limit=1)["results"]) == 1
+        assert index.search("  ") == {"results": [], "total": 0}
+
+    def test_index_survives_reopen(self, corpus_dir: Path) -> None:
+        """测试索引持久化到磁盘，重新打开后无需提取即可查询。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        index.update(str(corpus_dir))
+        index.close()
+
+        reopened = CorpusIndex.for_directory(str(corpus_dir), create=False)
+
+        assert reopened is not None and reopened is not index
+        with mock.patch("mcp_documents_reader.DocumentReaderFactory.read") as read:
+            assert _paths(reopened.search("fox")) == ["fox.txt"]
+        read.assert_not_called()
+
+    def test_unindexed_directory(self, corpus_dir: Path) -> None:
+        """测试未建立索引的目录在不创建时返回 None。"""
+        assert CorpusIndex.for_directory(str(corpus_dir), create=False) is None
+
+
+class TestCorpusIndexUpdate:
+    """CorpusIndex 增量更新测试类。"""
+
+    def test_unchanged_files_are_not_extracted(self, corpus_dir: Path) -> None:
+        """测试再次更新时跳过未变化的文件。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        index.update(str(corpus_dir))
+
+        with mock.patch("mcp_documents_reader.DocumentReaderFactory.read") as read:
+            summary = index.update(str(corpus_dir))
+
+        read.assert_not_called()
+        assert summary["unchanged"] == 3
+        assert summary["indexed"] == 0
+
+    def test_modified_file_is_reindexed(self, corpus_dir: Path) -> None:
+        """测试修改后的文件被重新索引，旧内容不再匹配。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        index.update(str(corpus_dir))
+        (corpus_dir / "dog.txt").write_text("A cat purrs loudly.", encoding="utf-8")
+
+        summary = index.update(str(corpus_dir))
+
+        assert summary["indexed"] == 1
+        assert _paths(index.search("cat")) == ["dog.txt"]
+        assert _paths(index.search("sleeps")) == []
+        assert index.search("lazy")["total"] == 1
+
+    def test_deleted_file_is_removed(self, corpus_dir: Path) -> None:
+        """测试已删除的文件从索引中移除。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        index.update(str(corpus_dir))
+        (corpus_dir / "fox.txt").unlink()
+
+        summary = index.update(str(corpus_dir))
+
+        assert summary["removed"] == 1
+        assert summary["documents"] == 2
+        assert index.search("fox")["total"] == 0
+        assert str(corpus_dir / "fox.txt") not in index.documents()
+
+    def test_non_recursive_update(self, corpus_dir: Path) -> None:
+        """测试非递归更新仅索引顶层文件。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+
+        summary = index.update(str(corpus_dir), recursive=False)
+
+        assert summary["documents"] == 2
+        assert index.search("报告")["total"] == 0
+
+    def test_failures_are_not_retried_until_changed(self, corpus_dir: Path) -> None:
+        """测试提取失败的文件被记录，直到文件变化才重试。"""
+        (corpus_dir / "broken.docx").write_bytes(b"not a zip")
+        index = CorpusIndex.for_directory(str(corpus_dir))
+
+        first = index.update(str(corpus_dir))
+        with mock.patch("mcp_documents_reader.DocumentReaderFactory.read") as read:
+            second = index.update(str(corpus_dir))
+
+        read.assert_not_called()
+        assert first["failed"] == second["failed"] == 1
+        assert second["errors"][0]["path"].endswith("broken.docx")
+        assert second["documents"] == 3
+        (corpus_dir / "broken.docx").unlink()
+        assert index.update(str(corpus_dir))["failed"] == 0
+        assert index.failures() == {}
+
+    def test_text_starting_with_error_is_indexed(self, corpus_dir: Path) -> None:
+        """测试以 "Error" 开头的正常文档被索引而非记为失败。"""
+        (corpus_dir / "policy.txt").write_text(
+            "Error budget policy for the quarterly review.", encoding="utf-8"
+        )
+        index = CorpusIndex.for_directory(str(corpus_dir))
+
+        summary = index.update(str(corpus_dir))
+
+        assert summary["failed"] == 0
+        assert _paths(index.search("quarterly")) == ["policy.txt"]
+
+    def test_segments_are_merged(self, corpus_dir: Path) -> None:
+        """测试段数量超过上限时合并，并清理已失效的倒排记录。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        with (
+            mock.patch.object(CorpusIndex, "segment_terms", 1),
+            mock.patch.object(CorpusIndex, "max_segments", 1),
+        ):
+            index.update(str(corpus_dir))
+            (corpus_dir / "dog.txt").write_text("cat", encoding="utf-8")
+            index.update(str(corpus_dir))
+
+        segments = index._db.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        dog_rows = index._db.execute(
+            "SELECT COUNT(*) FROM postings WHERE term = 'sleeps'"
+        ).fetchone()[0]
+        assert segments == 1
+        assert dog_rows == 0
+        assert _paths(index.search("fox")) == ["fox.txt"]
+        assert _paths(index.search("cat")) == ["dog.txt"]
+
+    def test_long_postings_are_compressed(self, corpus_dir: Path) -> None:
+        """测试较长的位置列表经压缩后仍可正确短语匹配。"""
+        (corpus_dir / "long.txt").write_text("alpha beta " * 500, encoding="utf-8")
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        index.update(str(corpus_dir))
+
+        result = index.search('"alpha beta"')
+
+        assert result["results"][0]["matches"] == {"alpha beta": 500}
+
+
+class TestCorpusTools:
+    """index_directory 与 search_corpus 工具测试类。"""
+
+    def test_index_then_search(self, corpus_dir: Path) -> None:
+        """测试先建立索引再搜索。"""
+        summary = index_directory(str(corpus_dir), max_workers=2)
+        result = search_corpus("fox", str(corpus_dir))
+
+        assert summary["documents"] == 3
+        assert os.path.exists(summary["index_path"])
+        assert _paths(result) == ["fox.txt"]
+
+    def test_index_missing_directory(self) -> None:
+        """测试索引不存在的目录返回错误。"""
+        result = index_directory("/nonexistent/corpus")
+
+        assert result == {"error": "Error: Directory '/nonexistent/corpus' not found."}
+
+    def test_search_unindexed_directory(self, corpus_dir: Path) -> None:
+        """测试搜索未建立索引的目录返回错误。"""
+        result = search_corpus("fox", str(corpus_dir))
+
+        assert "has not been indexed" in result["error"]
+
+    def test_index_error(self, corpus_dir: Path) -> None:
+        """测试索引过程中的异常被转换为错误信息。"""
+        with mock.patch.object(CorpusIndex, "update", side_effect=OSError("disk full")):
+            result = index_directory(str(corpus_dir))
+
+        assert result == {"error": "Error indexing directory: disk full"}
+
+    def test_search_error(self, corpus_dir: Path) -> None:
+        """测试查询过程中的异常被转换为错误信息。"""
+        index_directory(str(corpus_dir))
+
+        with mock.patch.object(CorpusIndex, "search", side_effect=OSError("locked")):
+            result = search_corpus("fox", str(corpus_dir))
+
+        assert result == {"error": "Error searching corpus: locked"}
+
+
+class TestChangeTracker:
+    """ChangeTracker 变更检测测试类。"""
+
+    def test_first_diff_reports_every_file_added(self, corpus_dir: Path) -> None:
+        """测试首次比较时所有支持的文件均为新增。"""
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+
+        changes = tracker.diff(str(corpus_dir))
+
+        assert sorted(os.path.basename(path) for path in changes["added"]) == [
+            "dog.txt",
+            "fox.txt",
+            "report.txt",
+        ]
+        assert changes["unchanged"] == 0
+        assert tracker.manifest() == {}
+
+    def test_diff_after_record(self, corpus_dir: Path) -> None:
+        """测试记录清单后仅报告新增、修改和删除的文件。"""
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+        tracker.record(tracker.diff(str(corpus_dir)))
+        (corpus_dir / "fox.txt").unlink()
+        (corpus_dir / "dog.txt").write_text("A cat purrs.", encoding="utf-8")
+        (corpus_dir / "new.txt").write_text("new", encoding="utf-8")
+
+        changes = tracker.diff(str(corpus_dir))
+
+        assert changes["added"] == [str(corpus_dir / "new.txt")]
+        assert changes["modified"] == [str(corpus_dir / "dog.txt")]
+        assert changes["deleted"] == [str(corpus_dir / "fox.txt")]
+        assert changes["unchanged"] == 1
+
+    def test_rewrite_with_same_content_is_touched(self, corpus_dir: Path) -> None:
+        """测试启用内容哈希时内容未变的重写只记为 touched。"""
+        tracker = ChangeTracker.for_directory(str(corpus_dir), hash_content=True)
+        tracker.record(tracker.diff(str(corpus_dir)))
+        stat = os.stat(corpus_dir / "dog.txt")
+        mtime_ns = stat.st_mtime_ns + 10**9
+        os.utime(corpus_dir / "dog.txt", ns=(stat.st_atime_ns, mtime_ns))
+
+        changes = tracker.diff(str(corpus_dir))
+
+        assert changes["touched"] == [str(corpus_dir / "dog.txt")]
+        assert changes["modified"] == []
+        assert tracker.manifest()[str(corpus_dir / "dog.txt")][2] is not None
+
+    def test_hash_defaults_to_cache_setting(
+        self, corpus_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """测试内容哈希默认跟随 MCP_DOCUMENTS_READER_CACHE_HASH。"""
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_CACHE_HASH", "1")
+
+        assert ChangeTracker.for_directory(str(corpus_dir)).hash_content is True
+
+
+class TestChangeTrackerRefresh:
+    """ChangeTracker 增量刷新测试类。"""
+
+    def test_refresh_extracts_only_changed_files(self, corpus_dir: Path) -> None:
+        """测试刷新时只重新提取变化的文件到提取缓存。"""
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+        first = tracker.refresh(str(corpus_dir))
+        (corpus_dir / "dog.txt").write_text("A cat purrs.", encoding="utf-8")
+
+        with mock.patch.object(
+            DocumentReaderFactory, "read", wraps=DocumentReaderFactory.read
+        ) as read:
+            second = tracker.refresh(str(corpus_dir))
+
+        read.assert_called_once_with(str(corpus_dir / "dog.txt"))
+        assert first["added"] == first["extracted"] == 3
+        assert second["modified"] == second["extracted"] == 1
+        assert second["unchanged"] == 2
+        assert tracker.last_refresh == second
+
+    def test_refresh_without_cache_only_records(self, corpus_dir: Path) -> None:
+        """测试未启用缓存且未建立索引时刷新只更新清单。"""
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+
+        with (
+            mock.patch.object(DocumentReaderFactory, "cache", None),
+            mock.patch.object(DocumentReaderFactory, "read") as read,
+        ):
+            summary = tracker.refresh(str(corpus_dir))
+
+        read.assert_not_called()
+        assert summary["extracted"] == 0
+        assert len(tracker.manifest()) == 3
+
+    def test_refresh_reports_failures(self, corpus_dir: Path) -> None:
+        """测试刷新时提取失败的文件被报告。"""
+        (corpus_dir / "broken.docx").write_bytes(b"not a zip")
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+
+        summary = tracker.refresh(str(corpus_dir))
+
+        assert summary["failed"] == 1
+        assert summary["errors"][0]["path"].endswith("broken.docx")
+
+    def test_refresh_text_starting_with_error(self, corpus_dir: Path) -> None:
+        """测试刷新时以 "Error" 开头的正常文档计为已提取。"""
+        (corpus_dir / "policy.txt").write_text("Error budget policy", encoding="utf-8")
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+
+        summary = tracker.refresh(str(corpus_dir))
+
+        assert (summary["extracted"], summary["failed"]) == (4, 0)
+
+    def test_refresh_updates_index(self, corpus_dir: Path) -> None:
+        """测试已建立索引的目录刷新时按变更更新索引。"""
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+        tracker.refresh(str(corpus_dir))
+        index.update(str(corpus_dir))
+        (corpus_dir / "dog.txt").write_text("A cat purrs.", encoding="utf-8")
+        (corpus_dir / "fox.txt").unlink()
+
+        with mock.patch(
+            "mcp_documents_reader._scan_documents", wraps=_scan_documents
+        ) as scan:
+            summary = tracker.refresh(str(corpus_dir))
+
+        scan.assert_called_once()
+        assert summary["index"]["indexed"] == summary["extracted"] == 1
+        assert summary["index"]["removed"] == 1
+        assert _paths(index.search("cat")) == ["dog.txt"]
+        assert index.search("fox")["total"] == 0
+
+    def test_index_built_apart_compares_on_its_own(self, corpus_dir: Path) -> None:
+        """测试索引与清单不一致时由索引自行比较目录。"""
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+        tracker.refresh(str(corpus_dir))
+        index = CorpusIndex.for_directory(str(corpus_dir))
+
+        summary = tracker.refresh(str(corpus_dir))
+
+        assert summary["added"] == 0
+        assert summary["index"]["indexed"] == 3
+        assert _paths(index.search("fox")) == ["fox.txt"]
+
+    def test_touched_file_keeps_index_entry(self, corpus_dir: Path) -> None:
+        """测试内容未变的重写只更新索引中的文件状态，不重新提取。"""
+        tracker = ChangeTracker.for_directory(str(corpus_dir), hash_content=True)
+        index = CorpusIndex.for_directory(str(corpus_dir))
+        tracker.refresh(str(corpus_dir))
+        stat = os.stat(corpus_dir / "dog.txt")
+        mtime_ns = stat.st_mtime_ns + 10**9
+        os.utime(corpus_dir / "dog.txt", ns=(stat.st_atime_ns, mtime_ns))
+
+        summary = tracker.refresh(str(corpus_dir))
+
+        assert summary["extracted"] == 0
+        assert summary["unchanged"] == 3
+        assert index.documents()[str(corpus_dir / "dog.txt")][1] == mtime_ns
+
+    def test_watch_refreshes_in_background(self, corpus_dir: Path) -> None:
+        """测试后台轮询按间隔刷新并可停止。"""
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+        tracker.refresh(str(corpus_dir))
+        (corpus_dir / "new.txt").write_text("new", encoding="utf-8")
+
+        # Long enough that the next refresh does not replace the result
+        # before it is seen
+        tracker.watch(str(corpus_dir), 0.5)
+        deadline = time.monotonic() + 5
+        while (tracker.last_refresh or {}).get("added") != 1:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        tracker.stop()
+
+        assert not tracker.watching
+
+    def test_watch_keeps_errors(self, corpus_dir: Path) -> None:
+        """测试后台刷新失败时记录错误信息。"""
+        tracker = ChangeTracker.for_directory(str(corpus_dir))
+
+        with mock.patch.object(tracker, "refresh", side_effect=OSError("gone")):
+            tracker.watch(str(corpus_dir), 0.01)
+            deadline = time.monotonic() + 5
+            while tracker.last_refresh is None:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            tracker.stop()
+
+        assert tracker.last_refresh == {"error": "gone"}
+
+
+class TestRefreshDirectory:
+    """refresh_directory 工具测试类。"""
+
+    def test_refresh_and_watch(self, corpus_dir: Path) -> None:
+        """测试刷新目录并启动、停止后台轮询。"""
+        first = refresh_directory(str(corpus_dir), watch_interval_s=60)
+        second = refresh_directory(str(corpus_dir))
+        third = refresh_directory(str(corpus_dir), watch_interval_s=0)
+
+        assert first["added"] == 3
+        assert first["watching"] is second["watching"] is True
+        assert second["unchanged"] == 3
+        assert third["watching"] is False
+
+    def test_missing_directory(self) -> None:
+        """测试刷新不存在的目录返回错误。"""
+        result = refresh_directory("/nonexistent/corpus")
+
+        assert result == {"error": "Error: Directory '/nonexistent/corpus' not found."}
+
+    def test_refresh_error(self, corpus_dir: Path) -> None:
+        """测试刷新过程中的异常被转换为错误信息。"""
+        with mock.patch.object(
+            ChangeTracker, "refresh", side_effect=OSError("disk full")
+        ):
+            result = refresh_directory(str(corpus_dir))
+
+        assert result == {"error": "Error refreshing directory: disk full"}
@@ -0,0 +1,209 @@
+"""extract 批量提取命令测试。
+
+测试内容：
+- 遍历目录，在工作进程中提取支持的文件，每个文件写入一条 JSON 记录
+- 记录耗时与错误，终止的工作进程记录为错误
+- 从输出文件恢复：跳过已记录的文件，丢弃中断时写了一半的行
+- main 的 extract 子命令
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+import pytest
+
+from mcp_documents_reader import (
+    _extract_record,
+    _extracted_records,
+    _timed_read,
+    extract_directory,
+    main,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def corpus(temp_document_dir: str) -> Path:
+    """包含子目录、损坏文件和不支持文件的文档目录。
+
+    Args:
+        temp_document_dir: 临时目录
+
+    Returns:
+        Path: 文档目录
+    """
+    root = Path(temp_document_dir) / "corpus"
+    (root / "sub").mkdir(parents=True)
+    for name in ("sample.txt", "sample.pdf", "corrupted.docx"):
+        (root / name).write_bytes((FIXTURES_DIR / name).read_bytes())
+    (root / "sub" / "notes.txt").write_text("nested notes", encoding="utf-8")
+    (root / "image.bin").write_bytes(b"\x00")
+    return root
+
+
+def read_records(out: Path) -> dict[str, dict[str, Any]]:
+    """读取输出文件中的记录。
+
+    Args:
+        out: 输出文件
+
+    Returns:
+        dict[str, dict[str, Any]]: 文件名到记录的映射
+    """
+    with open(out, encoding="utf-8") as lines:
+        records = [json.loads(line) for line in lines]
+    return {os.path.basename(record["path"]): record for record in records}
+
+
+class TestExtractDirectory:
+    """extract_directory 测试类。"""
+
+    def test_extracts_and_resumes(self, corpus: Path, temp_document_dir: str) -> None:
+        """测试每个支持的文件写入一条记录，再次运行时只提取修改过的文件。"""
+        out = Path(temp_document_dir) / "results.jsonl"
+
+        summary = extract_directory(str(corpus), str(out), jobs=2)
+
+        assert summary["files"] == 4
+        assert (summary["extracted"], summary["failed"], summary["skipped"]) == (
+            3,
+            1,
+            0,
+        )
+        records = read_records(out)
+        assert set(records) == {
+            "sample.txt",
+            "sample.pdf",
+            "corrupted.docx",
+            "notes.txt",
+        }
+        assert records["notes.txt"]["text"] == "nested notes"
+        assert records["notes.txt"]["chars"] == 12
+        assert records["sample.pdf"]["format"] == "PDF"
+        assert records["sample.pdf"]["seconds"] >= 0
+        assert records["corrupted.docx"]["text"] is None
+        assert records["corrupted.docx"]["error"].startswith("Error reading DOCX")
+
+        (corpus / "sub" / "notes.txt").write_text("changed", encoding="utf-8")
+        summary = extract_directory(str(corpus), str(out), jobs=1, recursive=True)
+
+        assert (summary["extracted"], summary["skipped"]) == (1, 3)
+        with open(out, encoding="utf-8") as lines:
+            last = json.loads(lines.readlines()[-1])
+        assert last["text"] == "changed"
+
+    def test_no_resume_overwrites(self, corpus: Path, temp_document_dir: str) -> None:
+        """测试不恢复时覆盖输出文件，不递归时跳过子目录。"""
+        out = Path(temp_document_dir) / "results.jsonl"
+        out.write_text('{"path": "stale"}\n', encoding="utf-8")
+
+        summary = extract_directory(
+            str(corpus), str(out), jobs=1, recursive=False, resume=False
+        )
+
+        assert summary["files"] == 3
+        assert "stale" not in read_records(out)
+
+
+class TestCheckpoint:
+    """输出文件作为检查点的测试类。"""
+
+    def test_incomplete_last_line_is_dropped(self, temp_document_dir: str) -> None:
+        """测试读取已记录的文件，截掉中断时未写完的最后一行，忽略无效行。"""
+        out = Path(temp_document_dir) / "results.jsonl"
+        done = json.dumps({"path": "/a.txt", "size": 3, "mtime_ns": 7})
+        out.write_text(f'{done}\nnot json\n{{"path": "/b.t', encoding="utf-8")
+
+        assert _extracted_records(str(out)) == {"/a.txt": (3, 7)}
+        assert out.read_text(encoding="utf-8") == f"{done}\nnot json\n"
+
+    def test_missing_output(self, temp_document_dir: str) -> None:
+        """测试输出文件不存在时没有已记录的文件。"""
+        assert _extracted_records(os.path.join(temp_document_dir, "none")) == {}
+
+
+class TestExtractRecord:
+    """单个文件记录测试类。"""
+
+    def test_killed_worker_is_an_error(self, sample_pdf_file: Path) -> None:
+        """测试工作进程超时被终止时记录错误。"""
+        workers = mock.Mock()
+        workers.run.side_effect = TimeoutError("Extraction timed out after 1 s")
+
+        record = _extract_record(workers, str(sample_pdf_file), (10, 20))
+
+        assert record["error"] == "Error reading PDF: Extraction timed out after 1 s"
+        assert (record["size"], record["mtime_ns"], record["chars"]) == (10, 20, 0)
+
+    def test_empty_document(self, temp_document_dir: str) -> None:
+        """测试没有文本的文档记录为空文本而非提示信息。"""
+        path = os.path.join(temp_document_dir, "empty.txt")
+        Path(path).write_text("", encoding="utf-8")
+        workers = mock.Mock()
+        workers.run.side_effect = lambda func, *args: func(*args)
+
+        record = _extract_record(workers, path, (0, 0))
+
+        assert (record["text"], record["error"]) == ("", None)
+
+    def test_text_starting_with_error(self, temp_document_dir: str) -> None:
+        """测试以 Error reading 开头的文档内容记录为文本而非错误。"""
+        path = os.path.join(temp_document_dir, "log.txt")
+        Path(path).write_text("Error reading TXT: not really", encoding="utf-8")
+        workers = mock.Mock()
+        workers.run.side_effect = lambda func, *args: func(*args)
+
+        record = _extract_record(workers, path, (0, 0))
+
+        assert (record["text"], record["error"]) == (
+            "Error reading TXT: not really",
+            None,
+        )
+
+    def test_timed_read(self, sample_txt_file: Path) -> None:
+        """测试工作进程中的读取返回文本和耗时。"""
+        text, seconds = _timed_read(str(sample_txt_file))
+
+        assert "测试文本文件" in text
+        assert seconds >= 0
+
+
+class TestExtractCommand:
+    """extract 子命令测试类。"""
+
+    def test_arguments(
+        self, corpus: Path, temp_document_dir: str, capsys: pytest.CaptureFixture
+    ) -> None:
+        """测试解析参数并输出汇总。"""
+        out = os.path.join(temp_document_dir, "results.jsonl")
+        with mock.patch(
+            "mcp_documents_reader.extract_directory", return_value={"files": 4}
+        ) as extract:
+            main(
+                [
+                    "extract",
+                    str(corpus),
+                    "--jobs",
+                    "4",
+                    "--out",
+                    out,
+                    "--timeout",
+                    "0",
+                    "--no-recursive",
+                    "--no-resume",
+                ]
+            )
+
+        extract.assert_called_once_with(
+            str(corpus), out, jobs=4, recursive=False, timeout=None, resume=False
+        )
+        assert json.loads(capsys.readouterr().out) == {"files": 4}
+
+    def test_missing_directory(self, temp_document_dir: str) -> None:
+        """测试目录不存在时报错退出。"""
+        with pytest.raises(SystemExit):
+            main(["extract", os.path.join(temp_document_dir, "none"), "--out", "x"])
@@ -5,16 +5,29 @@
 - is_supported 方法测试
 - 支持的文件类型验证
 - 不支持的文件类型处理
+- SingleFlight 并发请求合并，等待者按自己的取消停止等待
+- DocumentReaderFactory.read 对同一文件的并发读取只提取一次
 """
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
 import pytest
 
 from mcp_documents_reader import (
+    Cancellation,
     DocumentReaderFactory,
     DocxReader,
     ExcelReader,
+    ExtractionInterrupted,
     PdfReader,
+    SingleFlight,
     TxtReader,
+    metrics,
+    read_document,
 )
 
 
@@ -50,6 +63,20 @@ class TestDocumentReaderFactory:
         reader = DocumentReaderFactory.get_reader(file_path)
         assert isinstance(reader, expected_reader)
 
+    def test_get_reader_with_options(self) -> None:
+        """测试获取 Reader 时传入读取选项。"""
+        reader = DocumentReaderFactory.get_reader("report.pdf", start_page=2)
+
+        assert isinstance(reader, PdfReader)
+        assert reader.start_page == 2
+
+    def test_get_reader_unsupported_option(self) -> None:
+        """测试传入 Reader 不支持的选项应抛出异常。"""
+        with pytest.raises(ValueError) as exc_info:
+            DocumentReaderFactory.get_reader("test.txt", start_page=2)
+
+        assert "Unsupported option(s) for .txt documents" in str(exc_info.value)
+
     def test_get_reader_unsupported_type(self) -> None:
         """测试获取不支持的文件类型应抛出异常。"""
         with pytest.raises(ValueError) as exc_info:
@@ -183,3 +210,166 @@ class TestDocumentReaderFactory:
         assert readers[".pdf"] == PdfReader
         assert readers[".xlsx"] == ExcelReader
         assert readers[".xls"] == ExcelReader
+
+
+class TestSingleFlight:
+    """SingleFlight 并发请求合并测试类。"""
+
+    def test_concurrent_calls_share_one_run(self) -> None:
+        """测试相同键的并发调用只执行一次并共享结果。"""
+        metrics.reset()
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work() -> str:
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(flight.run, "key", work) for _ in range(4)]
+            while metrics.snapshot()["cache"]["coalesced"] < 3:
+                threading.Event().wait(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert results == ["result"] * 4
+        assert len(calls) == 1
+        assert flight.in_flight() == 0
+
+    def test_exception_is_shared(self) -> None:
+        """测试执行失败时所有等待者收到同一异常，且键随后被释放。"""
+        metrics.reset()
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fail() -> str:
+            release.wait(5)
+            raise OSError("disk error")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(flight.run, "key", fail)
+            while flight.in_flight() == 0:
+                threading.Event().wait(0.01)
+            second = pool.submit(flight.run, "key", fail)
+            while metrics.snapshot()["cache"]["coalesced"] < 1:
+                threading.Event().wait(0.01)
+            release.set()
+            for future in (first, second):
+                with pytest.raises(OSError, match="disk error"):
+                    future.result()
+
+        assert flight.run("key", lambda: "again") == "again"
+
+    def test_waiter_stops_at_its_own_deadline(self) -> None:
+        """测试等待者超时后立即停止等待，而共享的调用继续执行。"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            leader = pool.submit(flight.run, "key", lambda: release.wait(5) and "done")
+            while flight.in_flight() == 0:
+                threading.Event().wait(0.01)
+            started = time.monotonic()
+            with pytest.raises(ExtractionInterrupted, match="timed out"):
+                Cancellation(0.2).run(flight.run, "key", lambda: "unused")
+            waited = time.monotonic() - started
+            release.set()
+
+            assert leader.result() == "done"
+        assert waited < 1
+
+    def test_different_keys_run_separately(self) -> None:
+        """测试不同键的调用各自执行。"""
+        flight = SingleFlight()
+
+        assert flight.run("a", lambda: 1) == 1
+        assert flight.run("b", lambda: 2) == 2
+
+
+class TestFactoryCoalescing:
+    """DocumentReaderFactory.read 并发读取合并测试类。"""
+
+    def test_concurrent_reads_extract_once(self, temp_document_dir: str) -> None:
+        """测试同一文件的并发读取共享一次提取。"""
+        metrics.reset()
+        file_path = Path(temp_document_dir) / "report.txt"
+        file_path.write_text("content", encoding="utf-8")
+        calls = []
+        release = threading.Event()
+
+        def read(self, path: str) -> str:  # noqa: ARG001
+            calls.append(path)
+            release.wait(5)
+            return "shared text"
+
+        with (
+            mock.patch.object(DocumentReaderFactory, "cache", None),
+            mock.patch.object(TxtReader, "read", read),
+            ThreadPoolExecutor(max_workers=3) as pool,
+        ):
+            futures = [
+                pool.submit(DocumentReaderFactory.read, str(file_path))
+                for _ in range(3)
+            ]
+            while metrics.snapshot()["cache"]["coalesced"] < 2:
+                threading.Event().wait(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert results == ["shared text"] * 3
+        assert len(calls) == 1
+
+    def test_coalesced_read_honours_its_timeout(self, temp_document_dir: str) -> None:
+        """测试合并到慢速提取上的读取在自己的超时到期时返回错误。"""
+        file_path = Path(temp_document_dir) / "slow.txt"
+        file_path.write_text("content", encoding="utf-8")
+        release = threading.Event()
+
+        def read(self, path: str) -> str:  # noqa: ARG001
+            release.wait(5)
+            return "shared text"
+
+        with (
+            mock.patch.object(DocumentReaderFactory, "cache", None),
+            mock.patch.object(TxtReader, "read", read),
+            ThreadPoolExecutor(max_workers=1) as pool,
+        ):
+            leader = pool.submit(DocumentReaderFactory.read, str(file_path))
+            while DocumentReaderFactory.in_flight.in_flight() == 0:  # type: ignore[union-attr]
+                threading.Event().wait(0.01)
+            started = time.monotonic()
+            result = read_document(str(file_path), timeout_s=0.3)
+            waited = time.monotonic() - started
+            release.set()
+
+            assert leader.result() == "shared text"
+        assert result.startswith("Error reading document: Extraction timed out")
+        assert waited < 1.5
+
+    def test_different_options_are_not_shared(self, temp_document_dir: str) -> None:
+        """测试读取选项不同的请求使用不同的合并键。"""
+        file_path = Path(temp_document_dir) / "report.txt"
+        file_path.write_text("line 1\nline 2\n", encoding="utf-8")
+        flight = SingleFlight()
+
+        with (
+            mock.patch.object(DocumentReaderFactory, "cache", None),
+            mock.patch.object(DocumentReaderFactory, "in_flight", flight),
+            mock.patch.object(flight, "run", wraps=flight.run) as run,
+        ):
+            first = DocumentReaderFactory.read(str(file_path), start_line=1)
+            second = DocumentReaderFactory.read(str(file_path), start_line=2)
+
+        keys = [call.args[0] for call in run.call_args_list]
+        assert first.startswith("line 1")
+        assert second.startswith("line 2")
+        assert len(set(keys)) == 2
+
+    def test_read_without_single_flight(self, sample_txt_file: Path) -> None:
+        """测试禁用请求合并时直接读取。"""
+        with mock.patch.object(DocumentReaderFactory, "in_flight", None):
+            result = DocumentReaderFactory.read(str(sample_txt_file))
+
+        assert "测试文本文件" in result
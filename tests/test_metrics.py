@@ -0,0 +1,299 @@
+"""Metrics 运行指标测试。
+
+测试内容：
+- 调用次数、按类型统计的错误、输入字节数与输出字符数
+- 延迟直方图及 p50/p99 估计
+- 提取缓存命中率
+- 合并工作进程导出的记录
+- Prometheus 文本格式输出及定期写入文件
+- 读取器与 MCP 工具调用的埋点
+- get_server_stats MCP 工具
+"""
+
+import os
+from pathlib import Path
+from typing import Generator
+from unittest import mock
+
+import pytest
+
+from mcp_documents_reader import (
+    DocumentReaderFactory,
+    DocxReader,
+    ErrorMessage,
+    Metrics,
+    PdfReader,
+    _error_kind,
+    get_server_stats,
+    mcp,
+    metrics,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics() -> Generator[None, None, None]:
+    """在每个测试前后清空全局指标。
+
+    Yields:
+        None
+    """
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestMetrics:
+    """Metrics 统计测试类。"""
+
+    def test_observe_counts_calls_and_errors(self) -> None:
+        """测试记录调用次数、字节数、字符数及按类型统计的错误。"""
+        recorder = Metrics()
+        recorder.observe("readers", "PDF", 0.02, bytes_in=100, chars_out=40)
+        recorder.observe("readers", "PDF", 0.3, bytes_in=50, error="ValueError")
+
+        stats = recorder.snapshot()["readers"]["PDF"]
+
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+        assert stats["errors_by_type"] == {"ValueError": 1}
+        assert stats["bytes_in"] == 150
+        assert stats["chars_out"] == 40
+        assert stats["latency_s"]["max"] == 0.3
+
+    def test_latency_histogram(self) -> None:
+        """测试延迟落入累计直方图桶，并由桶上界估计 p50/p99。"""
+        recorder = Metrics()
+        for seconds in (0.001, 0.002, 0.003, 0.2):
+            recorder.observe("tools", "read_document", seconds)
+
+        latency = recorder.snapshot()["tools"]["read_document"]["latency_s"]
+
+        assert latency["buckets"]["0.005"] == 3
+        assert latency["buckets"]["0.25"] == 4
+        assert latency["buckets"]["+Inf"] == 4
+        assert latency["p50"] == 0.005
+        assert latency["p99"] == 0.25
+        assert latency["sum"] == pytest.approx(0.206)
+
+    def test_quantile_beyond_last_bucket(self) -> None:
+        """测试超过最大桶上界的延迟估计为 None。"""
+        recorder = Metrics()
+        recorder.observe("tools", "read_document", 120)
+
+        assert recorder.snapshot()["tools"]["read_document"]["latency_s"]["p99"] is None
+
+    def test_cache_hit_ratio(self) -> None:
+        """测试缓存命中率，未查询时为 None。"""
+        recorder = Metrics()
+        assert recorder.snapshot()["cache"]["hit_ratio"] is None
+
+        recorder.cache_lookup(True)
+        recorder.cache_lookup(True)
+        recorder.cache_lookup(False)
+
+        assert recorder.snapshot()["cache"] == {
+            "hits": 2,
+            "misses": 1,
+            "hit_ratio": 0.6667,
+            "coalesced": 0,
+        }
+
+    def test_merge_exported_records(self) -> None:
+        """测试合并另一个实例（如工作进程）导出的记录。"""
+        worker = Metrics()
+        worker.observe("readers", "PDF", 0.02, bytes_in=100, chars_out=40)
+        worker.observe("readers", "PDF", 0.3, error="ValueError")
+        recorder = Metrics()
+        recorder.observe("readers", "PDF", 0.5, bytes_in=10)
+
+        recorder.merge(worker.export())
+
+        stats = recorder.snapshot()["readers"]["PDF"]
+        assert stats["calls"] == 3
+        assert stats["bytes_in"] == 110
+        assert stats["errors_by_type"] == {"ValueError": 1}
+        assert stats["latency_s"]["max"] == 0.5
+        assert stats["latency_s"]["buckets"]["+Inf"] == 3
+        assert worker.snapshot()["readers"]["PDF"]["calls"] == 2
+
+    def test_reset(self) -> None:
+        """测试重置后清空所有记录。"""
+        recorder = Metrics()
+        recorder.observe("tools", "read_document", 0.1)
+        recorder.cache_lookup(True)
+
+        recorder.reset()
+
+        snapshot = recorder.snapshot()
+        assert snapshot["tools"] == {}
+        assert snapshot["cache"]["hits"] == 0
+
+
+class TestPrometheus:
+    """Prometheus 文本输出测试类。"""
+
+    def test_text_format(self) -> None:
+        """测试输出计数器、错误类型和直方图。"""
+        recorder = Metrics()
+        recorder.observe("readers", "PDF", 0.02, bytes_in=100, chars_out=40)
+        recorder.observe("readers", "PDF", 0.02, error="ValueError")
+        recorder.cache_lookup(False)
+
+        text = recorder.prometheus()
+
+        assert "# TYPE mcp_documents_reader_latency_seconds histogram" in text
+        assert 'mcp_documents_reader_calls_total{group="readers",name="PDF"} 2' in text
+        assert (
+            "mcp_documents_reader_errors_total"
+            '{group="readers",name="PDF",type="ValueError"} 1' in text
+        )
+        assert (
+            "mcp_documents_reader_latency_seconds_bucket"
+            '{group="readers",name="PDF",le="+Inf"} 2' in text
+        )
+        assert "mcp_documents_reader_cache_misses_total 1" in text
+        assert text.endswith("\n")
+
+    def test_dump_writes_file(self, temp_document_dir: str) -> None:
+        """测试写入 Prometheus 文件。"""
+        path = os.path.join(temp_document_dir, "metrics", "server.prom")
+        recorder = Metrics(prometheus_path=path)
+        recorder.observe("tools", "read_document", 0.1)
+
+        recorder.dump()
+
+        content = Path(path).read_text(encoding="utf-8")
+        assert 'name="read_document"' in content
+        assert os.listdir(os.path.dirname(path)) == ["server.prom"]
+
+    def test_dump_is_throttled(self, temp_document_dir: str) -> None:
+        """测试记录调用时按间隔自动写入文件。"""
+        path = os.path.join(temp_document_dir, "server.prom")
+        recorder = Metrics(prometheus_path=path, prometheus_interval=3600)
+
+        recorder.observe("tools", "read_document", 0.1)
+        with mock.patch.object(recorder, "dump") as dump:
+            recorder.observe("tools", "read_document", 0.1)
+
+        assert os.path.exists(path)
+        dump.assert_not_called()
+
+    def test_dump_errors_are_ignored(self, temp_document_dir: str) -> None:
+        """测试写入失败不影响调用记录。"""
+        recorder = Metrics(prometheus_path=os.path.join(temp_document_dir, "m.prom"))
+
+        with mock.patch.object(recorder, "dump", side_effect=OSError("read-only")):
+            recorder.observe("tools", "read_document", 0.1)
+
+        assert recorder.snapshot()["tools"]["read_document"]["calls"] == 1
+
+    def test_dump_without_path(self) -> None:
+        """测试未配置文件路径时不写入。"""
+        Metrics().dump()
+
+    def test_from_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """测试从环境变量读取配置。"""
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_METRICS_FILE", "/tmp/server.prom")
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_METRICS_INTERVAL", "60")
+
+        recorder = Metrics.from_env()
+
+        assert recorder.prometheus_path == "/tmp/server.prom"
+        assert recorder.prometheus_interval == 60
+
+
+class TestInstrumentation:
+    """读取器与工具埋点测试类。"""
+
+    def test_reader_read_is_recorded(self) -> None:
+        """测试读取器提取时记录输入字节数和输出字符数。"""
+        file_path = FIXTURES_DIR / "sample.pdf"
+
+        text = PdfReader().read(str(file_path))
+
+        stats = metrics.snapshot()["readers"]["PDF"]
+        assert stats["calls"] == 1
+        assert stats["bytes_in"] == file_path.stat().st_size
+        assert stats["chars_out"] == len(text)
+
+    def test_reader_error_type_is_recorded(self) -> None:
+        """测试读取器出错时按异常类型计数。"""
+        DocxReader().read(str(FIXTURES_DIR / "corrupted.docx"))
+
+        stats = metrics.snapshot()["readers"]["DOCX"]
+        assert stats["errors_by_type"] == {"PackageNotFoundError": 1}
+
+    def test_cache_lookups_are_recorded(self) -> None:
+        """测试工厂读取时记录缓存命中与未命中。"""
+        file_path = str(FIXTURES_DIR / "sample.txt")
+
+        DocumentReaderFactory.read(file_path)
+        DocumentReaderFactory.read(file_path)
+
+        assert metrics.snapshot()["cache"]["hit_ratio"] == 0.5
+
+    async def test_tool_calls_are_recorded(self) -> None:
+        """测试通过 MCP 调用工具时记录调用、输入字节数和错误类型。"""
+        file_path = FIXTURES_DIR / "sample.txt"
+
+        await mcp.call_tool("read_document", {"filename": str(file_path)})
+        await mcp.call_tool("read_document", {"filename": "missing.txt"})
+
+        stats = metrics.snapshot()["tools"]["read_document"]
+        assert stats["calls"] == 2
+        assert stats["bytes_in"] == file_path.stat().st_size
+        assert stats["chars_out"] > 0
+        assert stats["errors_by_type"] == {"NotFound": 1}
+
+    async def test_raised_errors_are_recorded(self) -> None:
+        """测试工具抛出异常时按异常类型计数。"""
+        with mock.patch(
+            "mcp_documents_reader.metrics.snapshot", side_effect=RuntimeError("boom")
+        ):
+            with pytest.raises(Exception):
+                await mcp.call_tool("get_server_stats", {})
+
+        stats = metrics.snapshot()["tools"]["get_server_stats"]
+        assert stats["errors_by_type"] == {"RuntimeError": 1}
+
+    def test_error_kinds(self) -> None:
+        """测试工具返回的错误信息分类。"""
+        assert _error_kind("text") is None
+        assert _error_kind("Error: text that only looks like one") is None
+        assert _error_kind({"results": []}) is None
+        assert _error_kind(ErrorMessage("Error: File 'a.txt' not found.")) == "NotFound"
+        assert _error_kind({"error": "Error: Directory 'a' not found."}) == "NotFound"
+        assert (
+            _error_kind(
+                ErrorMessage("Error: Unsupported document type for file 'a.bin'.")
+            )
+            == "UnsupportedFormat"
+        )
+        assert _error_kind(ErrorMessage("Error: Invalid cursor")) == "InvalidArgument"
+        assert (
+            _error_kind(ErrorMessage("Error reading document: boom"))
+            == "ExtractionError"
+        )
+
+
+class TestGetServerStats:
+    """get_server_stats 工具测试类。"""
+
+    def test_returns_snapshot(self) -> None:
+        """测试返回 JSON 格式的指标。"""
+        PdfReader().read(str(FIXTURES_DIR / "sample.pdf"))
+
+        stats = get_server_stats()
+
+        assert isinstance(stats, dict)
+        assert stats["readers"]["PDF"]["calls"] == 1
+        assert "uptime_s" in stats
+
+    def test_returns_prometheus_text(self) -> None:
+        """测试返回 Prometheus 文本格式的指标。"""
+        stats = get_server_stats(prometheus=True)
+
+        assert isinstance(stats, str)
+        assert "mcp_documents_reader_uptime_seconds" in stats
@@ -3,12 +3,26 @@
 测试内容：
 - DocumentReader 抽象基类验证
 - DocxReader 单元测试
+- DocxReader 流式 XML 引擎：文档顺序、合并单元格与分块续读
 - PdfReader 单元测试
 - TxtReader 单元测试（多种编码）
+- TxtReader 字节范围与行范围读取、LineIndex 行索引
+- ExcelReader 工作表、行范围与单元格范围选择
+- ExcelReader 流式 XML 引擎与 openpyxl 输出一致性
 - ExcelReader 单元测试
+- iter_blocks / iter_chunks 分块读取及游标续读
+- inspect 元数据检查：不提取文本的页数、工作表范围、段落数与行数
+- search 流式搜索：跨分块匹配、提前停止与各格式的位置信息
 """
 
+import mmap
+import os
+import re
+import zipfile
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, Generator
+from unittest import mock
 
 import pytest
 
@@ -16,8 +30,12 @@ from mcp_documents_reader import (
     DocumentReader,
     DocxReader,
     ExcelReader,
+    LineIndex,
     PdfReader,
     TxtReader,
+    _extract_pdf_pages,
+    decode_cursor,
+    encode_cursor,
 )
 
 
@@ -119,6 +137,218 @@ class TestDocxReader:
         assert "Error reading DOCX" in result
 
 
+WORD_XML_HEADER = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/'
+    '2006/main" xmlns:mc="http://schemas.openxmlformats.org/markup-'
+    'compatibility/2006">'
+)
+
+
+@pytest.fixture
+def handmade_docx_file(tmp_path: Path) -> Path:
+    """手工拼装的 DOCX 文件，覆盖 python-docx 不会生成的结构。
+
+    包含内容控件中的段落、修订（插入与删除）、制表位定义、文本框的
+    Choice/Fallback 双份内容、纵向合并单元格以及嵌套表格。
+
+    Args:
+        tmp_path: pytest 临时目录
+
+    Returns:
+        Path: DOCX 文件路径
+    """
+    rel = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    body = (
+        '<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+        "<w:r><w:t>Intro</w:t></w:r><w:r><w:tab/><w:t>tabbed</w:t></w:r>"
+        "<w:ins><w:r><w:t> inserted</w:t></w:r></w:ins>"
+        "<w:del><w:r><w:delText> deleted</w:delText></w:r></w:del></w:p>"
+        "<w:sdt><w:sdtContent><w:p><w:r><w:t>In control</w:t></w:r></w:p>"
+        "</w:sdtContent></w:sdt>"
+        "<w:p><w:r><w:t>Box:</w:t></w:r><w:r><mc:AlternateContent><mc:Choice>"
+        "<w:txbxContent><w:p><w:r><w:t>boxed</w:t></w:r></w:p></w:txbxContent>"
+        "</mc:Choice><mc:Fallback><w:txbxContent><w:p><w:r><w:t>boxed</w:t>"
+        "</w:r></w:p></w:txbxContent></mc:Fallback></mc:AlternateContent>"
+        "</w:r></w:p>"
+        "<w:tbl><w:tr>"
+        '<w:tc><w:tcPr><w:vMerge w:val="restart"/></w:tcPr><w:p><w:r>'
+        "<w:t>Tall</w:t></w:r></w:p></w:tc>"
+        "<w:tc><w:p><w:r><w:t>Outer</w:t></w:r></w:p><w:tbl><w:tr><w:tc><w:p>"
+        "<w:r><w:t>inner</w:t></w:r></w:p></w:tc></w:tr></w:tbl></w:tc>"
+        "</w:tr><w:tr>"
+        "<w:tc><w:tcPr><w:vMerge/></w:tcPr><w:p><w:r><w:t>Tall</w:t></w:r>"
+        "</w:p></w:tc><w:tc><w:p><w:r><w:t>second</w:t><w:br/>"
+        "<w:t>line</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+        "<w:p/><w:p><w:r><w:t>After</w:t></w:r></w:p><w:sectPr/>"
+    )
+    parts = {
+        "[Content_Types].xml": (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+            'content-types"><Default Extension="rels" ContentType="application/'
+            'vnd.openxmlformats-package.relationships+xml"/><Override PartName='
+            '"/word/main.xml" ContentType="application/vnd.openxmlformats-'
+            'officedocument.wordprocessingml.document.main+xml"/></Types>'
+        ),
+        "_rels/.rels": (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+            f'relationships"><Relationship Id="rId1" Type="{rel}/officeDocument" '
+            'Target="word/main.xml"/></Relationships>'
+        ),
+        "word/main.xml": f"{WORD_XML_HEADER}<w:body>{body}</w:body></w:document>",
+    }
+    path = tmp_path / "handmade.docx"
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+    return path
+
+
+@pytest.fixture
+def ordered_docx_file(tmp_path: Path) -> Path:
+    """段落、合并单元格表格、段落交替出现的 DOCX 文件。
+
+    Args:
+        tmp_path: pytest 临时目录
+
+    Returns:
+        Path: DOCX 文件路径
+    """
+    from docx import Document
+
+    doc = Document()
+    doc.add_paragraph("Before")
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 2)).text = "Wide"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "Tall"
+    for row in (1, 2):
+        for col in (1, 2):
+            table.cell(row, col).text = f"r{row}c{col}"
+    run = doc.add_paragraph("After").add_run("\tnext")
+    run.add_break()
+    run.add_text("line")
+    path = tmp_path / "ordered.docx"
+    doc.save(str(path))
+    return path
+
+
+class TestDocxXmlEngine:
+    """DocxReader 流式 XML 引擎测试类。"""
+
+    def test_matches_python_docx(self, sample_docx_file: Path) -> None:
+        """测试表格位于末尾时两个引擎输出一致。
+
+        Args:
+            sample_docx_file: 示例 DOCX 文件路径
+        """
+        expected = DocxReader().read(str(sample_docx_file))
+
+        assert DocxReader(engine="xml").read(str(sample_docx_file)) == expected
+
+    def test_document_order_and_merged_cells(self, ordered_docx_file: Path) -> None:
+        """测试按文档顺序输出，合并单元格只输出一次。
+
+        Args:
+            ordered_docx_file: 段落与表格交替出现的 DOCX 文件路径
+        """
+        result = DocxReader(engine="xml").read(str(ordered_docx_file))
+
+        assert result.split("\n") == [
+            "Before",
+            "Wide",
+            "Tall\tr1c1\tr1c2",
+            "r2c1\tr2c2",
+            "After\tnext",
+            "line",
+        ]
+
+    def test_python_docx_engine_repeats_merged_cells(
+        self, ordered_docx_file: Path
+    ) -> None:
+        """测试默认引擎保持原有行为：表格在段落之后，合并单元格重复输出。
+
+        Args:
+            ordered_docx_file: 段落与表格交替出现的 DOCX 文件路径
+        """
+        result = DocxReader().read(str(ordered_docx_file))
+
+        assert result.startswith("Before\nAfter\tnext\nline\nWide\tWide\tWide")
+
+    def test_handmade_structures(self, handmade_docx_file: Path) -> None:
+        """测试内容控件、修订、文本框与嵌套表格的文本提取。
+
+        Args:
+            handmade_docx_file: 手工拼装的 DOCX 文件路径
+        """
+        result = DocxReader(engine="xml").read(str(handmade_docx_file))
+
+        assert result.split("\n") == [
+            "Intro\ttabbed inserted",
+            "In control",
+            "Box:",
+            "boxed",
+            "Tall\tOuter inner",
+            "second",
+            "line",
+            "After",
+        ]
+
+    def test_finished_blocks_are_released(self, handmade_docx_file: Path) -> None:
+        """测试已输出的段落和表格行会从解析树中移除。
+
+        Args:
+            handmade_docx_file: 手工拼装的 DOCX 文件路径
+        """
+        from xml.etree import ElementTree
+
+        bodies = []
+        original = ElementTree.iterparse
+
+        def tracking(*args: Any, **kwargs: Any) -> Any:
+            for event, element in original(*args, **kwargs):
+                if element.tag.endswith("}body") and event == "end":
+                    bodies.append(len(element))
+                yield event, element
+
+        with mock.patch.object(ElementTree, "iterparse", tracking):
+            DocxReader(engine="xml").read(str(handmade_docx_file))
+
+        assert bodies == [0]
+
+    def test_chunks_resume(self, ordered_docx_file: Path) -> None:
+        """测试 XML 引擎的分块读取可以拼回完整文本。
+
+        Args:
+            ordered_docx_file: 段落与表格交替出现的 DOCX 文件路径
+        """
+        reader = DocxReader(engine="xml")
+        chunks = []
+        cursor = None
+        while True:
+            stream = reader.iter_chunks(str(ordered_docx_file), cursor, 5)
+            chunk, cursor = next(stream)
+            stream.close()
+            chunks.append(chunk)
+            if cursor is None:
+                break
+
+        assert "".join(chunks) == reader.read(str(ordered_docx_file))
+
+    def test_corrupted_file(self, fixtures_dir: Path) -> None:
+        """测试 XML 引擎读取损坏文件返回错误信息。
+
+        Args:
+            fixtures_dir: 测试 fixtures 目录
+        """
+        result = DocxReader(engine="xml").read(str(fixtures_dir / "corrupted.docx"))
+
+        assert "Error reading DOCX" in result
+
+    def test_unknown_engine(self) -> None:
+        """测试未知引擎名称抛出异常。"""
+        with pytest.raises(ValueError, match="Unknown DOCX engine"):
+            DocxReader(engine="lxml")
+
+
 class TestPdfReader:
     """PdfReader 测试类。"""
 
@@ -167,6 +397,135 @@ class TestPdfReader:
 
         assert "Error reading PDF" in result
 
+    def test_read_page_range(self, multipage_pdf_file: Path) -> None:
+        """测试只读取指定的页码范围。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        reader = PdfReader(start_page=2, end_page=3)
+        result = reader.read(str(multipage_pdf_file))
+
+        assert result == "Page 2 content.\n\nPage 3 content."
+
+    def test_read_open_ended_range(self, multipage_pdf_file: Path) -> None:
+        """测试只指定起始页时读取到文档末尾，结束页超出范围时截断。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        assert "Page 1" not in PdfReader(start_page=4).read(str(multipage_pdf_file))
+        result = PdfReader(start_page=5, end_page=99).read(str(multipage_pdf_file))
+
+        assert result == "Page 5 content."
+
+    def test_read_page_list(self, multipage_pdf_file: Path) -> None:
+        """测试按页码列表读取，保持请求的顺序。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        reader = PdfReader(pages=[5, 1])
+        result = reader.read(str(multipage_pdf_file))
+
+        assert result == "Page 5 content.\n\nPage 1 content."
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"start_page": 6},
+            {"start_page": 0},
+            {"start_page": 3, "end_page": 2},
+            {"pages": [1, 9]},
+        ],
+    )
+    def test_read_invalid_page_selection(
+        self, multipage_pdf_file: Path, options: dict
+    ) -> None:
+        """测试无效的页码选择返回错误信息。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+            options: 页码选项
+        """
+        reader = PdfReader(**options)
+        result = reader.read(str(multipage_pdf_file))
+
+        assert "Error reading PDF" in result
+        assert "page" in result.lower()
+
+    def test_parallel_extraction_matches_sequential(
+        self, multipage_pdf_file: Path
+    ) -> None:
+        """测试进程池并行提取的结果与单进程一致且保持页序。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        sequential = PdfReader().read(str(multipage_pdf_file))
+        parallel = PdfReader(workers=2, parallel_threshold=2).read(
+            str(multipage_pdf_file)
+        )
+
+        assert parallel == sequential
+
+    def test_parallel_extraction_with_page_range(
+        self, multipage_pdf_file: Path
+    ) -> None:
+        """测试并行模式下的页码范围读取。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        reader = PdfReader(start_page=2, end_page=4, workers=2, parallel_threshold=1)
+        result = reader.read(str(multipage_pdf_file))
+
+        assert result == "Page 2 content.\n\nPage 3 content.\n\nPage 4 content."
+
+    def test_below_threshold_stays_single_process(
+        self, multipage_pdf_file: Path
+    ) -> None:
+        """测试页数低于阈值时不使用进程池。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        reader = PdfReader(workers=4, parallel_threshold=10)
+        with mock.patch("mcp_documents_reader._pdf_pool") as mock_pool:
+            reader.read(str(multipage_pdf_file))
+
+        mock_pool.assert_not_called()
+
+    def test_extract_pdf_pages_worker(self, multipage_pdf_file: Path) -> None:
+        """测试工作进程函数按给定顺序提取页面。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        texts = _extract_pdf_pages(str(multipage_pdf_file), [2, 0])
+
+        assert [text.strip() for text in texts] == [
+            "Page 3 content.",
+            "Page 1 content.",
+        ]
+
+    def test_parallel_settings_from_env(self) -> None:
+        """测试通过环境变量开启并行提取。"""
+        env = {
+            "MCP_DOCUMENTS_READER_PDF_WORKERS": "8",
+            "MCP_DOCUMENTS_READER_PDF_PARALLEL_THRESHOLD": "100",
+        }
+        with mock.patch.dict(os.environ, env):
+            reader = PdfReader()
+
+        assert reader.workers == 8
+        assert reader.parallel_threshold == 100
+
+    def test_pages_and_range_are_exclusive(self) -> None:
+        """测试 pages 与 start_page/end_page 不能同时使用。"""
+        with pytest.raises(ValueError):
+            PdfReader(start_page=1, pages=[2])
+
 
 class TestTxtReader:
     """TxtReader 测试类。"""
@@ -236,6 +595,371 @@ class TestTxtReader:
         # 不存在的文件应返回错误信息
         assert "Error reading TXT" in result
 
+    @pytest.mark.parametrize(
+        "encoding,expected",
+        [
+            ("utf-8-sig", "utf-8-sig"),
+            ("utf-16", "utf-16"),
+            ("utf-32", "utf-32"),
+        ],
+    )
+    def test_read_txt_with_bom(
+        self, temp_document_dir: str, encoding: str, expected: str
+    ) -> None:
+        """测试通过 BOM 识别编码，且结果中不包含 BOM。
+
+        Args:
+            temp_document_dir: 临时目录路径
+            encoding: 写入文件使用的编码
+            expected: 期望检测到的编码
+        """
+        file_path = Path(temp_document_dir) / "bom.txt"
+        file_path.write_text("带 BOM 的文本", encoding=encoding)
+        reader = TxtReader()
+
+        result = reader.read(str(file_path))
+
+        assert result == "带 BOM 的文本"
+        assert reader.encoding == expected
+
+    def test_detected_encoding_is_reported(self, sample_txt_gbk_file: Path) -> None:
+        """测试读取后可获取检测到的编码。
+
+        Args:
+            sample_txt_gbk_file: GBK 编码的示例 TXT 文件路径
+        """
+        reader = TxtReader()
+        reader.read(str(sample_txt_gbk_file))
+
+        assert reader.encoding == "gbk"
+
+    def test_binary_file_detected_as_latin1(self, fixtures_dir: Path) -> None:
+        """测试无法按其他编码解码的文件回退到 latin-1。
+
+        Args:
+            fixtures_dir: fixtures 目录路径
+        """
+        reader = TxtReader()
+
+        assert reader.detect_encoding(str(fixtures_dir / "binary.txt")) == "latin-1"
+
+    def test_detection_only_samples_prefix(self, temp_document_dir: str) -> None:
+        """测试编码只根据文件前缀检测，之后的非法字节被替换而不是重新解码。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        file_path = Path(temp_document_dir) / "mixed.txt"
+        file_path.write_bytes("中文".encode("utf-8") * 10 + b"\xff")
+        reader = TxtReader()
+        reader.sample_bytes = 8
+
+        result = reader.read(str(file_path))
+
+        assert reader.encoding == "utf-8"
+        assert result == "中文" * 10 + "\ufffd"
+
+    @pytest.mark.parametrize(
+        "tail,expected",
+        [("中文日志内容", "gbk"), ("café", "latin-1")],
+    )
+    def test_ascii_sample_is_inconclusive(
+        self, temp_document_dir: str, tail: str, expected: str
+    ) -> None:
+        """测试全为 ASCII 的采样不能确定编码，之后不符合的字节切换到下一个候选编码。
+
+        Args:
+            temp_document_dir: 临时目录路径
+            tail: ASCII 前缀之后的文本
+            expected: 切换后的编码
+        """
+        file_path = Path(temp_document_dir) / "log.txt"
+        file_path.write_bytes(b"a" * 72_000 + tail.encode(expected))
+        reader = TxtReader()
+
+        result = reader.read(str(file_path))
+
+        assert result == "a" * 72_000 + tail
+        assert reader.encoding == expected
+
+    def test_sample_boundary_inside_multibyte_character(
+        self, temp_document_dir: str
+    ) -> None:
+        """测试采样边界落在多字节字符中间时仍能正确识别 UTF-8。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        file_path = Path(temp_document_dir) / "split.txt"
+        file_path.write_text("中文内容", encoding="utf-8")
+        reader = TxtReader()
+        reader.sample_bytes = 4
+
+        assert reader.detect_encoding(str(file_path)) == "utf-8"
+
+    def test_no_supported_encoding(self, fixtures_dir: Path) -> None:
+        """测试所有候选编码都无法解码时返回错误信息。
+
+        Args:
+            fixtures_dir: fixtures 目录路径
+        """
+        reader = TxtReader()
+        reader.encodings = ["utf-8"]
+
+        result = reader.read(str(fixtures_dir / "binary.txt"))
+
+        assert "Could not decode file" in result
+
+
+@pytest.fixture
+def numbered_lines_file(temp_document_dir: str) -> Path:
+    """创建 1000 行、每行带行号的 UTF-8 文本文件。
+
+    Args:
+        temp_document_dir: 临时目录路径
+
+    Returns:
+        Path: 文本文件路径
+    """
+    file_path = Path(temp_document_dir) / "lines.txt"
+    file_path.write_text(
+        "".join(f"第{number}行\n" for number in range(1, 1001)), encoding="utf-8"
+    )
+    return file_path
+
+
+class TestTxtRanges:
+    """TxtReader 范围读取测试类。"""
+
+    @pytest.fixture(autouse=True)
+    def small_segments(self) -> Generator[None, None, None]:
+        """缩小行索引分段大小，使小文件也跨越多个分段。"""
+        with mock.patch.object(LineIndex, "segment_bytes", 64):
+            yield
+
+    def test_read_line_range(self, numbered_lines_file: Path) -> None:
+        """测试读取指定行范围。
+
+        Args:
+            numbered_lines_file: 带行号的文本文件路径
+        """
+        reader = TxtReader(start_line=500, end_line=502)
+
+        result = reader.read(str(numbered_lines_file))
+
+        assert result == "第500行\n第501行\n第502行\n"
+
+    def test_range_after_ascii_sample(self, temp_document_dir: str) -> None:
+        """测试采样全为 ASCII 时，范围读取按窗口内的非 ASCII 字节确定编码。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        file_path = Path(temp_document_dir) / "log.txt"
+        file_path.write_bytes(
+            b"".join(b"ascii log line %06d, padded out\n" % n for n in range(1500))
+            + "中文日志内容\n第二行\n".encode("gbk")
+        )
+        reader = TxtReader(start_line=1501, end_line=1502)
+        reader.sample_bytes = 1024
+
+        result = reader.read(str(file_path))
+
+        assert result == "中文日志内容\n第二行\n"
+        assert reader.encoding == "gbk"
+        assert TxtReader(start_line=1, end_line=1).read(str(file_path)) == (
+            "ascii log line 000000, padded out\n"
+        )
+
+    def test_read_from_line_to_end(self, numbered_lines_file: Path) -> None:
+        """测试只指定起始行时读取到文件末尾。
+
+        Args:
+            numbered_lines_file: 带行号的文本文件路径
+        """
+        result = TxtReader(start_line=999).read(str(numbered_lines_file))
+
+        assert result == "第999行\n第1000行\n"
+
+    def test_read_lines_past_end(self, numbered_lines_file: Path) -> None:
+        """测试起始行超过文件行数时没有内容。
+
+        Args:
+            numbered_lines_file: 带行号的文本文件路径
+        """
+        result = TxtReader(start_line=2000).read(str(numbered_lines_file))
+
+        assert "No text found" in result
+
+    def test_read_byte_range_snaps_to_characters(
+        self, numbered_lines_file: Path
+    ) -> None:
+        """测试字节范围对齐到 UTF-8 字符边界。
+
+        Args:
+            numbered_lines_file: 带行号的文本文件路径
+        """
+        # "第" 占 3 个字节，偏移 1 落在字符中间
+        result = TxtReader(offset=1, length=9).read(str(numbered_lines_file))
+
+        assert result == "1行\n"
+
+    def test_read_byte_range_translates_newlines(self, temp_document_dir: str) -> None:
+        """测试范围读取与完整读取一样转换 CRLF 换行符。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        file_path = Path(temp_document_dir) / "crlf.txt"
+        file_path.write_bytes(b"one\r\ntwo\r\nthree\r\n")
+
+        result = TxtReader(start_line=2).read(str(file_path))
+
+        assert result == "two\nthree\n"
+
+    def test_range_chunks_reassemble(self, numbered_lines_file: Path) -> None:
+        """测试范围读取的分块续读与完整范围读取一致。
+
+        Args:
+            numbered_lines_file: 带行号的文本文件路径
+        """
+        reader = TxtReader(start_line=10, end_line=400)
+        reader.block_bytes = 100
+        parts = []
+        cursor = None
+        while True:
+            chunks = reader.iter_chunks(str(numbered_lines_file), cursor, 37)
+            text, cursor = next(chunks)
+            chunks.close()
+            parts.append(text)
+            if cursor is None:
+                break
+
+        assert "".join(parts) == reader.read(str(numbered_lines_file))
+
+    def test_range_of_empty_file(self, empty_txt_file: Path) -> None:
+        """测试对空文件进行范围读取。
+
+        Args:
+            empty_txt_file: 空 TXT 文件路径
+        """
+        result = TxtReader(start_line=1).read(str(empty_txt_file))
+
+        assert "No text found" in result
+
+    def test_range_rejects_utf16(self, temp_document_dir: str) -> None:
+        """测试 UTF-16 文件不支持范围读取。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        file_path = Path(temp_document_dir) / "utf16.txt"
+        file_path.write_text("text", encoding="utf-16")
+
+        result = TxtReader(offset=0).read(str(file_path))
+
+        assert "Error reading TXT" in result
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"offset": 0, "start_line": 1},
+            {"offset": -1},
+            {"start_line": 0},
+            {"start_line": 5, "end_line": 4},
+        ],
+    )
+    def test_invalid_range_options(self, options: dict) -> None:
+        """测试无效的范围选项抛出异常。
+
+        Args:
+            options: 范围选项
+        """
+        with pytest.raises(ValueError):
+            TxtReader(**options)
+
+
+class TestLineIndex:
+    """LineIndex 行索引测试类。"""
+
+    @pytest.fixture(autouse=True)
+    def small_segments(self) -> Generator[None, None, None]:
+        """缩小行索引分段大小，使小文件也跨越多个分段。"""
+        with mock.patch.object(LineIndex, "segment_bytes", 64):
+            yield
+
+    def test_line_offsets_match_scan(self, numbered_lines_file: Path) -> None:
+        """测试索引计算的行起始偏移与逐行扫描一致。
+
+        Args:
+            numbered_lines_file: 带行号的文本文件路径
+        """
+        data = numbered_lines_file.read_bytes()
+        expected = [0] + [i + 1 for i, byte in enumerate(data) if byte == 0x0A]
+        with (
+            open(numbered_lines_file, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        ):
+            index = LineIndex.build(mapped)
+            offsets = [index.line_offset(mapped, line) for line in range(1, 1002)]
+
+        assert offsets == expected
+        assert index.line_count == 1000
+
+    def test_line_count_without_trailing_newline(self, temp_document_dir: str) -> None:
+        """测试最后一行没有换行符时也计入行数。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        file_path = Path(temp_document_dir) / "tail.txt"
+        file_path.write_bytes(b"a\nb")
+        with (
+            open(file_path, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        ):
+            assert LineIndex.build(mapped).line_count == 2
+
+    def test_index_persisted_to_disk(
+        self, numbered_lines_file: Path, temp_document_dir: str
+    ) -> None:
+        """测试配置目录后行索引持久化到磁盘并可重新加载。
+
+        Args:
+            numbered_lines_file: 带行号的文本文件路径
+            temp_document_dir: 临时目录路径
+        """
+        index_dir = os.path.join(temp_document_dir, "index")
+        env = {"MCP_DOCUMENTS_READER_INDEX_DIR": index_dir}
+        with (
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(LineIndex, "_memory", OrderedDict()),
+        ):
+            TxtReader(start_line=2, end_line=2).read(str(numbered_lines_file))
+            assert len(os.listdir(index_dir)) == 1
+
+        with (
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(LineIndex, "_memory", OrderedDict()),
+            mock.patch.object(LineIndex, "build") as mock_build,
+        ):
+            result = TxtReader(start_line=2, end_line=2).read(str(numbered_lines_file))
+
+        mock_build.assert_not_called()
+        assert result == "第2行\n"
+
+    def test_index_directory_from_cache_dir(self, temp_document_dir: str) -> None:
+        """测试未设置索引目录时使用缓存目录。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        env = {"MCP_DOCUMENTS_READER_CACHE_DIR": temp_document_dir}
+        with mock.patch.dict(os.environ, env):
+            directory = LineIndex.directory()
+
+        assert directory == os.path.join(temp_document_dir, "line-index")
+
 
 class TestExcelReader:
     """ExcelReader 测试类。"""
@@ -315,3 +1039,815 @@ class TestExcelReader:
         result = reader.read("/nonexistent/path/file.xlsx")
 
         assert "Error reading Excel" in result
+
+
+class TestExcelSelection:
+    """ExcelReader 选择性读取测试类。"""
+
+    @pytest.mark.parametrize("sheet", ["Sheet2", 2])
+    def test_read_single_sheet(self, sample_excel_file: Path, sheet: str | int) -> None:
+        """测试按名称或序号只读取一个工作表。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+            sheet: 工作表名称或从 1 开始的序号
+        """
+        result = ExcelReader(sheet=sheet).read(str(sample_excel_file))
+
+        assert result == "=== Sheet: Sheet2 ===\n产品\t价格\n苹果\t5.5\n香蕉\t3.2\n"
+
+    def test_unselected_sheets_are_not_parsed(self, sample_excel_file: Path) -> None:
+        """测试未选择的工作表不会被解析。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+        """
+        from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+
+        parsed = []
+        original = ReadOnlyWorksheet._cells_by_row
+
+        def tracking(worksheet: ReadOnlyWorksheet, *args: Any, **kwargs: Any) -> Any:
+            parsed.append(worksheet.title)
+            return original(worksheet, *args, **kwargs)
+
+        with mock.patch.object(ReadOnlyWorksheet, "_cells_by_row", tracking):
+            ExcelReader(sheet="Sheet2").read(str(sample_excel_file))
+
+        assert parsed == ["Sheet2"]
+
+    def test_read_row_range(self, sample_excel_file: Path) -> None:
+        """测试读取指定行范围。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+        """
+        reader = ExcelReader(sheet="Sheet1", start_row=2, end_row=2)
+
+        result = reader.read(str(sample_excel_file))
+
+        assert result == "=== Sheet: Sheet1 ===\n张三\t25\t北京\n"
+
+    def test_read_cell_range(self, sample_excel_file: Path) -> None:
+        """测试读取 A1 风格的单元格范围。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+        """
+        reader = ExcelReader(cell_range="Sheet1!B2:C3")
+
+        result = reader.read(str(sample_excel_file))
+
+        assert result == "=== Sheet: Sheet1 ===\n25\t北京\n30\t上海\n"
+
+    def test_read_column_range(self, sample_excel_file: Path) -> None:
+        """测试读取整列范围。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+        """
+        result = ExcelReader(sheet=1, cell_range="A:A").read(str(sample_excel_file))
+
+        assert result == "=== Sheet: Sheet1 ===\n姓名\n张三\n李四\n"
+
+    def test_max_rows_per_sheet(self, sample_excel_file: Path) -> None:
+        """测试每个工作表最多读取 max_rows 行。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+        """
+        result = ExcelReader(max_rows=2).read(str(sample_excel_file))
+
+        assert "张三" in result
+        assert "李四" not in result
+        assert "苹果" in result
+        assert "香蕉" not in result
+
+    @pytest.mark.parametrize("sheet", ["Missing", 3, 0])
+    def test_unknown_sheet(self, sample_excel_file: Path, sheet: str | int) -> None:
+        """测试选择不存在的工作表返回错误信息。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+            sheet: 不存在的工作表名称或序号
+        """
+        result = ExcelReader(sheet=sheet).read(str(sample_excel_file))
+
+        assert "Error reading Excel" in result
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"cell_range": "A1:B2", "start_row": 1},
+            {"start_row": 0},
+            {"start_row": 3, "end_row": 2},
+            {"max_rows": 0},
+            {"sheet": "Sheet1", "cell_range": "Sheet2!A1:B2"},
+        ],
+    )
+    def test_invalid_selection(self, options: dict) -> None:
+        """测试无效的选择选项抛出异常。
+
+        Args:
+            options: 选择选项
+        """
+        with pytest.raises(ValueError):
+            ExcelReader(**options)
+
+
+SHEET_XML_HEADER = (
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+
+
+@pytest.fixture
+def handmade_excel_file(tmp_path: Path) -> Path:
+    """手工拼装的 XLSX 文件，覆盖 openpyxl 不会写出的结构。
+
+    包含共享公式、内联字符串、富文本共享字符串、错误值、缺少 r 属性的
+    行与单元格、没有 dimension 的工作表、1904 日期系统以及日期样式。
+
+    Args:
+        tmp_path: pytest 临时目录
+
+    Returns:
+        Path: XLSX 文件路径
+    """
+    ns = "http://schemas.openxmlformats.org"
+    rel = f"{ns}/officeDocument/2006/relationships"
+    parts = {
+        "[Content_Types].xml": (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+            'content-types"><Default Extension="xml" ContentType="application/'
+            'xml"/><Default Extension="rels" ContentType="application/vnd.'
+            'openxmlformats-package.relationships+xml"/><Override PartName="/xl/'
+            'workbook.xml" ContentType="application/vnd.openxmlformats-'
+            'officedocument.spreadsheetml.sheet.main+xml"/><Override PartName="/'
+            'xl/worksheets/sheet1.xml" ContentType="application/vnd.openxml'
+            'formats-officedocument.spreadsheetml.worksheet+xml"/><Override '
+            'PartName="/xl/worksheets/sheet2.xml" ContentType="application/vnd.'
+            'openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/sharedStrings.xml" ContentType="application'
+            '/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"'
+            '/><Override PartName="/xl/styles.xml" ContentType="application/vnd.'
+            'openxmlformats-officedocument.spreadsheetml.styles+xml"/></Types>'
+        ),
+        "_rels/.rels": (
+            f'<Relationships xmlns="{ns}/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{rel}/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'
+        ),
+        "xl/workbook.xml": (
+            f'<workbook xmlns="{ns}/spreadsheetml/2006/main" xmlns:r="{rel}">'
+            '<workbookPr date1904="1"/><sheets>'
+            '<sheet name="Calc" sheetId="1" r:id="rId1"/>'
+            '<sheet name="Loose" sheetId="2" r:id="rId2"/></sheets></workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            f'<Relationships xmlns="{ns}/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{rel}/worksheet" '
+            'Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{rel}/worksheet" '
+            'Target="/xl/worksheets/sheet2.xml"/>'
+            f'<Relationship Id="rId3" Type="{rel}/sharedStrings" '
+            'Target="sharedStrings.xml"/>'
+            f'<Relationship Id="rId4" Type="{rel}/styles" '
+            'Target="styles.xml"/></Relationships>'
+        ),
+        "xl/sharedStrings.xml": (
+            f'<sst xmlns="{ns}/spreadsheetml/2006/main"><si><t>plain</t></si>'
+            "<si><r><t>rich </t></r><r><rPr><b/></rPr><t>text</t></r>"
+            '<rPh sb="0" eb="1"><t>ignored</t></rPh></si>'
+            "<si><t>a_x005F_x000D_b</t></si></sst>"
+        ),
+        "xl/styles.xml": (
+            f'<styleSheet xmlns="{ns}/spreadsheetml/2006/main"><numFmts>'
+            '<numFmt numFmtId="164" formatCode="[h]:mm"/></numFmts><cellXfs>'
+            '<xf numFmtId="0"/><xf numFmtId="14"/><xf numFmtId="164"/>'
+            "</cellXfs></styleSheet>"
+        ),
+        "xl/worksheets/sheet1.xml": (
+            f'{SHEET_XML_HEADER}<dimension ref="A1:D5"/><sheetData>'
+            '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c>'
+            '<c r="C1" t="s"><v>2</v></c></row>'
+            '<row r="2"><c r="A2"><v>1</v></c><c r="B2"><f t="shared" ref="B2:B4" '
+            'si="0">A2*2</f><v>2</v></c><c r="C2" t="b"><v>1</v></c>'
+            '<c r="D2" t="e"><v>#DIV/0!</v></c></row>'
+            '<row r="3"><c r="A3"><v>2.5</v></c><c r="B3"><f t="shared" si="0"/>'
+            '<v>5</v></c><c r="C3" t="inlineStr"><is><t>inline</t></is></c></row>'
+            '<row r="4"><c r="A4" s="1"><v>1</v></c><c r="B4"><f t="shared" si="0"/>'
+            '<v>2</v></c><c r="C4" s="2"><v>1.5</v></c>'
+            '<c r="D4" t="str"><f>"x"&amp;"y"</f><v>xy</v></c></row>'
+            '<row r="5"><c r="A5"><f t="array" ref="A5:A5">SUM(A2:A3)</f>'
+            '<v>3.5</v></c><c r="B5"><v>1E+3</v></c><c r="D5" t="str"><v>text</v></c>'
+            '</row><row r="9"><c r="A9"><v>9</v></c></row>'
+            "</sheetData></worksheet>"
+        ),
+        "xl/worksheets/sheet2.xml": (
+            f"{SHEET_XML_HEADER}<sheetData><row><c><v>1</v></c><c><v>2</v></c>"
+            '</row><row><c t="s"><v>0</v></c></row><row r="5"><c r="C5">'
+            "<v>3</v></c></row></sheetData></worksheet>"
+        ),
+    }
+    path = tmp_path / "handmade.xlsx"
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+    return path
+
+
+class TestExcelXmlEngine:
+    """ExcelReader 流式 XML 引擎测试类。"""
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {},
+            {"sheet": 2},
+            {"start_row": 2},
+            {"start_row": 3, "end_row": 4},
+            {"cell_range": "Calc!B2:C4"},
+            {"cell_range": "A:B"},
+            {"max_rows": 2},
+        ],
+    )
+    def test_matches_openpyxl(
+        self, sample_excel_file: Path, handmade_excel_file: Path, options: dict
+    ) -> None:
+        """测试 XML 引擎与 openpyxl 引擎输出完全一致。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+            handmade_excel_file: 手工拼装的 XLSX 文件路径
+            options: 选择选项
+        """
+        for path in (sample_excel_file, handmade_excel_file):
+            expected = ExcelReader(**options).read(str(path))
+            result = ExcelReader(engine="xml", **options).read(str(path))
+
+            assert result == expected
+
+    def test_cell_values(self, handmade_excel_file: Path) -> None:
+        """测试共享公式、富文本、日期与缺少坐标的单元格的转换结果。
+
+        Args:
+            handmade_excel_file: 手工拼装的 XLSX 文件路径
+        """
+        result = ExcelReader(engine="xml").read(str(handmade_excel_file))
+
+        assert result.split("\n") == [
+            "=== Sheet: Calc ===",
+            "plain\trich text\ta_x000D_b\t",
+            "1\t=A2*2\tTrue\t#DIV/0!",
+            "2.5\t=A3*2\tinline\t",
+            '1904-01-02 00:00:00\t=A4*2\t1 day, 12:00:00\t="x"&"y"',
+            "=SUM(A2:A3)\t1000.0\t\ttext",
+            "",
+            "=== Sheet: Loose ===",
+            "1\t2",
+            "plain",
+            "\t\t3",
+            "",
+        ]
+
+    def test_dimension_limits_rows(self, handmade_excel_file: Path) -> None:
+        """测试与 openpyxl 一样，dimension 之外的行不会被读取。
+
+        Args:
+            handmade_excel_file: 手工拼装的 XLSX 文件路径
+        """
+        result = ExcelReader(engine="xml", sheet="Calc").read(str(handmade_excel_file))
+
+        assert "9" not in result.splitlines()
+
+    def test_chunks_resume(self, sample_excel_file: Path) -> None:
+        """测试 XML 引擎的分块读取可以拼回完整文本。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+        """
+        reader = ExcelReader(engine="xml")
+        chunks = []
+        cursor = None
+        while True:
+            stream = reader.iter_chunks(str(sample_excel_file), cursor, 7)
+            chunk, cursor = next(stream)
+            stream.close()
+            chunks.append(chunk)
+            if cursor is None:
+                break
+
+        assert "".join(chunks) == reader.read(str(sample_excel_file))
+
+    def test_corrupted_file(self, fixtures_dir: Path) -> None:
+        """测试 XML 引擎读取损坏文件返回错误信息。
+
+        Args:
+            fixtures_dir: 测试 fixtures 目录
+        """
+        result = ExcelReader(engine="xml").read(str(fixtures_dir / "corrupted.xlsx"))
+
+        assert "Error reading Excel" in result
+
+    def test_unknown_engine(self) -> None:
+        """测试未知引擎名称抛出异常。"""
+        with pytest.raises(ValueError, match="Unknown Excel engine"):
+            ExcelReader(engine="pandas")
+
+
+class TestChunkedReading:
+    """iter_blocks / iter_chunks 分块读取测试类。"""
+
+    @pytest.mark.parametrize(
+        "filename,reader_class",
+        [
+            ("sample.docx", DocxReader),
+            ("multipage.pdf", PdfReader),
+            ("sample.txt", TxtReader),
+            ("sample_gbk.txt", TxtReader),
+            ("sample.xlsx", ExcelReader),
+        ],
+    )
+    @pytest.mark.parametrize("max_chars", [1, 4, 17, 100000])
+    def test_chunks_reassemble_full_text(
+        self,
+        fixtures_dir: Path,
+        filename: str,
+        reader_class: type[DocumentReader],
+        max_chars: int,
+    ) -> None:
+        """测试逐块续读拼接后与完整读取结果一致。
+
+        Args:
+            fixtures_dir: fixtures 目录路径
+            filename: 文档文件名
+            reader_class: Reader 类型
+            max_chars: 每块最大字符数
+        """
+        file_path = str(fixtures_dir / filename)
+        reader = reader_class()
+        parts = []
+        cursor = None
+        while True:
+            # 每次都从游标重新开始，模拟多次独立的工具调用
+            chunks = reader.iter_chunks(file_path, cursor, max_chars)
+            text, cursor = next(chunks)
+            chunks.close()
+            assert len(text) <= max_chars
+            parts.append(text)
+            if cursor is None:
+                break
+
+        assert "".join(parts) == reader.read(file_path)
+
+    @pytest.mark.parametrize("max_bytes", [1, 4, 7, 100])
+    def test_iter_chunks_max_bytes(self, sample_txt_file: Path, max_bytes: int) -> None:
+        """测试按字节预算分块：不拆分多字节字符，且总能向前推进。
+
+        Args:
+            sample_txt_file: 示例 TXT 文件路径
+            max_bytes: 每块最大字节数
+        """
+        reader = TxtReader()
+        chunks = list(reader.iter_chunks(str(sample_txt_file), None, 10_000, max_bytes))
+
+        assert "".join(text for text, _ in chunks) == reader.read(str(sample_txt_file))
+        for text, _ in chunks:
+            assert len(text.encode("utf-8")) <= max(max_bytes, 3)
+
+    def test_remaining_unknown_by_default(self, sample_docx_file: Path) -> None:
+        """测试默认无法估计剩余内容时返回 None。
+
+        Args:
+            sample_docx_file: 示例 DOCX 文件路径
+        """
+        reader = DocxReader()
+        _, cursor = next(reader.iter_chunks(str(sample_docx_file), None, 3))
+
+        assert cursor is not None
+        assert reader.remaining(str(sample_docx_file), cursor) is None
+
+    def test_iter_chunks_in_one_pass(self, multipage_pdf_file: Path) -> None:
+        """测试单次迭代产生全部分块，最后一块的游标为 None。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        chunks = list(PdfReader().iter_chunks(str(multipage_pdf_file), max_chars=20))
+
+        assert "".join(text for text, _ in chunks) == PdfReader().read(
+            str(multipage_pdf_file)
+        )
+        assert chunks[-1][1] is None
+        assert all(cursor is not None for _, cursor in chunks[:-1])
+
+    def test_pdf_resume_skips_earlier_pages(self, multipage_pdf_file: Path) -> None:
+        """测试 PDF 从游标续读时不再提取之前的页面。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        reader = PdfReader()
+
+        blocks = list(reader.iter_blocks(str(multipage_pdf_file), start=3))
+
+        assert blocks == [(3, "Page 4 content."), (4, "Page 5 content.")]
+
+    def test_pdf_resume_outside_selection(self, multipage_pdf_file: Path) -> None:
+        """测试续读位置不在页码选择内时抛出异常。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        reader = PdfReader(pages=[1, 2])
+
+        with pytest.raises(ValueError):
+            list(reader.iter_blocks(str(multipage_pdf_file), start=4))
+
+    def test_excel_blocks_have_sheet_positions(self, sample_excel_file: Path) -> None:
+        """测试 Excel 分块位置为 [工作表, 行号]。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+        """
+        blocks = list(ExcelReader().iter_blocks(str(sample_excel_file), start=[1, 2]))
+
+        assert blocks[0] == ([1, 2], "苹果\t5.5")
+        assert blocks[-1] == ([1, -1], "")
+
+    def test_default_iter_blocks_uses_read(self) -> None:
+        """测试未覆盖 iter_blocks 的 Reader 以 read 结果作为单个分块。"""
+
+        class CompleteReader(DocumentReader):
+            """仅实现 read 的 Reader。"""
+
+            def read(self, file_path: str) -> str:  # noqa: ARG002
+                """读取文件内容。"""
+                return "abcdef"
+
+        chunks = list(CompleteReader().iter_chunks("test.txt", max_chars=4))
+
+        assert chunks[0][0] == "abcd"
+        assert chunks[1] == ("ef", None)
+
+    def test_invalid_max_chars(self, sample_txt_file: Path) -> None:
+        """测试 max_chars 小于 1 时抛出异常。
+
+        Args:
+            sample_txt_file: 示例 TXT 文件路径
+        """
+        with pytest.raises(ValueError):
+            next(TxtReader().iter_chunks(str(sample_txt_file), max_chars=0))
+
+    def test_cursor_round_trip(self) -> None:
+        """测试游标编码与解码互为逆运算。"""
+        cursor = encode_cursor(["t", 1, 2], 5, True)
+
+        assert decode_cursor(cursor) == (["t", 1, 2], 5, True)
+
+    @pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor(0, -1, False)])
+    def test_invalid_cursor(self, cursor: str) -> None:
+        """测试无效游标抛出异常。
+
+        Args:
+            cursor: 无效的游标
+        """
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestInspect:
+    """各 Reader 的 inspect 元数据检查测试类。"""
+
+    def test_default_reports_nothing(self) -> None:
+        """测试未覆盖 inspect 的 Reader 返回空字典。"""
+
+        class PlainReader(DocumentReader):
+            """仅实现 read 的 Reader。"""
+
+            def read(self, file_path: str) -> str:  # noqa: ARG002
+                """读取文件内容。"""
+                return ""
+
+        assert PlainReader().inspect("test.txt") == {}
+
+    def test_pdf_pages_and_outline(self, tmp_path: Path) -> None:
+        """测试 PDF 返回页数以及扁平化后的书签层级和页码。
+
+        Args:
+            tmp_path: pytest 临时目录
+        """
+        from pypdf import PdfWriter
+
+        writer = PdfWriter()
+        for _ in range(3):
+            writer.add_blank_page(width=200, height=200)
+        chapter = writer.add_outline_item("Chapter 1", 0)
+        writer.add_outline_item("Section 1.1", 2, parent=chapter)
+        writer.add_outline_item("Chapter 2", 1)
+        path = tmp_path / "outline.pdf"
+        with open(path, "wb") as f:
+            writer.write(f)
+
+        info = PdfReader().inspect(str(path))
+
+        assert info["pages"] == 3
+        assert info["encrypted"] is False
+        assert info["outline"] == [
+            {"title": "Chapter 1", "page": 1, "level": 0},
+            {"title": "Section 1.1", "page": 3, "level": 1},
+            {"title": "Chapter 2", "page": 2, "level": 0},
+        ]
+
+    def test_pdf_without_outline(self, multipage_pdf_file: Path) -> None:
+        """测试没有书签的 PDF 返回空列表。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        info = PdfReader().inspect(str(multipage_pdf_file))
+
+        assert info == {"pages": 5, "encrypted": False, "outline": []}
+
+    def test_pdf_inspect_skips_content(self, multipage_pdf_file: Path) -> None:
+        """测试检查 PDF 时不提取任何页面文本。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        from pypdf import PageObject
+
+        with mock.patch.object(PageObject, "extract_text") as extract:
+            PdfReader().inspect(str(multipage_pdf_file))
+
+        extract.assert_not_called()
+
+    @pytest.mark.parametrize("scan_bytes", [7, 64, 1024 * 1024])
+    def test_docx_counts_match_tree(
+        self, handmade_docx_file: Path, ordered_docx_file: Path, scan_bytes: int
+    ) -> None:
+        """测试字节扫描得到的段落和表格数与解析 XML 的结果一致。
+
+        包括嵌套表格、文本框和空段落，并在不同的读取块大小下验证跨块的标签。
+
+        Args:
+            handmade_docx_file: 手工拼装的 DOCX 文件路径
+            ordered_docx_file: 段落与表格交替的 DOCX 文件路径
+            scan_bytes: 每次读取的字节数
+        """
+        from xml.etree import ElementTree
+
+        word = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+        for path in (handmade_docx_file, ordered_docx_file):
+            with zipfile.ZipFile(path) as archive:
+                name = next(n for n in archive.namelist() if n.startswith("word/"))
+                root = ElementTree.fromstring(archive.read(name))
+            with mock.patch.object(DocxReader, "scan_bytes", scan_bytes):
+                info = DocxReader().inspect(str(path))
+
+            assert info["paragraphs"] == len(list(root.iter(f"{word}p")))
+            assert info["tables"] == len(list(root.iter(f"{word}tbl")))
+
+    def test_docx_default_namespace(self, tmp_path: Path) -> None:
+        """测试使用默认命名空间（无前缀）的文档也能正确计数。
+
+        Args:
+            tmp_path: pytest 临时目录
+        """
+        path = tmp_path / "plain.docx"
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr(
+                "word/document.xml",
+                '<document xmlns="http://schemas.openxmlformats.org/'
+                'wordprocessingml/2006/main"><body><p/><pPr/><tbl><tr><tc><p/>'
+                "</tc></tr></tbl><p><r><t>x</t></r></p></body></document>",
+            )
+
+        info = DocxReader().inspect(str(path))
+
+        assert info == {"xml_bytes": info["xml_bytes"], "paragraphs": 3, "tables": 1}
+
+    def test_docx_app_statistics(self, sample_docx_file: Path) -> None:
+        """测试读取 docProps/app.xml 中保存的文档统计信息。
+
+        Args:
+            sample_docx_file: 示例 DOCX 文件路径
+        """
+        info = DocxReader().inspect(str(sample_docx_file))
+
+        assert info["pages"] >= 1
+        assert {"words", "characters", "xml_bytes"} <= info.keys()
+
+    def test_excel_sheets_and_dimensions(self, sample_excel_file: Path) -> None:
+        """测试返回工作表名称及其声明的使用范围。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+        """
+        info = ExcelReader().inspect(str(sample_excel_file))
+        sheets = [
+            {key: sheet[key] for key in ("name", "dimension", "rows", "columns")}
+            for sheet in info["sheets"]
+        ]
+
+        assert sheets == [
+            {"name": "Sheet1", "dimension": "A1:C3", "rows": 3, "columns": 3},
+            {"name": "Sheet2", "dimension": "A1:B3", "rows": 3, "columns": 2},
+        ]
+        assert all(sheet["xml_bytes"] > 0 for sheet in info["sheets"])
+
+    def test_excel_skips_cells(self, handmade_excel_file: Path) -> None:
+        """测试没有 dimension 的工作表返回 None，且不加载共享字符串和样式。
+
+        Args:
+            handmade_excel_file: 手工拼装的 XLSX 文件路径
+        """
+        from mcp_documents_reader import _XlsxStream
+
+        with (
+            mock.patch.object(
+                _XlsxStream, "shared_strings", new_callable=mock.PropertyMock
+            ) as strings,
+            mock.patch.object(
+                _XlsxStream, "_styles", new_callable=mock.PropertyMock
+            ) as styles,
+        ):
+            info = ExcelReader(engine="xml").inspect(str(handmade_excel_file))
+
+        assert info["sheets"][0]["dimension"] == "A1:D5"
+        assert (info["sheets"][0]["rows"], info["sheets"][0]["columns"]) == (5, 4)
+        assert info["sheets"][1]["dimension"] is None
+        assert info["sheets"][1]["rows"] is None
+        strings.assert_not_called()
+        styles.assert_not_called()
+
+    def test_txt_exact_for_small_files(self, sample_txt_gbk_file: Path) -> None:
+        """测试小文件的行数为精确值。
+
+        Args:
+            sample_txt_gbk_file: GBK 编码的示例文件路径
+        """
+        info = TxtReader().inspect(str(sample_txt_gbk_file))
+
+        assert info == {"encoding": "gbk", "lines": 2}
+
+    def test_txt_estimate_for_large_files(self, temp_document_dir: str) -> None:
+        """测试大文件的行数由分布在全文的采样估算，误差很小。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        path = Path(temp_document_dir) / "large.txt"
+        path.write_bytes(
+            b"".join(b"line %d of the file\n" % number for number in range(100000))
+        )
+
+        info = TxtReader().inspect(str(path))
+
+        assert info["encoding"] == "utf-8"
+        assert info["lines_estimated"] is True
+        assert abs(info["lines"] - 100000) < 2000
+
+    def test_txt_exact_with_line_index(self, temp_document_dir: str) -> None:
+        """测试已有行索引时直接返回精确行数。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        path = Path(temp_document_dir) / "indexed.txt"
+        path.write_bytes(b"x" * 100 + b"\n" + b"".join([b"a\n"] * 70000) + b"end")
+        TxtReader(start_line=2, end_line=2).read(str(path))
+
+        info = TxtReader().inspect(str(path))
+
+        assert info == {"encoding": "utf-8", "encoding_estimated": True, "lines": 70002}
+
+    def test_txt_encoding_from_later_samples(self, temp_document_dir: str) -> None:
+        """测试开头采样全为 ASCII 时，编码由之后含非 ASCII 字节的采样确定。
+
+        Args:
+            temp_document_dir: 临时目录路径
+        """
+        path = Path(temp_document_dir) / "log.txt"
+        path.write_bytes(
+            b"".join(b"ascii log line %06d, padded out\n" % n for n in range(4000))
+            + "中文日志内容\n".encode("gbk") * 4000
+        )
+
+        info = TxtReader().inspect(str(path))
+
+        assert info["encoding"] == "gbk"
+        assert "encoding_estimated" not in info
+
+
+class TestSearch:
+    """DocumentReader.search 流式搜索测试类。"""
+
+    @staticmethod
+    def _search(reader: DocumentReader, path: Path, pattern: str, **kwargs: Any):
+        """以忽略大小写的字面量模式搜索文件，返回全部匹配。"""
+        compiled = re.compile(re.escape(pattern), re.IGNORECASE)
+        return list(reader.search(str(path), compiled, **kwargs))
+
+    @pytest.mark.parametrize("block_chars", [3, 7, 64 * 1024])
+    def test_matches_span_blocks(
+        self, temp_document_dir: str, block_chars: int
+    ) -> None:
+        """测试跨越分块边界的匹配与整文搜索结果一致。
+
+        Args:
+            temp_document_dir: 临时目录路径
+            block_chars: 每个分块的字符数
+        """
+        path = Path(temp_document_dir) / "spans.txt"
+        content = "".join(f"row {n}: needle{n % 3}\n" for n in range(50))
+        path.write_text(content, encoding="utf-8")
+        pattern = re.compile(r"needle\d")
+
+        with (
+            mock.patch.object(TxtReader, "block_chars", block_chars),
+            mock.patch.object(TxtReader, "search_window", 16),
+        ):
+            found = list(TxtReader().search(str(path), pattern, context_chars=4))
+
+        expected = list(pattern.finditer(content))
+        assert [m["match"] for m in found] == [m.group() for m in expected]
+        assert [m["line"] for m in found] == list(range(1, 51))
+        assert found[10]["context"] == content[expected[10].start() - 4 :][:15]
+
+    def test_closing_stops_extraction(self, multipage_pdf_file: Path) -> None:
+        """测试关闭生成器后不再提取后续页面。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        from pypdf import PageObject
+
+        reader = PdfReader()
+        original = PageObject.extract_text
+        with (
+            mock.patch.object(PdfReader, "search_window", 8),
+            mock.patch.object(
+                PageObject, "extract_text", autospec=True, side_effect=original
+            ) as extract,
+        ):
+            found = reader.search(str(multipage_pdf_file), re.compile("content"), 0)
+            first = next(found)
+            found.close()
+
+        assert first["page"] == 1
+        assert extract.call_count == 2
+
+    def test_pdf_location(self, multipage_pdf_file: Path) -> None:
+        """测试 PDF 匹配报告页码和提取文本中的行号。
+
+        Args:
+            multipage_pdf_file: 多页 PDF 文件路径
+        """
+        found = self._search(PdfReader(), multipage_pdf_file, "page 4")
+
+        assert [(m["page"], m["line"]) for m in found] == [(4, 7)]
+
+    @pytest.mark.parametrize("engine", ExcelReader.engines)
+    def test_excel_location(self, sample_excel_file: Path, engine: str) -> None:
+        """测试 Excel 匹配报告工作表、行号和单元格。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+            engine: 解析引擎
+        """
+        found = self._search(ExcelReader(engine=engine), sample_excel_file, "上海")
+        header = self._search(ExcelReader(engine=engine), sample_excel_file, "Sheet2")
+
+        assert [(m["sheet"], m["row"], m["cell"]) for m in found] == [
+            ("Sheet1", 3, "C3")
+        ]
+        assert header == [
+            {"match": "Sheet2", "context": mock.ANY, "line": 6, "sheet": "Sheet2"}
+        ]
+
+    def test_excel_cell_in_range(self, sample_excel_file: Path) -> None:
+        """测试按单元格范围读取时，单元格列号从范围的起始列计算。
+
+        Args:
+            sample_excel_file: 示例 Excel 文件路径
+        """
+        reader = ExcelReader(cell_range="Sheet1!B2:C3")
+
+        found = self._search(reader, sample_excel_file, "上海")
+
+        assert found[0]["cell"] == "C3"
+
+    def test_docx_location(self, ordered_docx_file: Path) -> None:
+        """测试 DOCX 两个引擎分别以段落、表格和行定位匹配。
+
+        Args:
+            ordered_docx_file: 段落与表格交替的 DOCX 文件路径
+        """
+        default = self._search(DocxReader(), ordered_docx_file, "r2c1")
+        streamed = self._search(DocxReader(engine="xml"), ordered_docx_file, "r2c1")
+        after = self._search(DocxReader(engine="xml"), ordered_docx_file, "After")
+
+        assert (default[0]["table"], default[0]["row"]) == (0, 3)
+        assert (streamed[0]["block"], streamed[0]["row"]) == (1, 3)
+        assert after[0]["block"] == 2 and "row" not in after[0]
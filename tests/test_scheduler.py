@@ -0,0 +1,335 @@
+"""FairScheduler 公平调度测试。
+
+测试内容：
+- 按文件大小和类型估计提取成本
+- 按成本划分大小类别
+- 小请求不被排队中的大文档阻塞
+- 同一大小类别内按客户端公平调度
+- 每个大小类别的并发上限，并为小请求保留一个工作线程
+- 取消、异常、关闭与执行器接口
+- MCP 工具调用按成本和客户端排队
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Generator
+from unittest import mock
+
+import pytest
+
+from mcp_documents_reader import (
+    DIRECTORY_COST,
+    DocumentReaderFactory,
+    FairScheduler,
+    _call_cost,
+    _client_id,
+    configure_executor,
+    get_server_stats,
+    mcp,
+    run_blocking,
+)
+
+
+@pytest.fixture
+def scheduler() -> Generator[FairScheduler, None, None]:
+    """单工作线程的公平调度器。
+
+    Yields:
+        FairScheduler: 调度器
+    """
+    fair = FairScheduler(1)
+    yield fair
+    fair.shutdown(cancel_futures=True)
+
+
+def blocker(scheduler: FairScheduler) -> threading.Event:
+    """提交一个阻塞唯一工作线程的调用，等到它开始运行。
+
+    Args:
+        scheduler: 调度器
+
+    Returns:
+        threading.Event: 设置后释放工作线程
+    """
+    started = threading.Event()
+    release = threading.Event()
+
+    def block() -> None:
+        started.set()
+        release.wait(10)
+
+    scheduler.schedule(block)
+    started.wait(10)
+    return release
+
+
+def recorder(order: list[str], name: str) -> Callable[[], str]:
+    """返回一个记录执行顺序的调用。
+
+    Args:
+        order: 执行顺序
+        name: 调用名称
+
+    Returns:
+        Callable[[], str]: 调用
+    """
+
+    def call() -> str:
+        order.append(name)
+        return name
+
+    return call
+
+
+class TestEstimateCost:
+    """成本估计测试类。"""
+
+    def test_weighted_by_reader(self, temp_document_dir: str) -> None:
+        """测试成本为文件大小乘以读取器的成本系数。"""
+        txt = Path(temp_document_dir) / "a.txt"
+        pdf = Path(temp_document_dir) / "a.pdf"
+        txt.write_bytes(b"x" * 1000)
+        pdf.write_bytes(b"x" * 1000)
+
+        assert DocumentReaderFactory.estimate_cost(str(txt)) == 1000
+        assert DocumentReaderFactory.estimate_cost(str(pdf)) == 4000
+
+    def test_missing_and_unsupported_files(self, temp_document_dir: str) -> None:
+        """测试不存在或不支持的文件成本为 0。"""
+        other = Path(temp_document_dir) / "a.bin"
+        other.write_bytes(b"x" * 1000)
+
+        assert DocumentReaderFactory.estimate_cost(str(other)) == 0
+        assert DocumentReaderFactory.estimate_cost("missing.pdf") == 0
+
+    def test_call_cost(self, sample_txt_file: Path) -> None:
+        """测试工具调用的成本来自其参数中的文档。"""
+        size = sample_txt_file.stat().st_size
+
+        assert _call_cost({"filename": str(sample_txt_file)}) == size
+        assert _call_cost({"filenames": [str(sample_txt_file)] * 2}) == 2 * size
+        assert _call_cost({"directory": "."}) == DIRECTORY_COST
+        assert _call_cost({"prometheus": True}) == 0
+
+
+class TestClientId:
+    """客户端标识测试类。"""
+
+    def test_outside_request(self) -> None:
+        """测试请求之外没有客户端标识。"""
+        assert _client_id() is None
+
+    def test_from_request_meta(self) -> None:
+        """测试优先使用请求元数据中的 client_id，否则使用会话。"""
+        context = mock.MagicMock()
+        context.request_context.meta.client_id = "agent-7"
+        with mock.patch.object(mcp, "get_context", return_value=context):
+            assert _client_id() == "agent-7"
+
+        context.request_context.meta = None
+        with mock.patch.object(mcp, "get_context", return_value=context):
+            assert _client_id() == f"session-{id(context.request_context.session):x}"
+
+
+class TestFairScheduler:
+    """FairScheduler 调度测试类。"""
+
+    def test_size_classes(self, scheduler: FairScheduler) -> None:
+        """测试按成本划分大小类别。"""
+        assert scheduler.size_class(0) == "small"
+        assert scheduler.size_class(2 << 20) == "medium"
+        assert scheduler.size_class(1 << 30) == "large"
+
+    def test_small_call_overtakes_queued_large_calls(
+        self, scheduler: FairScheduler
+    ) -> None:
+        """测试小请求排在已排队的大文档之前执行。"""
+        order: list[str] = []
+        release = blocker(scheduler)
+        large = [
+            scheduler.schedule(recorder(order, f"large-{i}"), 1 << 30, "a")
+            for i in range(3)
+        ]
+        small = scheduler.schedule(recorder(order, "small"), 1000, "b")
+
+        release.set()
+        small.result(10)
+        for future in large:
+            future.result(10)
+
+        assert order[:2] == ["large-0", "small"]
+
+    def test_clients_share_a_size_class(self, scheduler: FairScheduler) -> None:
+        """测试同一类别中积压多的客户端不会阻塞其他客户端。"""
+        order: list[str] = []
+        release = blocker(scheduler)
+        futures = [
+            scheduler.schedule(recorder(order, f"a-{i}"), 1000, "a") for i in range(5)
+        ]
+        futures.append(scheduler.schedule(recorder(order, "b-0"), 1000, "b"))
+
+        release.set()
+        for future in futures:
+            future.result(10)
+
+        assert order.index("b-0") == 1
+
+    def test_class_limits(self) -> None:
+        """测试同时运行的大文档调用数不超过其类别上限。"""
+        fair = FairScheduler(2, class_limits={"large": 1})
+        release = threading.Event()
+        try:
+            futures = [
+                fair.schedule(lambda: release.wait(10), 1 << 30, "a") for _ in range(2)
+            ]
+            small = fair.schedule(lambda: "small", 10, "b")
+
+            assert small.result(10) == "small"
+            assert fair.stats()["running"]["large"] == 1
+            assert fair.stats()["queued"]["large"] == 1
+            release.set()
+            for future in futures:
+                future.result(10)
+        finally:
+            release.set()
+            fair.shutdown()
+
+    def test_worker_reserved_for_small_calls(self) -> None:
+        """测试中等和大文档调用占满其上限时仍为小请求留出一个工作线程。"""
+        fair = FairScheduler(3)
+        release = threading.Event()
+        try:
+            futures = [
+                fair.schedule(lambda: release.wait(10), cost, "a")
+                for cost in (2 << 20, 2 << 20, 1 << 30, 1 << 30)
+            ]
+            small = fair.schedule(lambda: "small", 10, "b")
+
+            assert small.result(10) == "small"
+            running = fair.stats()["running"]
+            assert running["medium"] + running["large"] == 2
+            release.set()
+            for future in futures:
+                future.result(10)
+        finally:
+            release.set()
+            fair.shutdown()
+
+    def test_cancelled_calls_are_skipped(self, scheduler: FairScheduler) -> None:
+        """测试排队中被取消的调用不会执行。"""
+        order: list[str] = []
+        release = blocker(scheduler)
+        cancelled = scheduler.schedule(recorder(order, "cancelled"))
+        kept = scheduler.schedule(recorder(order, "kept"))
+
+        assert cancelled.cancel()
+        release.set()
+
+        assert kept.result(10) == "kept"
+        assert order == ["kept"]
+
+    def test_exceptions_are_set_on_future(self, scheduler: FairScheduler) -> None:
+        """测试调用抛出的异常设置到 Future 上。"""
+        future = scheduler.submit(int, "x")
+
+        with pytest.raises(ValueError):
+            future.result(10)
+
+    def test_shutdown(self) -> None:
+        """测试关闭时取消排队的调用，关闭后拒绝新调用。"""
+        fair = FairScheduler(1)
+        release = blocker(fair)
+        queued = fair.schedule(lambda: None)
+
+        fair.shutdown(wait=False, cancel_futures=True)
+        release.set()
+
+        assert queued.cancelled()
+        with pytest.raises(RuntimeError, match="shutdown"):
+            fair.submit(int)
+
+    def test_stale_tags_are_forgotten(self, scheduler: FairScheduler) -> None:
+        """测试落后于虚拟时间的流标签在流很多时被清理。"""
+        release = blocker(scheduler)
+        futures = [scheduler.schedule(int, 0, f"client-{i}") for i in range(1100)]
+        futures += [scheduler.schedule(int, 10, "x") for _ in range(2)]
+
+        release.set()
+        for future in futures:
+            future.result(10)
+
+        assert len(scheduler._tags) <= 2
+
+    def test_stats(self, scheduler: FairScheduler) -> None:
+        """测试统计正在运行和排队的调用。"""
+        release = blocker(scheduler)
+        scheduler.schedule(int, 2 << 20, "a")
+
+        stats = scheduler.stats()
+        release.set()
+
+        assert stats == {
+            "workers": 1,
+            "running": {"small": 1, "medium": 0, "large": 0},
+            "queued": {"small": 0, "medium": 1, "large": 0},
+            "flows": 1,
+        }
+
+
+class TestFairExecutor:
+    """作为共享执行器使用的测试类。"""
+
+    @pytest.fixture(autouse=True)
+    def fair_executor(self) -> Generator[None, None, None]:
+        """切换为公平调度执行器，测试结束后恢复默认的线程执行器。"""
+        configure_executor(max_workers=2, kind="fair")
+        yield
+        configure_executor()
+
+    async def test_run_blocking(self) -> None:
+        """测试 run_blocking 在公平调度器上运行。"""
+        assert await run_blocking(sum, [1, 2]) == 3
+
+    async def test_tool_calls_are_scheduled(self, sample_txt_file: Path) -> None:
+        """测试 MCP 工具调用按估计成本提交给调度器。"""
+        from mcp_documents_reader import get_executor
+
+        executor = get_executor()
+        assert isinstance(executor, FairScheduler)
+
+        with mock.patch.object(
+            executor, "schedule", wraps=executor.schedule
+        ) as schedule:
+            result = await mcp.call_tool(
+                "read_document", {"filename": str(sample_txt_file)}
+            )
+
+        assert "测试文本文件" in str(result)
+        assert schedule.call_args.args[1:] == (sample_txt_file.stat().st_size, None)
+
+    def test_server_stats_include_scheduler(self) -> None:
+        """测试使用公平调度器时 get_server_stats 返回其统计。"""
+        stats = get_server_stats()
+
+        assert isinstance(stats, dict)
+        assert stats["scheduler"]["workers"] == 2
+
+    async def test_small_reads_are_not_starved(self) -> None:
+        """测试大文档占满队列时小请求仍能很快开始。"""
+        from mcp_documents_reader import get_executor
+
+        executor = get_executor()
+        assert isinstance(executor, FairScheduler)
+        release = threading.Event()
+        large = [
+            executor.schedule(lambda: release.wait(10), 1 << 30, "a") for _ in range(8)
+        ]
+        started = time.monotonic()
+
+        small = executor.schedule(time.monotonic, 1000, "b")
+
+        assert small.result(10) - started < 1
+        release.set()
+        for future in large:
+            future.result(10)
@@ -0,0 +1,240 @@
+"""HTTP 服务模式测试。
+
+测试内容：
+- AdmissionControl 限制同时进行的调用数并拒绝多余的调用
+- 队列已满时工具调用的 HTTP 请求返回 429，通知等其他消息照常转发
+- MCP 工具调用受准入限制
+- main 命令行参数：stdio、streamable-http 与 sse 传输
+"""
+
+from pathlib import Path
+from typing import Callable, Generator
+from unittest import mock
+
+import httpx
+import pytest
+
+import mcp_documents_reader
+from mcp_documents_reader import (
+    AdmissionControl,
+    FairScheduler,
+    ServerBusy,
+    configure_executor,
+    get_executor,
+    get_server_stats,
+    main,
+    mcp,
+    metrics,
+)
+
+
+async def hello(_scope: dict, _receive: Callable, send: Callable) -> None:
+    """返回 200 的 ASGI 应用。
+
+    Args:
+        _scope: ASGI scope
+        _receive: ASGI receive
+        send: ASGI send
+    """
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def echo(_scope: dict, receive: Callable, send: Callable) -> None:
+    """返回请求体的 ASGI 应用。
+
+    Args:
+        _scope: ASGI scope
+        receive: ASGI receive
+        send: ASGI send
+    """
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+@pytest.fixture(autouse=True)
+def restore_server() -> Generator[None, None, None]:
+    """测试结束后恢复准入限制、服务器设置和执行器。
+
+    Yields:
+        None
+    """
+    settings = mcp.settings.model_copy()
+    yield
+    mcp_documents_reader.admission = None
+    for name in ("host", "port", "transport_security"):
+        setattr(mcp.settings, name, getattr(settings, name))
+    configure_executor()
+
+
+class TestAdmissionControl:
+    """AdmissionControl 测试类。"""
+
+    def test_rejects_beyond_bound(self) -> None:
+        """测试达到上限后拒绝调用，释放后重新接受。"""
+        limit = AdmissionControl(2)
+        limit.acquire()
+        limit.acquire()
+
+        assert limit.full()
+        with pytest.raises(ServerBusy, match="2 calls in flight"):
+            limit.acquire()
+
+        limit.release()
+        limit.acquire()
+        assert limit.stats() == {"max_in_flight": 2, "in_flight": 2, "rejected": 1}
+
+    async def test_middleware_returns_429_when_full(self) -> None:
+        """测试队列已满时工具调用返回 429 和 Retry-After，GET 请求不受影响。"""
+        limit = AdmissionControl(1, retry_after_s=5)
+        transport = httpx.ASGITransport(app=limit.middleware(hello))
+        call = {"jsonrpc": "2.0", "id": 7, "method": "tools/call", "params": {}}
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            assert (await client.post("/mcp", json=call)).status_code == 200
+
+            limit.acquire()
+            rejected = await client.post("/mcp", json=call)
+            batch = await client.post("/mcp", json=[call, {**call, "id": 8}])
+            stream = await client.get("/mcp")
+
+        assert rejected.status_code == 429
+        assert rejected.headers["retry-after"] == "5"
+        assert rejected.json()["id"] == 7
+        assert rejected.json()["error"]["message"] == "Server busy; retry later"
+        assert batch.status_code == 429
+        assert batch.json()["id"] is None
+        assert stream.status_code == 200
+        assert limit.stats()["rejected"] == 2
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            b'{"jsonrpc": "2.0", "method": "notifications/cancelled",'
+            b' "params": {"requestId": 7}}',
+            b'{"jsonrpc": "2.0", "id": 1, "result": {}}',
+            b'{"jsonrpc": "2.0", "id": 2, "method": "initialize", "params": {}}',
+            b"not json",
+        ],
+    )
+    async def test_middleware_passes_other_messages(self, body: bytes) -> None:
+        """测试队列已满时通知、响应等其他消息照常转发，请求体保持不变。"""
+        limit = AdmissionControl(1)
+        limit.acquire()
+        transport = httpx.ASGITransport(app=limit.middleware(echo))
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.post("/mcp", content=body)
+
+        assert response.status_code == 200
+        assert response.content == body
+        assert limit.stats()["rejected"] == 0
+
+
+class TestToolAdmission:
+    """MCP 工具调用准入测试类。"""
+
+    async def test_busy_server_rejects_calls(self, sample_txt_file: Path) -> None:
+        """测试达到上限时工具调用被拒绝并记录错误类型。"""
+        metrics.reset()
+        mcp_documents_reader.admission = AdmissionControl(1)
+        result = await mcp.call_tool(
+            "read_document", {"filename": str(sample_txt_file)}
+        )
+        assert "测试文本文件" in str(result)
+        assert mcp_documents_reader.admission.stats()["in_flight"] == 0
+
+        mcp_documents_reader.admission.acquire()
+        with pytest.raises(Exception, match="Server busy"):
+            await mcp.call_tool("read_document", {"filename": str(sample_txt_file)})
+
+        stats = metrics.snapshot()["tools"]["read_document"]
+        assert stats["errors_by_type"] == {"ServerBusy": 1}
+        metrics.reset()
+
+    def test_server_stats_include_admission(self) -> None:
+        """测试通过 HTTP 服务时 get_server_stats 返回准入统计。"""
+        mcp_documents_reader.admission = AdmissionControl(4)
+
+        stats = get_server_stats()
+
+        assert isinstance(stats, dict)
+        assert stats["admission"]["max_in_flight"] == 4
+
+
+class TestMain:
+    """main 命令行测试类。"""
+
+    def test_stdio(self) -> None:
+        """测试默认通过 stdio 提供服务，不启用准入限制。"""
+        with mock.patch.object(mcp, "run") as run:
+            main([])
+
+        run.assert_called_once_with()
+        assert mcp_documents_reader.admission is None
+
+    def test_stdio_max_concurrency(self) -> None:
+        """测试 stdio 模式下 --max-concurrency 配置执行器。"""
+        with mock.patch.object(mcp, "run"):
+            main(["--max-concurrency", "3"])
+
+        assert get_executor()._max_workers == 3  # type: ignore[attr-defined]
+
+    def test_streamable_http(self) -> None:
+        """测试 HTTP 模式共享公平调度执行器，并按并发数加队列长度限制调用。"""
+        with mock.patch("uvicorn.run") as run:
+            main(
+                [
+                    "--transport",
+                    "streamable-http",
+                    "--port",
+                    "9000",
+                    "--max-concurrency",
+                    "4",
+                    "--max-queue",
+                    "8",
+                ]
+            )
+
+        assert run.call_args.kwargs["host"] == "127.0.0.1"
+        assert run.call_args.kwargs["port"] == 9000
+        assert isinstance(get_executor(), FairScheduler)
+        assert mcp_documents_reader.admission is not None
+        assert mcp_documents_reader.admission.max_in_flight == 12
+        assert mcp.settings.transport_security is not None
+
+    def test_sse_on_all_interfaces(self) -> None:
+        """测试 SSE 传输，监听非回环地址时关闭 DNS 重绑定保护。"""
+        with (
+            mock.patch.object(mcp, "sse_app", wraps=mcp.sse_app) as sse_app,
+            mock.patch("uvicorn.run") as run,
+        ):
+            main(["--transport", "sse", "--host", "0.0.0.0"])
+
+        sse_app.assert_called_once_with()
+        assert run.call_args.kwargs["host"] == "0.0.0.0"
+        assert mcp.settings.transport_security is None
+
+    def test_environment_defaults(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """测试从环境变量读取传输方式、端口和队列长度。"""
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_TRANSPORT", "streamable-http")
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_PORT", "9100")
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_MAX_WORKERS", "2")
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_MAX_QUEUE", "0")
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_EXECUTOR", "thread")
+
+        with mock.patch("uvicorn.run") as run:
+            main([])
+
+        assert run.call_args.kwargs["port"] == 9100
+        assert not isinstance(get_executor(), FairScheduler)
+        assert mcp_documents_reader.admission is not None
+        assert mcp_documents_reader.admission.max_in_flight == 2
@@ -2,13 +2,45 @@
 
 测试内容：
 - read_document MCP 工具函数测试
+- 提取任务在执行器中运行、不阻塞事件循环
+- read_document_chunk 分块读取工具测试
+- read_document 输出预算（max_chars/max_bytes）与续读游标
+- read_documents 批量读取工具测试
+- search_document 文档内搜索工具测试
+- inspect_document 元数据检查工具测试
+- 服务器启动时不导入文档解析库
 """
 
+import asyncio
 import os
+import re
+import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
+from typing import Generator
 from unittest import mock
 
-from mcp_documents_reader import read_document
+import pytest
+
+from mcp_documents_reader import (
+    DocumentReader,
+    DocumentReaderFactory,
+    TxtReader,
+    _observed_call,
+    check_interrupted,
+    configure_executor,
+    get_executor,
+    inspect_document,
+    mcp,
+    metrics,
+    read_document,
+    read_document_chunk,
+    read_documents,
+    run_blocking,
+    search_document,
+)
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
@@ -88,6 +120,70 @@ class TestReadDocument:
         assert "GBK 编码" in result
         assert "中文内容" in result
 
+    def test_read_document_pdf_page_range(self) -> None:
+        """测试读取 PDF 指定页码范围。"""
+        file_path = FIXTURES_DIR / "multipage.pdf"
+        result = read_document(str(file_path), start_page=2, end_page=2)
+
+        assert result == "Page 2 content."
+
+    def test_read_document_pdf_page_list(self) -> None:
+        """测试读取 PDF 指定页码列表。"""
+        file_path = FIXTURES_DIR / "multipage.pdf"
+        result = read_document(str(file_path), pages=[1, 3])
+
+        assert result == "Page 1 content.\n\nPage 3 content."
+
+    def test_read_document_txt_line_range(self, temp_document_dir: str) -> None:
+        """测试读取 TXT 指定行范围。"""
+        file_path = Path(temp_document_dir) / "lines.txt"
+        file_path.write_text("one\ntwo\nthree\n", encoding="utf-8")
+
+        result = read_document(str(file_path), start_line=2, end_line=2)
+
+        assert result == "two\n"
+
+    def test_read_document_txt_byte_range(self, temp_document_dir: str) -> None:
+        """测试读取 TXT 指定字节范围。"""
+        file_path = Path(temp_document_dir) / "bytes.txt"
+        file_path.write_text("0123456789", encoding="utf-8")
+
+        result = read_document(str(file_path), offset=2, length=3)
+
+        assert result == "234"
+
+    def test_read_document_excel_selection(self) -> None:
+        """测试读取 Excel 指定工作表和行范围。"""
+        file_path = FIXTURES_DIR / "sample.xlsx"
+
+        result = read_document(str(file_path), sheet="Sheet2", start_row=2, end_row=2)
+
+        assert result == "=== Sheet: Sheet2 ===\n苹果\t5.5\n"
+
+    def test_read_document_excel_xml_engine(self) -> None:
+        """测试使用流式 XML 引擎读取 Excel 与默认引擎结果一致。"""
+        file_path = FIXTURES_DIR / "sample.xlsx"
+
+        result = read_document(str(file_path), engine="xml")
+
+        assert result == read_document(str(file_path))
+
+    def test_read_document_docx_xml_engine(self) -> None:
+        """测试使用流式 XML 引擎读取 DOCX。"""
+        file_path = FIXTURES_DIR / "sample.docx"
+
+        result = read_document(str(file_path), engine="xml")
+
+        assert result == read_document(str(file_path))
+
+    def test_read_document_page_options_on_txt(self) -> None:
+        """测试对不支持分页的文档传入页码选项返回错误信息。"""
+        file_path = FIXTURES_DIR / "sample.txt"
+        result = read_document(str(file_path), start_page=1)
+
+        assert "Error reading document" in result
+        assert "Unsupported option" in result
+
     def test_read_document_with_special_characters_in_filename(
         self, temp_document_dir: str
     ) -> None:
@@ -202,3 +298,592 @@ class TestReadDocumentWithMockedFilesystem:
         result = read_document("test.txt")
 
         assert "Error reading document" in result
+
+
+class TestReadDocumentChunk:
+    """read_document_chunk 分块读取工具测试类。"""
+
+    def test_read_all_chunks(self) -> None:
+        """测试按游标逐块读取完整文档。"""
+        file_path = str(FIXTURES_DIR / "sample.xlsx")
+        parts = []
+        cursor = None
+        while True:
+            result = read_document_chunk(file_path, cursor, max_chars=10)
+            parts.append(result["text"])
+            cursor = result["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(parts) > 1
+        assert "".join(parts) == read_document(file_path)
+
+    def test_single_chunk_document(self) -> None:
+        """测试小文档一次返回且没有后续游标。"""
+        result = read_document_chunk(str(FIXTURES_DIR / "sample.txt"))
+
+        assert "测试文本文件" in result["text"]
+        assert result["next_cursor"] is None
+
+    def test_reports_encoding(self, temp_document_dir: str) -> None:
+        """测试 TXT 分块返回解码所用的编码，ASCII 前缀之后的 GBK 文本不被替换。"""
+        file_path = Path(temp_document_dir) / "log.txt"
+        file_path.write_bytes(b"a" * 72_000 + "中文日志内容".encode("gbk"))
+
+        first = read_document_chunk(str(file_path), max_chars=50_000)
+        second = read_document_chunk(
+            str(file_path), first["next_cursor"], max_chars=50_000
+        )
+
+        assert first["encoding"] == "utf-8"
+        assert second["encoding"] == "gbk"
+        assert second["text"].endswith("a中文日志内容")
+        assert "encoding" not in read_document_chunk(str(FIXTURES_DIR / "sample.pdf"))
+
+    def test_file_not_found(self) -> None:
+        """测试读取不存在的文件。"""
+        result = read_document_chunk("nonexistent.txt")
+
+        assert "not found" in result["error"]
+
+    def test_invalid_cursor(self) -> None:
+        """测试无效游标返回错误信息。"""
+        result = read_document_chunk(str(FIXTURES_DIR / "sample.txt"), "garbage")
+
+        assert "Invalid cursor" in result["error"]
+
+    def test_cursor_rejected_after_file_change(self, temp_document_dir: str) -> None:
+        """测试文件修改后旧游标被拒绝。"""
+        file_path = Path(temp_document_dir) / "doc.txt"
+        file_path.write_text("0123456789", encoding="utf-8")
+        cursor = read_document_chunk(str(file_path), max_chars=4)["next_cursor"]
+
+        file_path.write_text("changed content", encoding="utf-8")
+        result = read_document_chunk(str(file_path), cursor, max_chars=4)
+
+        assert "has changed" in result["error"]
+
+    def test_corrupted_file(self) -> None:
+        """测试读取损坏文件返回错误信息。"""
+        result = read_document_chunk(str(FIXTURES_DIR / "corrupted.pdf"))
+
+        assert "Error reading document" in result["error"]
+
+
+def _continue_from(filename: str, note: str, **options: int) -> str:
+    """从截断说明中取出游标，用 read_document_chunk 读完剩余内容。
+
+    Args:
+        filename: 文档路径
+        note: read_document 返回的截断说明
+        **options: 传给 read_document_chunk 的其他参数
+
+    Returns:
+        str: 剩余的全部文本
+    """
+    match = re.search(r'cursor="([^"]+)"', note)
+    assert match is not None
+    cursor: str | None = match.group(1)
+    parts = []
+    while cursor is not None:
+        result = read_document_chunk(filename, cursor, **options)
+        parts.append(result["text"])
+        cursor = result["next_cursor"]
+    return "".join(parts)
+
+
+class TestOutputBudget:
+    """read_document 输出预算测试类。"""
+
+    def test_budget_not_reached(self) -> None:
+        """测试预算足够时返回完整文本且没有截断说明。"""
+        file_path = str(FIXTURES_DIR / "sample.docx")
+
+        result = read_document(file_path, max_chars=100_000)
+
+        assert result == read_document(file_path)
+
+    def test_max_chars_truncates_and_continues(self) -> None:
+        """测试超出字符预算时截断，并可通过游标读完剩余内容。"""
+        file_path = str(FIXTURES_DIR / "sample.xlsx")
+        full = read_document(file_path)
+
+        result = read_document(file_path, max_chars=12)
+        text, _, note = result.partition("\n\n[Truncated after ")
+
+        assert text == full[:12]
+        assert "remaining: unknown until extracted." in note
+        assert text + _continue_from(file_path, note) == full
+
+    def test_max_bytes_counts_utf8(self) -> None:
+        """测试字节预算按 UTF-8 计算，且不会截断在多字节字符中间。"""
+        file_path = str(FIXTURES_DIR / "sample.txt")
+        full = read_document(file_path)
+
+        result = read_document(file_path, max_bytes=10)
+        text, _, note = result.partition("\n\n[Truncated after ")
+
+        assert text == "这是测"
+        assert note.startswith("3 characters (9 bytes); remaining: about 116 bytes.")
+        assert text + _continue_from(file_path, note, max_bytes=10) == full
+
+    def test_continuation_keeps_selection(self, multipage_pdf_file: Path) -> None:
+        """测试续读游标保留页码选择，并报告剩余页数。
+
+        Args:
+            multipage_pdf_file: 五页 PDF 文件路径
+        """
+        file_path = str(multipage_pdf_file)
+        selected = read_document(file_path, start_page=2, end_page=4)
+
+        result = read_document(file_path, start_page=2, end_page=4, max_chars=20)
+        text, _, note = result.partition("\n\n[Truncated after ")
+
+        assert "remaining: 2 page(s) starting at page 3." in note
+        assert text + _continue_from(file_path, note) == selected
+        assert "Page 5" not in selected
+
+    def test_stops_extracting_early(self, multipage_pdf_file: Path) -> None:
+        """测试预算用完后不再提取后续页面。
+
+        Args:
+            multipage_pdf_file: 五页 PDF 文件路径
+        """
+        from pypdf import PageObject
+
+        calls = []
+        original = PageObject.extract_text
+
+        def counting(page: PageObject, *args: object, **kwargs: object) -> str:
+            calls.append(page)
+            return original(page, *args, **kwargs)
+
+        with mock.patch.object(PageObject, "extract_text", counting):
+            read_document(str(multipage_pdf_file), max_chars=5)
+
+        assert len(calls) <= 2
+
+    def test_invalid_budget(self) -> None:
+        """测试无效预算返回错误信息。"""
+        result = read_document(str(FIXTURES_DIR / "sample.txt"), max_chars=0)
+
+        assert "Error reading document" in result
+
+    def test_cursor_with_invalid_options(self) -> None:
+        """测试选项段损坏的游标返回错误信息。"""
+        result = read_document_chunk(
+            str(FIXTURES_DIR / "sample.txt"), "abc.not-base64!.stamp"
+        )
+
+        assert "Invalid cursor" in result["error"]
+
+
+class TestReadDocuments:
+    """read_documents 批量读取工具测试类。"""
+
+    def test_results_preserve_input_order(self) -> None:
+        """测试批量读取结果与输入顺序一致。"""
+        filenames = [
+            str(FIXTURES_DIR / "sample.pdf"),
+            str(FIXTURES_DIR / "sample.txt"),
+            str(FIXTURES_DIR / "sample.xlsx"),
+        ]
+
+        results = read_documents(filenames, max_workers=3)
+
+        assert [result["filename"] for result in results] == filenames
+        assert "test PDF document" in results[0]["text"]
+        assert "测试文本文件" in results[1]["text"]
+        assert "姓名" in results[2]["text"]
+
+    def test_per_file_errors(self) -> None:
+        """测试单个文件的错误不影响其他文件。"""
+        filenames = [
+            "nonexistent.txt",
+            str(FIXTURES_DIR / "corrupted.docx"),
+            str(FIXTURES_DIR / "sample.txt"),
+        ]
+
+        results = read_documents(filenames)
+
+        assert "not found" in results[0]["error"]
+        assert "Error reading DOCX" in results[1]["error"]
+        assert "测试文本文件" in results[2]["text"]
+
+    def test_total_output_cap(self, temp_document_dir: str) -> None:
+        """测试超出总输出上限时截断当前文件并跳过后续文件。"""
+        filenames = []
+        for index in range(3):
+            file_path = Path(temp_document_dir) / f"doc{index}.txt"
+            file_path.write_text(str(index) * 10, encoding="utf-8")
+            filenames.append(str(file_path))
+
+        results = read_documents(filenames, max_total_chars=15)
+
+        assert results[0]["text"] == "0" * 10
+        assert results[1]["text"] == "1" * 5
+        assert results[1]["truncated"] is True
+        assert "limit reached" in results[2]["error"]
+
+    def test_output_cap_stops_remaining_reads(self, temp_document_dir: str) -> None:
+        """测试达到总输出上限后不再提交新的读取，并停止正在运行的读取。"""
+        filenames = []
+        for index in range(20):
+            file_path = Path(temp_document_dir) / f"capped{index}.txt"
+            file_path.write_text(str(index), encoding="utf-8")
+            filenames.append(str(file_path))
+        started: list[str] = []
+        finished: list[str] = []
+
+        def slow_read(_: TxtReader, path: str) -> str:
+            started.append(path)
+            for _ in range(20 if path != filenames[0] else 1):
+                time.sleep(0.01)
+                check_interrupted()
+            finished.append(path)
+            return "x" * 1000
+
+        with mock.patch.object(TxtReader, "read", slow_read):
+            results = read_documents(filenames, max_workers=2, max_total_chars=500)
+
+        assert results[0]["truncated"] is True
+        assert all("limit reached" in result["error"] for result in results[1:])
+        assert len(started) <= 2
+        assert finished == [filenames[0]]
+
+    def test_empty_batch(self) -> None:
+        """测试空列表返回空结果。"""
+        assert read_documents([]) == []
+
+    def test_text_starting_with_error(self, temp_document_dir: str) -> None:
+        """测试以 Error 开头的文档内容作为文本返回，而非错误。"""
+        file_path = Path(temp_document_dir) / "log.txt"
+        file_path.write_text("Error: disk full at 03:00", encoding="utf-8")
+
+        results = read_documents([str(file_path)])
+
+        assert results == [
+            {"filename": str(file_path), "text": "Error: disk full at 03:00"}
+        ]
+
+    def test_bounded_by_executor_size(self, temp_document_dir: str) -> None:
+        """测试同时读取的文件数不超过执行器的大小。"""
+        filenames = []
+        for index in range(6):
+            file_path = Path(temp_document_dir) / f"bounded{index}.txt"
+            file_path.write_text(str(index), encoding="utf-8")
+            filenames.append(str(file_path))
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def slow_read(_: str) -> str:
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return "content"
+
+        configure_executor(max_workers=2)
+        try:
+            with mock.patch(
+                "mcp_documents_reader.TxtReader.read", side_effect=slow_read
+            ):
+                results = read_documents(filenames, max_workers=8)
+        finally:
+            configure_executor()
+
+        assert [result["text"] for result in results] == ["content"] * 6
+        assert running[1] == 2
+
+
+class TestSearchDocument:
+    """search_document 文档内搜索工具测试类。"""
+
+    def test_literal_search_is_case_insensitive(self) -> None:
+        """测试默认按字面量、忽略大小写搜索并返回位置信息。"""
+        result = search_document(str(FIXTURES_DIR / "multipage.pdf"), "PAGE 3 content")
+
+        assert result["truncated"] is False
+        assert result["matches"] == [
+            {
+                "match": "Page 3 content",
+                "context": mock.ANY,
+                "line": 5,
+                "page": 3,
+            }
+        ]
+
+    def test_literal_pattern_is_escaped(self, temp_document_dir: str) -> None:
+        """测试非正则模式中的特殊字符按字面量匹配。"""
+        file_path = Path(temp_document_dir) / "prices.txt"
+        file_path.write_text("cost: $5.00 (net)\ncost: $5x00\n", encoding="utf-8")
+
+        result = search_document(str(file_path), "$5.00 (net)")
+
+        assert [m["line"] for m in result["matches"]] == [1]
+
+    def test_regex_and_case_sensitive(self, temp_document_dir: str) -> None:
+        """测试正则表达式与区分大小写选项。"""
+        file_path = Path(temp_document_dir) / "ids.txt"
+        file_path.write_text("ID-12 id-34\nID-56\n", encoding="utf-8")
+
+        result = search_document(
+            str(file_path), r"ID-(\d+)", regex=True, case_sensitive=True
+        )
+
+        assert [m["match"] for m in result["matches"]] == ["ID-12", "ID-56"]
+        assert [m["line"] for m in result["matches"]] == [1, 2]
+
+    def test_context_chars(self, temp_document_dir: str) -> None:
+        """测试上下文只包含匹配两侧指定数量的字符。"""
+        file_path = Path(temp_document_dir) / "context.txt"
+        file_path.write_text("abcdefXYZghijkl", encoding="utf-8")
+
+        result = search_document(str(file_path), "xyz", context_chars=3)
+
+        assert result["matches"][0]["context"] == "defXYZghi"
+
+    def test_stops_at_max_matches(self) -> None:
+        """测试达到 max_matches 后停止并标记 truncated。"""
+        result = search_document(
+            str(FIXTURES_DIR / "multipage.pdf"), "content", max_matches=2
+        )
+
+        assert [m["page"] for m in result["matches"]] == [1, 2]
+        assert result["truncated"] is True
+
+    def test_excel_cell_location(self) -> None:
+        """测试 Excel 匹配返回工作表与单元格。"""
+        result = search_document(str(FIXTURES_DIR / "sample.xlsx"), "5.5")
+
+        match = result["matches"][0]
+        assert (match["sheet"], match["cell"]) == ("Sheet2", "B2")
+
+    @pytest.mark.parametrize(
+        "kwargs,message",
+        [
+            ({"pattern": ""}, "must not be empty"),
+            ({"pattern": "(", "regex": True}, "Invalid pattern"),
+            ({"pattern": "x", "max_matches": 0}, "max_matches"),
+            ({"pattern": "x", "context_chars": -1}, "context_chars"),
+        ],
+    )
+    def test_invalid_arguments(self, kwargs: dict, message: str) -> None:
+        """测试无效参数返回错误信息。
+
+        Args:
+            kwargs: 搜索参数
+            message: 期望出现在错误中的文本
+        """
+        result = search_document(str(FIXTURES_DIR / "sample.txt"), **kwargs)
+
+        assert message in result["error"]
+
+    def test_missing_and_corrupted_files(self) -> None:
+        """测试文件不存在或损坏时返回错误。"""
+        missing = search_document("nonexistent.txt", "x")
+        corrupted = search_document(str(FIXTURES_DIR / "corrupted.docx"), "x")
+
+        assert "not found" in missing["error"]
+        assert corrupted["error"].startswith("Error searching document")
+
+
+class TestInspectDocument:
+    """inspect_document 元数据检查工具测试类。"""
+
+    @pytest.mark.parametrize(
+        "filename,doc_format,field",
+        [
+            ("multipage.pdf", "PDF", "pages"),
+            ("sample.docx", "DOCX", "paragraphs"),
+            ("sample.xlsx", "Excel", "sheets"),
+            ("sample.txt", "TXT", "lines"),
+        ],
+    )
+    def test_common_and_format_fields(
+        self, filename: str, doc_format: str, field: str
+    ) -> None:
+        """测试返回文件大小、修改时间以及各格式特有的字段。
+
+        Args:
+            filename: 测试文件名
+            doc_format: 期望的格式名称
+            field: 该格式特有的字段
+        """
+        path = FIXTURES_DIR / filename
+
+        info = inspect_document(str(path))
+
+        assert info["filename"] == str(path)
+        assert info["format"] == doc_format
+        assert info["size_bytes"] == path.stat().st_size
+        assert info["modified"] == path.stat().st_mtime
+        assert field in info
+
+    def test_does_not_extract_text(self) -> None:
+        """测试检查文档不会调用任何 Reader 的文本提取。"""
+        with (
+            mock.patch.object(DocumentReader, "iter_blocks") as iter_blocks,
+            mock.patch.object(DocumentReaderFactory, "read") as read,
+        ):
+            for filename in ("sample.pdf", "sample.docx", "sample.xlsx"):
+                assert "error" not in inspect_document(str(FIXTURES_DIR / filename))
+
+        iter_blocks.assert_not_called()
+        read.assert_not_called()
+
+    def test_missing_file(self) -> None:
+        """测试文件不存在时返回错误。"""
+        info = inspect_document("nonexistent.pdf")
+
+        assert "not found" in info["error"]
+
+    def test_unsupported_file(self) -> None:
+        """测试不支持的文件类型返回错误。"""
+        info = inspect_document(str(FIXTURES_DIR / "__init__.py"))
+
+        assert "Unsupported document type" in info["error"]
+
+    def test_corrupted_file(self) -> None:
+        """测试损坏的文件返回错误而不是抛出异常。"""
+        info = inspect_document(str(FIXTURES_DIR / "corrupted.xlsx"))
+
+        assert info["error"].startswith("Error inspecting document")
+
+
+class TestNonBlockingExecution:
+    """read_document 在执行器中运行的测试类。"""
+
+    @pytest.fixture(autouse=True)
+    def restore_executor(self) -> Generator[None, None, None]:
+        """测试结束后恢复默认的线程执行器。"""
+        yield
+        configure_executor()
+
+    def test_registered_tool_is_async(self) -> None:
+        """测试注册的 read_document 工具为异步工具。"""
+        tool = mcp._tool_manager.get_tool("read_document")
+
+        assert tool is not None
+        assert tool.is_async
+
+    async def test_call_tool_runs_reader(self) -> None:
+        """测试通过 MCP 调用工具可以读取文档。"""
+        file_path = FIXTURES_DIR / "sample.txt"
+
+        result = await mcp.call_tool("read_document", {"filename": str(file_path)})
+
+        assert "测试文本文件" in str(result)
+
+    async def test_concurrent_calls_do_not_block(self) -> None:
+        """测试多个慢速读取并发执行而不是串行排队。"""
+        configure_executor(max_workers=4)
+
+        def slow_read(_: str) -> str:
+            time.sleep(0.2)
+            return "slow content"
+
+        file_path = FIXTURES_DIR / "sample.txt"
+        with mock.patch("mcp_documents_reader.TxtReader.read", side_effect=slow_read):
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *[
+                    mcp.call_tool("read_document", {"filename": str(file_path)})
+                    for _ in range(4)
+                ]
+            )
+            elapsed = time.perf_counter() - started
+
+        assert all("slow content" in str(result) for result in results)
+        assert elapsed < 0.6
+
+    async def test_process_executor(self) -> None:
+        """测试可以切换为进程执行器。"""
+        configure_executor(max_workers=1, kind="process")
+
+        pid = await run_blocking(os.getpid)
+
+        assert pid != os.getpid()
+
+    async def test_tool_call_on_process_executor(self) -> None:
+        """测试进程执行器中运行工具调用，并合并子进程记录的指标。"""
+        configure_executor(max_workers=1, kind="process")
+        metrics.reset()
+        file_path = FIXTURES_DIR / "sample.txt"
+
+        result = await mcp.call_tool("read_document", {"filename": str(file_path)})
+        missing = await mcp.call_tool("read_document", {"filename": "missing.txt"})
+
+        assert "测试文本文件" in str(result)
+        assert "not found" in str(missing)
+        stats = metrics.snapshot()["tools"]["read_document"]
+        assert stats["calls"] == 2
+        assert stats["errors_by_type"] == {"NotFound": 1}
+        metrics.reset()
+
+    def test_observed_call_returns_exceptions(self) -> None:
+        """测试进程中运行的工具调用返回抛出的异常和记录的指标。"""
+        ok, error, operations = _observed_call("read_documents", 123)
+
+        assert not ok
+        assert isinstance(error, TypeError)
+        assert operations[("tools", "read_documents")]["errors"] == {"TypeError": 1}
+        metrics.reset()
+
+    def test_configure_executor_rejects_unknown_kind(self) -> None:
+        """测试不支持的执行器类型应抛出异常。"""
+        with pytest.raises(ValueError):
+            configure_executor(kind="fiber")
+
+    def test_get_executor_from_env(self) -> None:
+        """测试首次使用时根据环境变量创建执行器。"""
+        env = {"MCP_DOCUMENTS_READER_MAX_WORKERS": "3"}
+        with (
+            mock.patch("mcp_documents_reader._executor", None),
+            mock.patch.dict(os.environ, env),
+        ):
+            executor = get_executor()
+
+        assert executor._max_workers == 3  # type: ignore[attr-defined]
+        executor.shutdown()
+
+
+class TestServerStartup:
+    """服务器启动开销测试类。"""
+
+    def test_import_does_not_load_document_backends(self) -> None:
+        """测试导入模块时不加载 docx、openpyxl 和 pypdf。"""
+        code = (
+            "import sys, mcp_documents_reader; "
+            "print(sorted(m for m in ('docx', 'openpyxl', 'pypdf') "
+            "if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent.parent,
+        )
+
+        assert result.stdout.strip() == "[]"
+
+    def test_backend_loaded_on_first_use(self) -> None:
+        """测试首次读取对应格式时才加载解析库。"""
+        code = (
+            "import sys, mcp_documents_reader as m; "
+            "m.read_document('tests/fixtures/sample.pdf'); "
+            "print(sorted(n for n in ('docx', 'openpyxl', 'pypdf') "
+            "if n in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent.parent,
+        )
+
+        assert result.stdout.strip() == "['pypdf']"
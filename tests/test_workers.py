@@ -0,0 +1,249 @@
+"""WorkerPool 隔离工作进程池测试。
+
+测试内容：
+- 在工作进程中执行任务并返回结果或异常
+- 超时、超出内存上限和进程崩溃时终止并替换工作进程
+- 按任务数回收工作进程
+- 从环境变量读取配置
+- DocumentReaderFactory.read 通过工作进程池提取并汇总读取器指标
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Generator
+from unittest import mock
+
+import pytest
+
+from mcp_documents_reader import (
+    DocumentReaderFactory,
+    WorkerPool,
+    _isolated_read,
+    _pool_worker,
+    _process_rss,
+    get_server_stats,
+    metrics,
+)
+
+
+@pytest.fixture(scope="module")
+def pool() -> Generator[WorkerPool, None, None]:
+    """在本模块的测试间共享的工作进程池。
+
+    Yields:
+        WorkerPool: 单进程工作进程池
+    """
+    shared = WorkerPool(processes=1, timeout=30)
+    yield shared
+    shared.close()
+
+
+@pytest.fixture
+def factory_pool() -> Generator[WorkerPool, None, None]:
+    """让 DocumentReaderFactory 通过工作进程池读取，并禁用缓存。
+
+    Yields:
+        WorkerPool: 工厂使用的工作进程池
+    """
+    metrics.reset()
+    workers = WorkerPool(processes=1, timeout=30)
+    with (
+        mock.patch.object(DocumentReaderFactory, "workers", workers),
+        mock.patch.object(DocumentReaderFactory, "cache", None),
+    ):
+        yield workers
+    workers.close()
+    metrics.reset()
+
+
+class TestWorkerPool:
+    """WorkerPool 任务执行测试类。"""
+
+    def test_runs_in_worker_process(self, pool: WorkerPool) -> None:
+        """测试任务在另一个进程中执行，且工作进程被复用。"""
+        first = pool.run(os.getpid)
+        second = pool.run(os.getpid)
+
+        assert first != os.getpid()
+        assert first == second
+
+    def test_task_exception_is_raised(self, pool: WorkerPool) -> None:
+        """测试任务抛出的异常在调用方重新抛出，工作进程继续运行。"""
+        pid = pool.run(os.getpid)
+
+        with pytest.raises(ValueError, match="invalid literal"):
+            pool.run(int, "x")
+
+        assert pool.run(os.getpid) == pid
+
+    def test_unpicklable_result(self, pool: WorkerPool) -> None:
+        """测试无法序列化的结果报告为 RuntimeError。"""
+        with pytest.raises(RuntimeError, match="pickle"):
+            pool.run(threading.Lock)
+
+    def test_timeout_kills_worker(self, pool: WorkerPool) -> None:
+        """测试超时的任务被终止，其工作进程被替换。"""
+        pid = pool.run(os.getpid)
+        started = time.monotonic()
+
+        with pytest.raises(TimeoutError, match="timed out after 0.2 s"):
+            pool.run(time.sleep, 30, timeout=0.2)
+
+        assert time.monotonic() - started < 10
+        assert pool.run(os.getpid) != pid
+        assert pool.stats()["timeouts"] >= 1
+
+    def test_memory_limit_kills_worker(self) -> None:
+        """测试工作进程的常驻内存超过上限时任务被终止。"""
+        workers = WorkerPool(processes=1, max_rss_bytes=1)
+        try:
+            with pytest.raises(MemoryError, match="memory limit of 1 bytes"):
+                workers.run(time.sleep, 30)
+            assert workers.stats()["memory_kills"] == 1
+            assert workers.stats()["workers"] == 0
+        finally:
+            workers.close()
+
+    def test_crash_is_reported(self, pool: WorkerPool) -> None:
+        """测试工作进程意外退出时报告退出码。"""
+        with pytest.raises(ChildProcessError, match="exited with code 3"):
+            pool.run(os._exit, 3)
+
+        assert pool.run(sum, [1, 2]) == 3
+
+    def test_workers_are_recycled(self) -> None:
+        """测试工作进程执行 max_tasks_per_child 个任务后被替换。"""
+        workers = WorkerPool(processes=1, max_tasks_per_child=2)
+        try:
+            pids = [workers.run(os.getpid) for _ in range(3)]
+            assert pids[0] == pids[1] != pids[2]
+            assert workers.stats()["recycled"] == 1
+        finally:
+            workers.close()
+
+    def test_closed_pool_rejects_tasks(self) -> None:
+        """测试关闭后的进程池拒绝新任务。"""
+        workers = WorkerPool(processes=1)
+        workers.close()
+
+        with pytest.raises(RuntimeError, match="closed"):
+            workers.run(os.getpid)
+
+    def test_stats(self) -> None:
+        """测试未启动工作进程时的统计。"""
+        assert WorkerPool(processes=3).stats() == {
+            "processes": 3,
+            "workers": 0,
+            "idle": 0,
+            "tasks": 0,
+            "timeouts": 0,
+            "memory_kills": 0,
+            "crashes": 0,
+            "interrupted": 0,
+            "recycled": 0,
+        }
+
+    def test_from_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """测试从环境变量读取配置，未配置进程数时不启用。"""
+        assert WorkerPool.from_env() is None
+
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_WORKER_PROCESSES", "4")
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_WORKER_TIMEOUT", "60")
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_WORKER_MAX_RSS_BYTES", "1000000")
+        monkeypatch.setenv("MCP_DOCUMENTS_READER_WORKER_MAX_TASKS", "10")
+        workers = WorkerPool.from_env()
+
+        assert workers is not None
+        assert workers.processes == 4
+        assert workers.timeout == 60
+        assert workers.max_rss_bytes == 1000000
+        assert workers.max_tasks_per_child == 10
+
+
+class TestWorkerInternals:
+    """工作进程内部函数测试类。"""
+
+    def test_pool_worker_serves_tasks(self) -> None:
+        """测试工作进程循环依次回复结果、异常和无法序列化的结果。"""
+        parent, child = multiprocessing.Pipe()
+        parent.send((sum, ([1, 2],)))
+        parent.send((int, ("x",)))
+        parent.send((threading.Lock, ()))
+        parent.send(None)
+
+        _pool_worker(child)
+
+        assert parent.recv() == (True, 3)
+        ok, error = parent.recv()
+        assert not ok and isinstance(error, ValueError)
+        ok, error = parent.recv()
+        assert not ok and isinstance(error, RuntimeError)
+
+    def test_pool_worker_exits_when_pipe_closes(self) -> None:
+        """测试父进程关闭管道后工作进程退出。"""
+        parent, child = multiprocessing.Pipe()
+        parent.close()
+
+        _pool_worker(child)
+
+    def test_isolated_read_returns_metrics(self, sample_txt_file: Path) -> None:
+        """测试工作进程内的读取返回文本和读取器指标。"""
+        text, operations = _isolated_read(str(sample_txt_file), {})
+
+        assert "测试文本文件" in text
+        assert operations[("readers", "TXT")]["calls"] == 1
+        metrics.reset()
+
+    def test_process_rss(self) -> None:
+        """测试读取进程的常驻内存，进程不存在时返回 None。"""
+        if not os.path.exists("/proc/self/statm"):
+            pytest.skip("需要 /proc")
+
+        assert _process_rss(os.getpid()) > 0
+        assert _process_rss(2**22 + 1) is None
+
+
+class TestFactoryWorkers:
+    """DocumentReaderFactory 通过工作进程池读取的测试类。"""
+
+    def test_read_in_worker(
+        self, factory_pool: WorkerPool, sample_pdf_file: Path
+    ) -> None:
+        """测试读取在工作进程中完成，读取器指标汇总到主进程。"""
+        text = DocumentReaderFactory.read(str(sample_pdf_file))
+
+        assert "test PDF document" in text
+        assert factory_pool.stats()["tasks"] == 1
+        assert metrics.snapshot()["readers"]["PDF"]["calls"] == 1
+
+    def test_timeout_is_reported_as_error(
+        self, factory_pool: WorkerPool, sample_pdf_file: Path
+    ) -> None:
+        """测试超时被报告为读取错误并按类型计数。"""
+        factory_pool.timeout = 0.001
+
+        text = DocumentReaderFactory.read(str(sample_pdf_file))
+
+        assert text.startswith("Error reading PDF: Extraction timed out")
+        stats = metrics.snapshot()["readers"]["PDF"]
+        assert stats["errors_by_type"] == {"TimeoutError": 1}
+        assert stats["bytes_in"] == sample_pdf_file.stat().st_size
+
+    def test_invalid_options_are_rejected_in_parent(
+        self, factory_pool: WorkerPool, sample_pdf_file: Path
+    ) -> None:
+        """测试不支持的选项在主进程中报错，不占用工作进程。"""
+        with pytest.raises(ValueError, match="Unsupported option"):
+            DocumentReaderFactory.read(str(sample_pdf_file), sheet="a")
+
+        assert factory_pool.stats()["workers"] == 0
+
+    def test_server_stats_include_workers(self, factory_pool: WorkerPool) -> None:
+        """测试配置工作进程池时 get_server_stats 返回其统计。"""
+        stats = get_server_stats()
+
+        assert isinstance(stats, dict)
+        assert stats["workers"] == factory_pool.stats()